@@ -10,6 +10,8 @@ BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / "data"
 IMAGES_DIR = BASE_DIR / "images"
 REPORTS_DIR = BASE_DIR / "reports"
+# Кэш PNG диаграмм (создается при первом построении)
+CHART_CACHE_DIR = DATA_DIR / "chart_cache"
 
 # Создание директорий если их нет
 for directory in [DATA_DIR, IMAGES_DIR, REPORTS_DIR]:
@@ -46,6 +48,10 @@ class Config:
     MIN_ORDER_DAYS_BEFORE_EVENT = 1  # Минимальное количество дней до мероприятия для заказа
     DEFAULT_VAT_RATE = 0.2  # НДС по умолчанию (20%)
 
+    # Страницы главного окна
+    PREWARM_PAGES = True  # Создавать остальные страницы в фоне после первой отрисовки
+    PAGE_IDLE_UNLOAD_MINUTES = 10  # Выгружать страницы, скрытые дольше (0 - не выгружать)
+
     # Цвета для категорий (по умолчанию)
     CATEGORY_COLORS = {
         "Продукты/готовые блюда": "#FF6B6B",
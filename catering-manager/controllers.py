@@ -12,6 +12,10 @@ from models import *
 from database import DatabaseManager
 from utils.validators import Validators
 from utils.formatters import Formatters
+from utils.budget_projection import BudgetForecaster
+from utils.budget_estimator import BudgetEstimator
+from utils.background import BackgroundLoader
+from utils.chart_service import ChartService
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +26,12 @@ class CateringController:
         self.db = db_manager or DatabaseManager()
         self.current_event: Optional[Event] = None
         self.current_order: Optional[Order] = None
+        # Матрица затрат на гостя (пересчитывается при завершении мероприятий)
+        self._budget_estimator: Optional[BudgetEstimator] = None
+        # Диаграммы в PNG (рабочий поток и кэш)
+        self.chart_service = ChartService()
+        # Загрузка данных страниц в рабочих потоках
+        self.loader = BackgroundLoader()
 
         self.settings = self.get_settings()
         ctk.set_appearance_mode(self.settings.theme)
@@ -145,6 +155,12 @@ class CateringController:
             logger.error(f"Ошибка добавления поставщика: {e}")
             return False, f"Ошибка при добавлении поставщика: {str(e)}"
 
+    def get_price_history(self, nomenclature_id: Optional[int], supplier_id: Optional[int] = None,
+                          date_from: Optional[date] = None,
+                          date_to: Optional[date] = None) -> Dict[int, List[SupplierPrice]]:
+        """Получить историю цен на позицию по поставщикам (без позиции - прайс поставщика по позициям)"""
+        return self.db.get_price_history(nomenclature_id, supplier_id, date_from, date_to)
+
     # ===== Управление мероприятиями =====
 
     def get_all_events(self) -> List[Event]:
@@ -175,6 +191,18 @@ class CateringController:
             logger.error(f"Ошибка добавления мероприятия: {e}")
             return False, f"Ошибка: {str(e)}"
 
+    def get_event_days(self, date_from: date, date_to: date) -> Dict[date, EventDayStats]:
+        """Мероприятия по дням за период (для календаря)"""
+        return self.db.get_event_days(date_from, date_to)
+
+    def estimate_event_budget(self, guests_count: int) -> Optional[BudgetEstimate]:
+        """Предложить бюджет и разбивку по категориям по завершенным мероприятиям"""
+        signature = self.db.get_completed_events_signature()
+        if self._budget_estimator is None or self._budget_estimator.signature != signature:
+            self._budget_estimator = BudgetEstimator(self.db.get_completed_event_spend(), signature)
+
+        return self._budget_estimator.estimate(guests_count)
+
     def select_event(self, event_id: int) -> bool:
         """Выбрать текущее мероприятие"""
         events = self.db.get_all_events()
@@ -270,6 +298,9 @@ class CateringController:
             order_id = self.db.create_order(self.current_order)
             self.current_order.id = order_id
 
+            # Дописываем новые позиции в сводные расходы
+            self.db.refresh_spend_rollups()
+
             # Обновляем контроль бюджета
             self._update_budget_controls()
 
@@ -344,6 +375,24 @@ class CateringController:
             'orders_count': len(orders)
         }
 
+    def get_budget_projections(self, events: Optional[List[Event]] = None) -> Dict[int, BudgetProjection]:
+        """Прогноз расходов на дату мероприятия (по умолчанию - для всех незавершенных)"""
+        if events is None:
+            events = [e for e in self.db.get_all_events() if e.status != "завершено"]
+
+        if not events:
+            return {}
+
+        timelines = self.db.get_order_timelines([e.id for e in events])
+        return BudgetForecaster.project(events, timelines)
+
+    def get_budget_projection(self) -> Optional[BudgetProjection]:
+        """Прогноз расходов текущего мероприятия"""
+        if not self.current_event:
+            return None
+
+        return self.get_budget_projections([self.current_event]).get(self.current_event.id)
+
     def _get_budget_status_color(self, usage: float) -> str:
         """Определить цвет статуса бюджета"""
         if usage < Config.BUDGET_WARNING_THRESHOLD:
@@ -365,32 +414,35 @@ class CateringController:
         if not event_id:
             return None
 
-        # Получаем мероприятие
-        events = self.db.get_all_events()
-        event = next((e for e in events if e.id == event_id), None)
-        if not event:
-            return None
+        return self.db.get_event_summary(event_id)
 
-        # Получаем заказы
-        orders = self.db.get_orders_for_event(event_id)
-        total_amount = sum(order.total_amount for order in orders)
+    def get_spent_by_event(self) -> Dict[int, Decimal]:
+        """Расходы по всем мероприятиям (из сводной таблицы)"""
+        return self.db.get_spend_totals('event_id')
 
-        # Получаем детализацию по категориям
-        categories_summary = self.db.get_expense_report(event_id)
+    def get_daily_spend(self, date_from: Optional[date] = None,
+                        date_to: Optional[date] = None,
+                        event_id: Optional[int] = None) -> Dict[date, Decimal]:
+        """Расходы по дням за период (из сводной таблицы)"""
+        return self.db.get_spend_totals('day', date_from, date_to, event_id)
 
-        # Рассчитываем использование бюджета
-        if event.budget == Decimal('0'):
-            budget_utilization = 0.0
-        else:
-            budget_utilization = float(total_amount / event.budget * 100)
-
-        return EventSummary(
-            event=event,
-            total_orders=len(orders),
-            total_amount=total_amount,
-            budget_utilization=budget_utilization,
-            categories_summary=categories_summary
-        )
+    def refresh_spend_rollups(self) -> Tuple[bool, str]:
+        """Дописать новые позиции заказов в сводные расходы"""
+        try:
+            new_items = self.db.refresh_spend_rollups()
+            return True, f"Учтено новых позиций: {new_items}"
+        except Exception as e:
+            logger.error(f"Ошибка обновления сводных расходов: {e}")
+            return False, f"Ошибка при обновлении сводных расходов: {str(e)}"
+
+    def rebuild_spend_rollups(self) -> Tuple[bool, str]:
+        """Полностью пересчитать сводные расходы"""
+        try:
+            rows_count = self.db.rebuild_spend_rollups()
+            return True, f"Сводные расходы пересчитаны ({rows_count} строк)"
+        except Exception as e:
+            logger.error(f"Ошибка пересчета сводных расходов: {e}")
+            return False, f"Ошибка при пересчете сводных расходов: {str(e)}"
 
     # ===== Утилиты =====
 
@@ -8,7 +8,7 @@ from contextlib import contextmanager
 from datetime import datetime, date, time
 from decimal import Decimal
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 import logging
 
 from config import Config
@@ -16,12 +16,31 @@ from models import *
 
 logger = logging.getLogger(__name__)
 
+# Имя водяного знака и измерения сводной таблицы расходов
+ROLLUP_DAILY_SPEND = 'daily_spend'
+ROLLUP_DIMENSIONS = ('day', 'category_id', 'supplier_id', 'event_id')
+
+# Размер пачки строк при потоковом чтении (fetchmany)
+ITER_BATCH_SIZE = 1000
+
+# Колонки потоковой выгрузки позиций заказов (iter_order_items)
+ORDER_ITEM_EXPORT_COLUMNS = (
+    'order_number', 'order_date', 'event_name', 'nomenclature', 'unit', 'category',
+    'supplier', 'quantity', 'unit_price', 'total_price', 'notes'
+)
+
+# Операции инкрементальной выгрузки (iter_order_item_changes)
+CHANGE_UPSERT = 'upsert'
+CHANGE_DELETE = 'delete'
+
 
 class DatabaseManager:
     """Менеджер базы данных для работы с существующей структурой"""
 
-    def __init__(self, db_path: Optional[Path] = None):
+    def __init__(self, db_path: Optional[Path] = None, read_only: bool = False):
         self.db_path = db_path or Config.get_database_path()
+        # Только чтение (например, в процессах пакетной генерации отчетов)
+        self.read_only = read_only
         logger.info(f"Использую базу данных: {self.db_path}")
 
     @contextmanager
@@ -29,10 +48,17 @@ class DatabaseManager:
         """Контекстный менеджер для соединения с БД"""
         conn = None
         try:
-            conn = sqlite3.connect(
-                str(self.db_path),
-                detect_types=sqlite3.PARSE_DECLTYPES
-            )
+            if self.read_only:
+                conn = sqlite3.connect(
+                    f"{Path(self.db_path).resolve().as_uri()}?mode=ro",
+                    uri=True,
+                    detect_types=sqlite3.PARSE_DECLTYPES
+                )
+            else:
+                conn = sqlite3.connect(
+                    str(self.db_path),
+                    detect_types=sqlite3.PARSE_DECLTYPES
+                )
             conn.row_factory = sqlite3.Row
             yield conn
         except sqlite3.Error as e:
@@ -68,6 +94,13 @@ class DatabaseManager:
 
         return result
 
+    def ensure_schema(self):
+        """Применить database_schema.sql (индексы и служебные таблицы)"""
+        schema_path = Path(__file__).parent / "database_schema.sql"
+        with self.get_connection() as conn:
+            conn.executescript(schema_path.read_text(encoding='utf-8'))
+            conn.commit()
+
     # ===== CRUD для cost_categories =====
 
     def get_all_categories(self) -> List[CostCategory]:
@@ -376,42 +409,162 @@ class DatabaseManager:
             conn.commit()
             return cursor.lastrowid
 
+    def get_price_history(self, nomenclature_id: Optional[int], supplier_id: Optional[int] = None,
+                          date_from: Optional[date] = None,
+                          date_to: Optional[date] = None) -> Dict[int, List[SupplierPrice]]:
+        """
+        История цен за период. С позицией - цены на нее, сгруппированные по поставщикам;
+        без позиции (nomenclature_id=None) - прайс поставщика, сгруппированный по позициям.
+        Ряды отсортированы по дате начала действия цены (индекс idx_supplier_prices_history)
+        """
+        if nomenclature_id is None and not supplier_id:
+            raise ValueError("Для истории цен нужна позиция или поставщик")
+
+        conditions = []
+        params: List[Any] = []
+        if nomenclature_id is not None:
+            conditions.append("sp.nomenclature_id = ?")
+            params.append(nomenclature_id)
+        if supplier_id:
+            conditions.append("sp.supplier_id = ?")
+            params.append(supplier_id)
+        if date_from:
+            conditions.append("(sp.end_date IS NULL OR sp.end_date >= ?)")
+            params.append(date_from.isoformat())
+        if date_to:
+            conditions.append("sp.start_date <= ?")
+            params.append(date_to.isoformat())
+
+        query = f"""
+            SELECT sp.*, s.name as supplier_name, n.name as nomenclature_name, n.unit as nomenclature_unit
+            FROM supplier_prices sp
+            JOIN suppliers s ON sp.supplier_id = s.id
+            LEFT JOIN nomenclatures n ON sp.nomenclature_id = n.id
+            WHERE {' AND '.join(conditions)}
+        """
+
+        # Ключ ряда: поставщик для истории позиции, позиция для прайса поставщика
+        group_key = 'supplier_id' if nomenclature_id is not None else 'nomenclature_id'
+        query += f" ORDER BY sp.{group_key}, sp.start_date"
+
+        history: Dict[int, List[SupplierPrice]] = {}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+
+            suppliers: Dict[int, Supplier] = {}
+            nomenclatures: Dict[int, Nomenclature] = {}
+            for row in cursor:
+                supplier = suppliers.get(row['supplier_id'])
+                if supplier is None:
+                    supplier = Supplier(id=row['supplier_id'], name=row['supplier_name'] or '')
+                    suppliers[supplier.id] = supplier
+                nomenclature = nomenclatures.get(row['nomenclature_id'])
+                if nomenclature is None:
+                    nomenclature = Nomenclature(id=row['nomenclature_id'], name=row['nomenclature_name'] or '',
+                                                unit=row['nomenclature_unit'] or 'шт.')
+                    nomenclatures[nomenclature.id] = nomenclature
+
+                history.setdefault(row[group_key], []).append(SupplierPrice(
+                    id=row['id'],
+                    supplier_id=row['supplier_id'],
+                    nomenclature_id=row['nomenclature_id'],
+                    supplier=supplier,
+                    nomenclature=nomenclature,
+                    price=Decimal(str(row['price'])),
+                    currency=row['currency'] or 'RUB',
+                    start_date=date.fromisoformat(row['start_date']) if row['start_date'] else date.today(),
+                    end_date=date.fromisoformat(row['end_date']) if row['end_date'] else None,
+                    min_quantity=Decimal(str(row['min_quantity'] or 1))
+                ))
+
+        return history
+
     # ===== CRUD для events =====
 
+    def _row_to_event(self, row) -> Event:
+        """Собрать мероприятие из строки таблицы events"""
+        # Парсим время
+        event_time = time(10, 0)  # По умолчанию 10:00
+        if row['start_time']:
+            try:
+                if ':' in row['start_time']:
+                    hours, minutes = map(int, row['start_time'].split(':'))
+                    event_time = time(hours, minutes)
+            except:
+                pass
+
+        return Event(
+            id=row['id'],
+            name=row['name'],
+            event_date=date.fromisoformat(row['event_date']),
+            start_time=event_time,
+            guests_count=row['guests_count'],
+            budget=Decimal(str(row['budget'])),
+            description=row['description'] or '',
+            status=row['status'] or 'планируется',
+            location=row['location'] or '',
+            responsible_person=row['responsible_person'] or '',
+            created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else datetime.now()
+        )
+
     def get_all_events(self) -> List[Event]:
         """Получить все мероприятия"""
-        events = []
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM events ORDER BY event_date DESC")
-            rows = cursor.fetchall()
+            return [self._row_to_event(row) for row in cursor.fetchall()]
 
-            for row in rows:
-                # Парсим время
-                event_time = time(10, 0)  # По умолчанию 10:00
-                if row['start_time']:
-                    try:
-                        if ':' in row['start_time']:
-                            hours, minutes = map(int, row['start_time'].split(':'))
-                            event_time = time(hours, minutes)
-                    except:
-                        pass
-
-                events.append(Event(
-                    id=row['id'],
-                    name=row['name'],
-                    event_date=date.fromisoformat(row['event_date']),
-                    start_time=event_time,
-                    guests_count=row['guests_count'],
-                    budget=Decimal(str(row['budget'])),
-                    description=row['description'] or '',
-                    status=row['status'] or 'планируется',
-                    location=row['location'] or '',
-                    responsible_person=row['responsible_person'] or '',
-                    created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else datetime.now()
+    def get_event_by_id(self, event_id: int) -> Optional[Event]:
+        """Получить мероприятие по ID"""
+        with self.get_connection() as conn:
+            row = conn.execute("SELECT * FROM events WHERE id = ?", (event_id,)).fetchone()
+            return self._row_to_event(row) if row else None
+
+    def get_order_timelines(self, event_ids: List[int]) -> Dict[int, List[Tuple[datetime, Decimal]]]:
+        """Хронология заказов (дата, сумма) по нескольким мероприятиям одним запросом"""
+        timelines: Dict[int, List[Tuple[datetime, Decimal]]] = {event_id: [] for event_id in event_ids}
+        if not event_ids:
+            return timelines
+
+        placeholders = ", ".join("?" * len(event_ids))
+        with self.get_connection() as conn:
+            cursor = conn.execute(f"""
+                SELECT event_id, order_date, total_amount
+                FROM orders
+                WHERE event_id IN ({placeholders}) AND order_date IS NOT NULL
+                ORDER BY event_id, order_date
+            """, list(event_ids))
+
+            for row in cursor:
+                timelines[row['event_id']].append((
+                    datetime.fromisoformat(row['order_date']),
+                    Decimal(str(row['total_amount'] or 0))
                 ))
 
-        return events
+        return timelines
+
+    def get_event_days(self, date_from: date, date_to: date) -> Dict[date, EventDayStats]:
+        """Мероприятия по дням за период одним запросом (число, бюджет, статусы)"""
+        days: Dict[date, EventDayStats] = {}
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT event_date, status, COUNT(*) as events_count, SUM(budget) as budget
+                FROM events
+                WHERE event_date >= ? AND event_date <= ?
+                GROUP BY event_date, status
+            """, (date_from.isoformat(), date_to.isoformat()))
+
+            for row in cursor:
+                day = date.fromisoformat(row['event_date'])
+                stats = days.get(day)
+                if stats is None:
+                    stats = days[day] = EventDayStats(day)
+                stats.events_count += row['events_count']
+                stats.budget += Decimal(str(row['budget'] or 0))
+                stats.statuses[row['status']] = row['events_count']
+
+        return days
 
     def add_event(self, event: Event) -> int:
         """Добавить новое мероприятие"""
@@ -614,10 +767,52 @@ class DatabaseManager:
             conn.commit()
             return True
 
+    def create_order(self, order: Order) -> int:
+        """Сохранить заказ вместе с позициями"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO orders (order_number, event_id, order_date, status, total_amount, notes, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (
+                order.order_number,
+                order.event_id,
+                order.order_date.isoformat(sep=' ', timespec='seconds'),
+                order.status,
+                float(order.total_amount),
+                order.notes,
+                order.created_at.isoformat(sep=' ', timespec='seconds')
+            ))
+            order_id = cursor.lastrowid
+
+            cursor.executemany("""
+                INSERT INTO order_items
+                (order_id, nomenclature_id, supplier_id, quantity, unit_price, total_price,
+                 notes, delivery_date, delivery_time)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(
+                order_id,
+                item.nomenclature_id,
+                item.supplier_id,
+                float(item.quantity),
+                float(item.unit_price),
+                float(item.total_price),
+                item.notes,
+                item.delivery_date.isoformat() if item.delivery_date else None,
+                item.delivery_time.isoformat() if item.delivery_time else None
+            ) for item in order.items])
+
+            conn.commit()
+            return order_id
+
     def delete_order(self, order_id: int) -> Tuple[bool, str]:
         """Удалить заказ"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            # Вычитаем уже учтенные позиции заказа из сводных расходов
+            self._apply_spend_rollup(cursor, "oi.order_id = ? AND oi.id <= ?",
+                                     (order_id, self._get_rollup_watermark(cursor)), sign=-1)
             cursor.execute("""
                 DELETE FROM orders WHERE id = ?
             """, (order_id,))
@@ -704,6 +899,97 @@ class DatabaseManager:
 
         return orders
 
+    def iter_order_items(self, event_id: Optional[int] = None,
+                         batch_size: int = ITER_BATCH_SIZE) -> Iterator[tuple]:
+        """
+        Потоковое чтение позиций заказов пачками (fetchmany).
+        Строки - кортежи в порядке ORDER_ITEM_EXPORT_COLUMNS
+        """
+        where = "WHERE o.event_id = ?" if event_id is not None else ""
+        params = (event_id,) if event_id is not None else ()
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None  # Кортежи вместо sqlite3.Row
+            cursor.execute(f"""
+                SELECT o.order_number, o.order_date, e.name, n.name, n.unit, c.name,
+                       s.name, oi.quantity, oi.unit_price, oi.total_price, oi.notes
+                FROM order_items oi
+                JOIN orders o ON oi.order_id = o.id
+                LEFT JOIN events e ON o.event_id = e.id
+                LEFT JOIN nomenclatures n ON oi.nomenclature_id = n.id
+                LEFT JOIN cost_categories c ON n.category_id = c.id
+                LEFT JOIN suppliers s ON oi.supplier_id = s.id
+                {where}
+                ORDER BY oi.id
+            """, params)
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+
+    def count_order_items(self, event_id: Optional[int] = None) -> int:
+        """Количество позиций заказов (для хода выгрузки)"""
+        where = "WHERE o.event_id = ?" if event_id is not None else ""
+        params = (event_id,) if event_id is not None else ()
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT COUNT(*) FROM order_items oi
+                JOIN orders o ON oi.order_id = o.id
+                {where}
+            """, params)
+            return cursor.fetchone()[0]
+
+    def get_event_orders_overview(self, event_id: int) -> List[tuple]:
+        """Заказы мероприятия: (номер, дата, статус, позиций, сумма, примечания)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute("""
+                SELECT o.order_number, o.order_date, o.status, COUNT(oi.id), o.total_amount, o.notes
+                FROM orders o
+                LEFT JOIN order_items oi ON oi.order_id = o.id
+                WHERE o.event_id = ?
+                GROUP BY o.id
+                ORDER BY o.order_date, o.id
+            """, (event_id,))
+            return cursor.fetchall()
+
+    def get_event_suppliers(self, event_id: int) -> List[tuple]:
+        """Поставщики мероприятия: (название, контакт, телефон, email, рейтинг)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute("""
+                SELECT s.name, s.contact_person, s.phone, s.email, s.rating
+                FROM suppliers s
+                WHERE s.id IN (
+                    SELECT oi.supplier_id FROM order_items oi
+                    JOIN orders o ON oi.order_id = o.id
+                    WHERE o.event_id = ?
+                )
+                ORDER BY s.name
+            """, (event_id,))
+            return cursor.fetchall()
+
+    def get_event_categories(self, event_id: int) -> List[str]:
+        """Категории затрат, встречающиеся в заказах мероприятия"""
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT DISTINCT c.name
+                FROM order_items oi
+                JOIN orders o ON oi.order_id = o.id
+                JOIN nomenclatures n ON oi.nomenclature_id = n.id
+                JOIN cost_categories c ON n.category_id = c.id
+                WHERE o.event_id = ?
+                ORDER BY c.name
+            """, (event_id,))
+            return [row[0] for row in cursor]
+
     # ===== Работа с budget_controls =====
 
     def get_budget_for_event(self, event_id: int) -> List[BudgetControl]:
@@ -752,17 +1038,15 @@ class DatabaseManager:
             event_row = cursor.fetchone()
             total_budget = Decimal(str(event_row['budget'])) if event_row else Decimal('0')
 
-            # Получаем расходы по категориям
+            # Получаем расходы по категориям из сводной таблицы
             cursor.execute("""
                 SELECT 
                     c.id as category_id,
                     c.name as category_name,
-                    COALESCE(SUM(oi.total_price), 0) as total_spent
-                FROM cost_categories c
-                LEFT JOIN nomenclatures n ON c.id = n.category_id
-                LEFT JOIN order_items oi ON n.id = oi.nomenclature_id
-                LEFT JOIN orders o ON oi.order_id = o.id
-                WHERE o.event_id = ? OR o.event_id IS NULL
+                    SUM(r.total_amount) as total_spent
+                FROM daily_spend_rollup r
+                JOIN cost_categories c ON r.category_id = c.id
+                WHERE r.event_id = ?
                 GROUP BY c.id, c.name
                 HAVING total_spent > 0
                 ORDER BY total_spent DESC
@@ -784,6 +1068,273 @@ class DatabaseManager:
 
         return report_items
 
+    def get_event_summary(self, event_id: int) -> Optional[EventSummary]:
+        """Сводка по мероприятию: заказы, расходы, использование бюджета, категории"""
+        event = self.get_event_by_id(event_id)
+        if not event:
+            return None
+
+        with self.get_connection() as conn:
+            row = conn.execute("""
+                SELECT COUNT(*) as orders_count, COALESCE(SUM(total_amount), 0) as total
+                FROM orders WHERE event_id = ?
+            """, (event_id,)).fetchone()
+
+        total_amount = Decimal(str(row['total']))
+
+        # Рассчитываем использование бюджета
+        if event.budget == Decimal('0'):
+            budget_utilization = 0.0
+        else:
+            budget_utilization = float(total_amount / event.budget * 100)
+
+        return EventSummary(
+            event=event,
+            total_orders=row['orders_count'],
+            total_amount=total_amount,
+            budget_utilization=budget_utilization,
+            categories_summary=self.get_expense_report(event_id)
+        )
+
+    # ===== Сводные расходы =====
+
+    def _get_rollup_watermark(self, cursor) -> int:
+        """Последняя учтенная в сводных таблицах позиция заказа"""
+        cursor.execute("SELECT last_item_id FROM rollup_watermarks WHERE name = ?", (ROLLUP_DAILY_SPEND,))
+        row = cursor.fetchone()
+        return row['last_item_id'] if row else 0
+
+    def _set_rollup_watermark(self, cursor, last_item_id: int):
+        """Сохранить водяной знак сводных таблиц"""
+        cursor.execute("""
+            INSERT INTO rollup_watermarks (name, last_item_id, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                last_item_id = excluded.last_item_id,
+                updated_at = excluded.updated_at
+        """, (ROLLUP_DAILY_SPEND, last_item_id, datetime.now().isoformat()))
+
+    def _apply_spend_rollup(self, cursor, where: str, params: tuple, sign: int = 1):
+        """Прибавить (sign=1) или вычесть (sign=-1) позиции заказов из сводных расходов"""
+        cursor.execute(f"""
+            INSERT INTO daily_spend_rollup
+            (day, category_id, supplier_id, event_id, total_amount, items_count)
+            SELECT
+                COALESCE(date(o.order_date), ''),
+                COALESCE(n.category_id, 0),
+                COALESCE(oi.supplier_id, 0),
+                COALESCE(o.event_id, 0),
+                ? * SUM(oi.total_price),
+                ? * COUNT(*)
+            FROM order_items oi
+            JOIN orders o ON oi.order_id = o.id
+            LEFT JOIN nomenclatures n ON oi.nomenclature_id = n.id
+            WHERE {where}
+            GROUP BY 1, 2, 3, 4
+            ON CONFLICT(day, category_id, supplier_id, event_id) DO UPDATE SET
+                total_amount = total_amount + excluded.total_amount,
+                items_count = items_count + excluded.items_count
+        """, (sign, sign) + tuple(params))
+        cursor.execute("DELETE FROM daily_spend_rollup WHERE items_count <= 0")
+
+    def refresh_spend_rollups(self) -> int:
+        """Дописать в сводные расходы позиции, появившиеся после водяного знака"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+
+            last_item_id = self._get_rollup_watermark(cursor)
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM order_items")
+            max_item_id = cursor.fetchone()[0]
+
+            if max_item_id <= last_item_id:
+                conn.rollback()
+                return 0
+
+            cursor.execute("""
+                SELECT COUNT(*) FROM order_items WHERE id > ? AND id <= ?
+            """, (last_item_id, max_item_id))
+            new_items = cursor.fetchone()[0]
+
+            self._apply_spend_rollup(cursor, "oi.id > ? AND oi.id <= ?", (last_item_id, max_item_id))
+            self._set_rollup_watermark(cursor, max_item_id)
+            conn.commit()
+
+        logger.info(f"Сводные расходы обновлены: +{new_items} позиций")
+        return new_items
+
+    def rebuild_spend_rollups(self) -> int:
+        """Полностью пересчитать сводные расходы по всем позициям заказов"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("DELETE FROM daily_spend_rollup")
+
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM order_items")
+            max_item_id = cursor.fetchone()[0]
+
+            self._apply_spend_rollup(cursor, "oi.id <= ?", (max_item_id,))
+            self._set_rollup_watermark(cursor, max_item_id)
+
+            cursor.execute("SELECT COUNT(*) FROM daily_spend_rollup")
+            rows_count = cursor.fetchone()[0]
+            conn.commit()
+
+        logger.info(f"Сводные расходы пересчитаны: {rows_count} строк")
+        return rows_count
+
+    def get_spend_totals(self, group_by: str = 'event_id',
+                         date_from: Optional[date] = None, date_to: Optional[date] = None,
+                         event_id: Optional[int] = None) -> Dict[Any, Decimal]:
+        """
+        Суммы расходов из сводной таблицы с группировкой по
+        дню (day), категории, поставщику или мероприятию
+        """
+        if group_by not in ROLLUP_DIMENSIONS:
+            raise ValueError(f"Недопустимая группировка: {group_by}")
+
+        conditions = []
+        params: List[Any] = []
+        if date_from:
+            conditions.append("day >= ?")
+            params.append(date_from.isoformat())
+        if date_to:
+            conditions.append("day <= ?")
+            params.append(date_to.isoformat())
+        if event_id is not None:
+            conditions.append("event_id = ?")
+            params.append(event_id)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        totals: Dict[Any, Decimal] = {}
+        with self.get_connection() as conn:
+            cursor = conn.execute(f"""
+                SELECT {group_by} as key, SUM(total_amount) as total
+                FROM daily_spend_rollup
+                {where}
+                GROUP BY {group_by}
+                ORDER BY {group_by}
+            """, params)
+
+            for row in cursor:
+                key = row['key']
+                if group_by == 'day':
+                    key = date.fromisoformat(key) if key else None
+                totals[key] = Decimal(str(row['total']))
+
+        return totals
+
+    def get_completed_events_signature(self) -> str:
+        """Отпечаток набора завершенных мероприятий (меняется при завершении новых)"""
+        with self.get_connection() as conn:
+            row = conn.execute("""
+                SELECT COALESCE(group_concat(id), '') as ids
+                FROM (SELECT id FROM events WHERE status = 'завершено' ORDER BY id)
+            """).fetchone()
+        return row['ids']
+
+    def get_completed_event_spend(self) -> List[Tuple[int, int, int, str, Decimal]]:
+        """
+        Расходы завершенных мероприятий по категориям (из сводной таблицы):
+        (id мероприятия, гостей, id категории, категория, сумма)
+        """
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT e.id as event_id, e.guests_count, r.category_id,
+                       c.name as category_name, SUM(r.total_amount) as total
+                FROM events e
+                JOIN daily_spend_rollup r ON r.event_id = e.id
+                JOIN cost_categories c ON r.category_id = c.id
+                WHERE e.status = 'завершено'
+                GROUP BY e.id, e.guests_count, r.category_id, c.name
+                ORDER BY e.id, r.category_id
+            """)
+            return [
+                (row['event_id'], row['guests_count'] or 0, row['category_id'],
+                 row['category_name'], Decimal(str(row['total'])))
+                for row in cursor
+            ]
+
+    # ===== Журнал изменений =====
+
+    def get_last_change_id(self) -> int:
+        """Номер последнего изменения в журнале"""
+        with self.get_connection() as conn:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM change_log").fetchone()[0]
+
+    def get_export_checkpoint(self, name: str) -> Optional[int]:
+        """Последний выгруженный номер изменения (None - выгрузок еще не было)"""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT last_change_id FROM export_checkpoints WHERE name = ?", (name,)
+            ).fetchone()
+        return row['last_change_id'] if row else None
+
+    def save_export_checkpoint(self, name: str, change_id: int):
+        """Сохранить контрольную точку и удалить записи журнала, выгруженные всеми"""
+        with self.get_connection() as conn:
+            conn.execute("""
+                INSERT INTO export_checkpoints (name, last_change_id, updated_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    last_change_id = excluded.last_change_id,
+                    updated_at = excluded.updated_at
+            """, (name, change_id, datetime.now().isoformat()))
+            conn.execute("""
+                DELETE FROM change_log
+                WHERE id <= (SELECT MIN(last_change_id) FROM export_checkpoints)
+            """)
+            conn.commit()
+
+    def iter_order_item_changes(self, since_id: Optional[int], until_id: int,
+                                batch_size: int = ITER_BATCH_SIZE) -> Iterator[tuple]:
+        """
+        Позиции заказов, измененные в журнале после since_id (до until_id включительно).
+        Изменение заказа затрагивает все его позиции. since_id=None - все позиции.
+        Строки: (операция, id позиции, поля ORDER_ITEM_EXPORT_COLUMNS);
+        удаленные позиции (и позиции удаленных заказов) - с полями None
+        """
+        if since_id is None:
+            changed = "SELECT oi.id AS item_id FROM order_items oi JOIN orders o ON oi.order_id = o.id"
+            params: tuple = ()
+        else:
+            changed = """
+                SELECT row_id AS item_id FROM change_log
+                WHERE table_name = 'order_items' AND id > ? AND id <= ?
+                UNION
+                SELECT oi.id FROM change_log cl
+                JOIN order_items oi ON oi.order_id = cl.row_id
+                WHERE cl.table_name = 'orders' AND cl.id > ? AND cl.id <= ?
+            """
+            params = (since_id, until_id, since_id, until_id)
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None  # Кортежи вместо sqlite3.Row
+            cursor.execute(f"""
+                WITH changed AS ({changed})
+                SELECT CASE WHEN oi.id IS NULL THEN '{CHANGE_DELETE}' ELSE '{CHANGE_UPSERT}' END,
+                       ch.item_id,
+                       o.order_number, o.order_date, e.name, n.name, n.unit, c.name,
+                       s.name, oi.quantity, oi.unit_price, oi.total_price, oi.notes
+                FROM changed ch
+                LEFT JOIN order_items oi ON oi.id = ch.item_id
+                    AND EXISTS (SELECT 1 FROM orders WHERE id = oi.order_id)
+                LEFT JOIN orders o ON oi.order_id = o.id
+                LEFT JOIN events e ON o.event_id = e.id
+                LEFT JOIN nomenclatures n ON oi.nomenclature_id = n.id
+                LEFT JOIN cost_categories c ON n.category_id = c.id
+                LEFT JOIN suppliers s ON oi.supplier_id = s.id
+                ORDER BY ch.item_id
+            """, params)
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+
     # ===== Утилиты =====
 
     def populate_test_data(self):
@@ -15,3 +15,83 @@ CREATE TABLE IF NOT EXISTS settings (
 
 -- Добавление индекса для оптимизации поиска
 CREATE INDEX IF NOT EXISTS idx_settings_id ON settings(id);
+
+-- История цен: выборка по позиции (и поставщику) в порядке дат
+CREATE INDEX IF NOT EXISTS idx_supplier_prices_history
+    ON supplier_prices(nomenclature_id, supplier_id, start_date);
+
+-- Сводные расходы по дням: день заказа, категория, поставщик, мероприятие
+-- (0 вместо NULL, чтобы ключ оставался уникальным)
+CREATE TABLE IF NOT EXISTS daily_spend_rollup (
+    day TEXT NOT NULL,
+    category_id INTEGER NOT NULL DEFAULT 0,
+    supplier_id INTEGER NOT NULL DEFAULT 0,
+    event_id INTEGER NOT NULL DEFAULT 0,
+    total_amount REAL NOT NULL DEFAULT 0,
+    items_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, category_id, supplier_id, event_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_daily_spend_rollup_event
+    ON daily_spend_rollup(event_id, category_id);
+
+-- Водяные знаки инкрементального обновления сводных таблиц
+CREATE TABLE IF NOT EXISTS rollup_watermarks (
+    name TEXT PRIMARY KEY,
+    last_item_id INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT
+);
+
+-- Хронология заказов мероприятия (прогноз расходов)
+CREATE INDEX IF NOT EXISTS idx_orders_event_date ON orders(event_id, order_date);
+
+-- Календарь мероприятий: выборка месяца по дате (индекс покрывает запрос целиком)
+CREATE INDEX IF NOT EXISTS idx_events_date ON events(event_date, status, budget);
+
+-- Журнал изменений заказов и позиций (инкрементальная выгрузка)
+CREATE TABLE IF NOT EXISTS change_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    row_id INTEGER NOT NULL,
+    operation TEXT NOT NULL,  -- I, U, D
+    changed_at TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_change_log_table ON change_log(table_name, id);
+
+CREATE TRIGGER IF NOT EXISTS trg_orders_insert AFTER INSERT ON orders
+BEGIN
+    INSERT INTO change_log (table_name, row_id, operation) VALUES ('orders', NEW.id, 'I');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_orders_update AFTER UPDATE ON orders
+BEGIN
+    INSERT INTO change_log (table_name, row_id, operation) VALUES ('orders', NEW.id, 'U');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_orders_delete AFTER DELETE ON orders
+BEGIN
+    INSERT INTO change_log (table_name, row_id, operation) VALUES ('orders', OLD.id, 'D');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_order_items_insert AFTER INSERT ON order_items
+BEGIN
+    INSERT INTO change_log (table_name, row_id, operation) VALUES ('order_items', NEW.id, 'I');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_order_items_update AFTER UPDATE ON order_items
+BEGIN
+    INSERT INTO change_log (table_name, row_id, operation) VALUES ('order_items', NEW.id, 'U');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_order_items_delete AFTER DELETE ON order_items
+BEGIN
+    INSERT INTO change_log (table_name, row_id, operation) VALUES ('order_items', OLD.id, 'D');
+END;
+
+-- Контрольные точки выгрузок: последний выгруженный номер изменения
+CREATE TABLE IF NOT EXISTS export_checkpoints (
+    name TEXT PRIMARY KEY,
+    last_change_id INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT
+);
@@ -66,6 +66,12 @@ def main():
         tables_exist = controller.db.check_tables_exist()
         logger.info(f"Таблицы в БД: {tables_exist}")
 
+        # Индексы и служебные таблицы
+        controller.db.ensure_schema()
+
+        # Догоняем сводные расходы, если заказы менялись вне приложения
+        controller.refresh_spend_rollups()
+
         # Проверяем, не существует ли уже экземпляр окна
         if MainWindow._instance is not None:
             # Попробуем сфокусироваться на существующем окне
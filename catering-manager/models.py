@@ -5,7 +5,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime, date, time
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, List, Optional
 import uuid
 
 
@@ -235,3 +235,55 @@ class EventSummary:
     total_amount: Decimal
     budget_utilization: float
     categories_summary: List[ExpenseReportItem]
+
+
+@dataclass
+class EventDayStats:
+    """Мероприятия одного дня (для календаря): число, общий бюджет и статусы"""
+    day: date
+    events_count: int = 0
+    budget: Decimal = Decimal('0.00')
+    statuses: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class BudgetProjection:
+    """Прогноз расходов мероприятия на дату проведения"""
+    event_id: int
+    budget: Decimal
+    spent: Decimal
+    projected_amount: Decimal
+    daily_rate: Decimal = Decimal('0.00')
+    days_left: int = 0
+    projected_percentage: float = 0.0
+
+    def __post_init__(self):
+        """Расчет прогнозируемого процента использования бюджета"""
+        if self.budget == Decimal('0.00'):
+            self.projected_percentage = 0.0
+        else:
+            self.projected_percentage = float(self.projected_amount / self.budget * 100)
+
+    @property
+    def projected_overrun(self) -> Decimal:
+        """Прогнозируемое превышение бюджета"""
+        return max(self.projected_amount - self.budget, Decimal('0.00'))
+
+
+@dataclass
+class BudgetEstimate:
+    """Оценка бюджета мероприятия по завершенным мероприятиям похожего размера"""
+    guests_count: int
+    total_amount: Decimal
+    per_guest: Decimal
+    categories: Dict[str, Decimal] = field(default_factory=dict)
+    similar_events: List[int] = field(default_factory=list)
+
+
+@dataclass
+class ChangeExportResult:
+    """Итог выгрузки изменений: режим, число строк и сохраненная контрольная точка"""
+    full: bool
+    upserts: int
+    deletes: int
+    checkpoint: int
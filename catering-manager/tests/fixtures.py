@@ -0,0 +1,80 @@
+"""
+Общие заготовки тестов: временная копия базы и заменители виджетов Tk
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from database import DatabaseManager
+
+
+class DatabaseTestCase(unittest.TestCase):
+    """База тестов: копия демонстрационной базы во временной папке (схема и сводные таблицы обновлены)"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.db_path = self.temp_dir / "catering.db"
+        shutil.copy(Path(__file__).parent.parent / "catering.db", self.db_path)
+        self.db = DatabaseManager(self.db_path)
+        self.db.ensure_schema()
+        self.db.refresh_spend_rollups()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+class FakeTimerWidget:
+    """Заменитель виджета Tk: отложенные вызовы выполняются по команде теста"""
+
+    def __init__(self):
+        self.timers = {}
+        self._next = 0
+
+    def after(self, delay, callback, *args):
+        self._next += 1
+        self.timers[self._next] = lambda: callback(*args)
+        return self._next
+
+    def after_idle(self, callback, *args):
+        return self.after(0, callback, *args)
+
+    def after_cancel(self, timer_id):
+        self.timers.pop(timer_id, None)
+
+    def winfo_exists(self):
+        return True
+
+    def fire(self):
+        timers, self.timers = self.timers, {}
+        for callback in timers.values():
+            callback()
+
+
+class FakeTree:
+    """Заменитель Treeview: порядок строк и счетчик вызовов Tk"""
+
+    def __init__(self):
+        self.order = []
+        self.values = {}
+        self.calls = 0
+
+    def insert(self, parent, index, iid, values, tags):
+        self.calls += 1
+        self.order.insert(index, iid)
+        self.values[iid] = values
+
+    def item(self, iid, values, tags):
+        self.calls += 1
+        self.values[iid] = values
+
+    def move(self, iid, parent, index):
+        self.calls += 1
+        self.order.remove(iid)
+        self.order.insert(index, iid)
+
+    def delete(self, iid):
+        self.calls += 1
+        self.order.remove(iid)
+        del self.values[iid]
@@ -0,0 +1,87 @@
+"""
+Тесты прогноза и оценки бюджета
+"""
+
+import unittest
+from datetime import datetime, date
+from decimal import Decimal
+
+from models import *
+from utils.budget_projection import BudgetForecaster
+from utils.budget_estimator import BudgetEstimator
+
+
+class TestBudgetForecaster(unittest.TestCase):
+    """Тесты прогноза расходов"""
+
+    def test_project(self):
+        """Прогноз по хронологии заказов нескольких мероприятий"""
+        today = date(2025, 10, 10)
+        steady = Event(id=1, name="Ровный темп", event_date=date(2025, 10, 20), budget=Decimal('100000'))
+        single = Event(id=2, name="Один заказ", event_date=date(2025, 10, 20), budget=Decimal('100000'))
+        empty = Event(id=3, name="Без заказов", event_date=date(2025, 10, 20), budget=Decimal('100000'))
+        past = Event(id=4, name="Прошедшее", event_date=date(2025, 10, 1), budget=Decimal('10000'))
+
+        timelines = {
+            # 10 000 в день
+            1: [(datetime(2025, 10, d), Decimal('10000')) for d in range(1, 11)],
+            2: [(datetime(2025, 10, 5), Decimal('5000'))],
+            3: [],
+            4: [(datetime(2025, 9, 1), Decimal('6000')), (datetime(2025, 9, 20), Decimal('6000'))],
+        }
+
+        projections = BudgetForecaster.project([steady, single, empty, past], timelines, today)
+
+        # 100 000 потрачено + 10 дней по 10 000
+        self.assertEqual(projections[1].spent, Decimal('100000.0'))
+        self.assertEqual(projections[1].daily_rate, Decimal('10000.0'))
+        self.assertEqual(projections[1].projected_amount, Decimal('200000.0'))
+        self.assertEqual(projections[1].projected_percentage, 200.0)
+        self.assertEqual(projections[1].projected_overrun, Decimal('100000.0'))
+
+        # Тренд не определен - прогноз равен факту
+        self.assertEqual(projections[2].projected_amount, Decimal('5000.0'))
+        self.assertEqual(projections[3].projected_amount, Decimal('0.0'))
+
+        # Мероприятие уже прошло
+        self.assertEqual(projections[4].days_left, 0)
+        self.assertEqual(projections[4].projected_amount, Decimal('12000.0'))
+
+        self.assertEqual(BudgetForecaster.project([], {}), {})
+
+
+class TestBudgetEstimator(unittest.TestCase):
+    """Тесты оценки бюджета по завершенным мероприятиям"""
+
+    def test_estimate(self):
+        """Оценка по ближайшим по числу гостей мероприятиям"""
+        rows = [
+            # (мероприятие, гостей, категория, название, сумма)
+            (1, 50, 1, "Кухня", Decimal('50000')),
+            (1, 50, 2, "Напитки", Decimal('10000')),
+            (2, 100, 1, "Кухня", Decimal('100000')),
+            (3, 1000, 1, "Кухня", Decimal('3000000')),
+            (3, 1000, 3, "Аренда", Decimal('1000000')),
+            (4, 0, 1, "Кухня", Decimal('999')),  # Без гостей - не учитывается
+        ]
+        estimator = BudgetEstimator(rows, signature="1,2,3,4")
+
+        estimate = estimator.estimate(100, neighbours=1)
+        self.assertEqual(estimate.similar_events, [2])
+        self.assertEqual(estimate.total_amount, Decimal('100000.0'))
+        self.assertEqual(estimate.per_guest, Decimal('1000.0'))
+        self.assertEqual(estimate.categories, {"Кухня": Decimal('100000.0')})
+
+        estimate = estimator.estimate(60, neighbours=2)
+        self.assertEqual(sorted(estimate.similar_events), [1, 2])
+        self.assertEqual(list(estimate.categories)[0], "Кухня")
+        self.assertIn("Напитки", estimate.categories)
+        self.assertNotIn("Аренда", estimate.categories)
+        self.assertEqual(estimate.total_amount, sum(estimate.categories.values()))
+
+        self.assertIsNone(estimator.estimate(0))
+        self.assertIsNone(BudgetEstimator([]).estimate(100))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+"""
+Тесты диаграмм
+"""
+
+import unittest
+from datetime import date
+
+from matplotlib.backend_bases import MouseEvent
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from models import *
+from utils.chart_hover import BlitHover, BarHoverIndex, PointHoverIndex
+from utils.chart_service import (ChartService, CHART_EXPENSE_CATEGORIES, daily_spend_chart_data, expense_chart_data,
+                                 price_history_chart_data)
+from utils.downsampling import Downsampler
+from utils.live_plots import ExpenseAnalysisPlot, PriceHistoryPlot, SpendTimelinePlot
+from tests.fixtures import DatabaseTestCase
+
+
+class TestChartService(DatabaseTestCase):
+    """Тесты построения диаграмм с кэшем PNG"""
+
+    def setUp(self):
+        super().setUp()
+        self.charts = ChartService(self.temp_dir, max_entries=2)
+        self.data = ("Выставка", (("Напитки", 1000.0, 800.0), ("Еда", 2000.0, 2500.0)))
+
+    def test_cache_hit(self):
+        """Повторный запрос тех же данных берется из кэша"""
+        path = self.charts.render(CHART_EXPENSE_CATEGORIES, self.data)
+        self.assertEqual(path.read_bytes()[:4], b"\x89PNG")
+        self.assertEqual(self.charts.render(CHART_EXPENSE_CATEGORIES, self.data), path)
+        self.assertEqual((self.charts.hits, self.charts.misses), (1, 1))
+
+        # Другой размер - другая диаграмма
+        self.assertNotEqual(self.charts.render(CHART_EXPENSE_CATEGORIES, self.data, size=(4, 3)), path)
+
+    def test_eviction_and_empty_data(self):
+        """Лимит кэша, пустые данные и неизвестный вид диаграммы"""
+        for budget in range(4):
+            data = ("Выставка", (("Напитки", float(budget), 1.0),))
+            self.charts.render(CHART_EXPENSE_CATEGORIES, data)
+        self.assertEqual(len(list(self.temp_dir.glob("*.png"))), 2)
+
+        self.assertIsNone(self.charts.render(CHART_EXPENSE_CATEGORIES, ("Пусто", ())))
+        with self.assertRaises(ValueError):
+            self.charts.render("unknown", self.data)
+
+    def test_future(self):
+        """Построение в рабочем потоке по сводке из БД"""
+        data = expense_chart_data(self.db.get_event_summary(1))
+        self.assertTrue(data[1])
+        path = self.charts.submit(CHART_EXPENSE_CATEGORIES, data).result(timeout=30)
+        self.assertEqual(path.parent, self.temp_dir)
+        self.assertTrue(path.exists())
+
+    def test_price_history_labels(self):
+        """Ряды истории цен подписаны поставщиками, прайс поставщика - позициями"""
+        history = self.db.get_price_history(None, supplier_id=1)
+        self.assertTrue(history)
+        data = price_history_chart_data(history, by_nomenclature=True)
+        self.assertEqual([label for label, _ in data],
+                         [prices[0].nomenclature.name for prices in history.values()])
+
+        nomenclature_id = next(iter(history))
+        data = price_history_chart_data(self.db.get_price_history(nomenclature_id, supplier_id=1))
+        self.assertEqual([label for label, _ in data], [history[nomenclature_id][0].supplier.name])
+
+
+class TestLivePlots(unittest.TestCase):
+    """Тесты постоянных диаграмм"""
+
+    def test_expense_analysis_updates_artists(self):
+        """Те же категории - обновляются готовые элементы, результат как при построении заново"""
+        plot = ExpenseAnalysisPlot(Figure())
+        plot.update(("Выставка", (("Напитки", 1000.0, 800.0), ("Еда", 2000.0, 2500.0))))
+        wedges = plot.wedges
+
+        data = ("Банкет", (("Напитки", 500.0, 300.0), ("Еда", 4000.0, 900.0)))
+        self.assertTrue(plot.update(data))
+        self.assertFalse(plot.rebuilt)
+        self.assertIs(plot.wedges, wedges)
+        self.assertEqual(plot.title.get_text(), "Анализ расходов - Банкет")
+        self.assertEqual([bar.get_height() for bar in plot.actual_bars], [300.0, 900.0])
+
+        fresh = ExpenseAnalysisPlot(Figure())
+        fresh.update(data)
+        for updated, built in zip(plot.wedges, fresh.wedges):
+            self.assertAlmostEqual(updated.theta1, built.theta1)
+            self.assertAlmostEqual(updated.theta2, built.theta2)
+        self.assertEqual([t.get_text() for t in plot.pie_percents], [t.get_text() for t in fresh.pie_percents])
+        for updated, built in zip(plot.pie_labels, fresh.pie_labels):
+            self.assertAlmostEqual(updated.get_position()[0], built.get_position()[0])
+
+        # Другие категории - фигура строится заново, пустые данные - очищается
+        plot.update(("Банкет", (("Напитки", 500.0, 300.0),)))
+        self.assertTrue(plot.rebuilt)
+        self.assertEqual(plot.rebuilds, 2)
+        self.assertFalse(plot.update(("Пусто", ())))
+
+    def test_price_history_updates_lines(self):
+        """Те же поставщики - меняются только точки линий"""
+        figure = Figure()
+        plot = PriceHistoryPlot(figure)
+        plot.update((("Поставщик", ((date(2025, 1, 1), 100.0), (date(2025, 2, 1), 110.0))),))
+        axes = plot.ax
+
+        plot.update((("Поставщик", ((date(2025, 3, 1), 90.0),)),))
+        self.assertFalse(plot.rebuilt)
+        self.assertIs(plot.ax, axes)
+        self.assertEqual(list(plot.lines[0].get_ydata()), [90.0])
+        self.assertEqual(len(figure.axes), 1)
+
+
+class TestChartHover(unittest.TestCase):
+    """Тесты подсказок при наведении на диаграммы"""
+
+    def setUp(self):
+        self.figure = Figure(figsize=(8, 4))
+        FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        self.names = [f"Мероприятие {i}" for i in range(500)]
+
+    def test_bar_index(self):
+        """Поиск столбца под курсором"""
+        bars = self.ax.bar(range(500), [10.0] * 500)
+        index = BarHoverIndex(bars, self.names)
+
+        self.assertEqual(index.hit(250.1, 5.0), ((250.0, 10.0), "Мероприятие 250"))
+        self.assertIsNone(index.hit(250.5, 5.0))  # Промежуток между столбцами
+        self.assertIsNone(index.hit(250.0, 11.0))  # Выше столбца
+        self.assertIsNone(index.hit(-5.0, 5.0))
+        self.assertIsNone(index.hit(None, None))
+
+    def test_point_index_and_blit(self):
+        """Поиск точки в пикселях и перерисовка только при смене элемента"""
+        values = [float(i % 7) for i in range(500)]
+        self.ax.plot(range(500), values, marker='o')
+        hover = BlitHover(self.figure)
+        hover.add(self.ax, PointHoverIndex(self.ax, range(500), values, self.names))
+        self.figure.canvas.draw()
+
+        index = hover._targets[0][1]
+        self.assertEqual(index.hit(100.0, values[100])[1], "Мероприятие 100")
+        self.assertIsNone(index.hit(100.0, -3.0))
+
+        x, y = self.ax.transData.transform((100, values[100]))
+        blits = []
+        self.figure.canvas.blit = lambda bbox=None: blits.append(bbox)
+        for _ in range(3):
+            self.figure.canvas.callbacks.process(
+                'motion_notify_event', MouseEvent('motion_notify_event', self.figure.canvas, x, y)
+            )
+        self.assertEqual(len(blits), 1)
+        self.assertFalse(hover._targets[0][2].get_visible())
+
+
+class TestDownsampling(DatabaseTestCase):
+    """Тесты прореживания временных рядов"""
+
+    def test_lttb_keeps_shape(self):
+        """Число точек по порогу, края и выброс сохраняются"""
+        xs = [float(i) for i in range(10000)]
+        ys = [1.0] * 10000
+        ys[4321] = 500.0
+
+        indexes = Downsampler.lttb(xs, ys, 200)
+        self.assertEqual(len(indexes), 200)
+        self.assertEqual((indexes[0], indexes[-1]), (0, 9999))
+        self.assertIn(4321, indexes)
+        self.assertEqual(indexes, sorted(indexes))
+
+        # Короткий ряд не прореживается
+        self.assertEqual(Downsampler.lttb(xs[:10], ys[:10], 200), list(range(10)))
+
+    def test_resample_on_zoom(self):
+        """На оси не больше точек, чем пикселей; при масштабе ряд прореживается заново"""
+        start = date(2020, 1, 1).toordinal()
+        data = tuple((date.fromordinal(start + i), float(i % 30)) for i in range(2000))
+
+        plot = SpendTimelinePlot(Figure(figsize=(4, 3), dpi=100))
+        plot.update(data)
+        limit = Downsampler.points_for_width(plot.ax.bbox.width)
+        self.assertLessEqual(len(plot.line.get_xdata()), limit)
+
+        first_day = Downsampler.x_value(data[100][0])
+        plot.ax.set_xlim(first_day, first_day + 40)
+        shown = plot.line.get_xdata()
+        self.assertEqual(len(shown), 43)  # 41 видимый день и по соседней точке с краев
+
+        # Новые данные - пределы и точки пересчитываются по всему ряду (масштаб сбрасывается)
+        plot.update(data[:500])
+        self.assertFalse(plot.rebuilt)
+        x_min, x_max = plot.ax.get_xlim()
+        self.assertLessEqual(x_min, Downsampler.x_value(data[0][0]))
+        self.assertGreaterEqual(x_max, Downsampler.x_value(data[499][0]))
+        self.assertLessEqual(len(plot.line.get_xdata()), limit)
+        self.assertEqual(plot.line.get_xdata()[-1], Downsampler.x_value(data[499][0]))
+
+    def test_daily_spend_data(self):
+        """Ряд расходов по дням из сводной таблицы"""
+        data = daily_spend_chart_data(self.db.get_spend_totals('day'))
+        self.assertEqual([day for day, _ in data], sorted(day for day, _ in data))
+        self.assertTrue(all(isinstance(amount, float) for _, amount in data))
+
+
+if __name__ == '__main__':
+    unittest.main()
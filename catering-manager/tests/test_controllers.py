@@ -91,6 +91,24 @@ class TestCateringController(unittest.TestCase):
         self.assertEqual(self.controller._get_budget_status_color(1.0), "red")
         self.assertEqual(self.controller._get_budget_status_color(1.1), "red")
 
+    def test_estimate_event_budget(self):
+        """Матрица оценки бюджета пересчитывается только при завершении мероприятий"""
+        self.mock_db.get_completed_events_signature.return_value = "5"
+        self.mock_db.get_completed_event_spend.return_value = [
+            (5, 100, 1, "Кухня", Decimal('100000'))
+        ]
+
+        estimate = self.controller.estimate_event_budget(50)
+        self.assertEqual(estimate.total_amount, Decimal('50000.0'))
+
+        self.controller.estimate_event_budget(200)
+        self.assertEqual(self.mock_db.get_completed_event_spend.call_count, 1)
+
+        # Завершилось новое мероприятие
+        self.mock_db.get_completed_events_signature.return_value = "5,7"
+        self.controller.estimate_event_budget(50)
+        self.assertEqual(self.mock_db.get_completed_event_spend.call_count, 2)
+
     @patch('controllers.Validators')
     def test_check_order_deadline(self, mock_validators):
         """Тест проверки дедлайна заказа"""
@@ -0,0 +1,178 @@
+"""
+Тесты для работы с базой данных
+"""
+
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+from database import DatabaseManager
+from models import *
+
+# Демонстрационная база из репозитория (копируется во временную папку)
+SOURCE_DB = Path(__file__).parent.parent / "catering.db"
+
+
+class TestDatabaseManager(unittest.TestCase):
+    """Тесты для менеджера базы данных"""
+
+    def setUp(self):
+        """Настройка перед каждым тестом"""
+        self.temp_dir = tempfile.mkdtemp()
+        db_path = Path(self.temp_dir) / "catering.db"
+        shutil.copy(SOURCE_DB, db_path)
+
+        self.db = DatabaseManager(db_path)
+        self.db.ensure_schema()
+
+    def tearDown(self):
+        """Очистка после теста"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_price_history(self):
+        """Тест истории цен"""
+        self.db.add_supplier_price(SupplierPrice(
+            supplier_id=1, nomenclature_id=1, price=Decimal('500'), start_date=date(2025, 6, 1)
+        ))
+        self.db.add_supplier_price(SupplierPrice(
+            supplier_id=1, nomenclature_id=1, price=Decimal('480'), start_date=date(2024, 6, 1)
+        ))
+
+        history = self.db.get_price_history(1)
+
+        self.assertIn(1, history)
+        for prices in history.values():
+            dates = [p.start_date for p in prices]
+            self.assertEqual(dates, sorted(dates))
+            self.assertTrue(all(p.supplier_id == prices[0].supplier_id for p in prices))
+
+        self.assertEqual(
+            [p.price for p in history[1]],
+            [Decimal('480'), Decimal('450'), Decimal('500')]
+        )
+        self.assertTrue(history[1][0].supplier.name)
+
+        # Фильтр по поставщику и периоду
+        history = self.db.get_price_history(1, supplier_id=1, date_to=date(2024, 12, 31))
+        self.assertEqual(list(history.keys()), [1])
+        self.assertEqual([p.price for p in history[1]], [Decimal('480')])
+
+        # Нет цен
+        self.assertEqual(self.db.get_price_history(99999), {})
+
+    def test_supplier_price_history(self):
+        """Тест истории цен поставщика без выбранной позиции"""
+        self.db.add_supplier_price(SupplierPrice(
+            supplier_id=1, nomenclature_id=1, price=Decimal('500'), start_date=date(2025, 6, 1)
+        ))
+        self.db.add_supplier_price(SupplierPrice(
+            supplier_id=1, nomenclature_id=2, price=Decimal('300'), start_date=date(2025, 6, 1)
+        ))
+
+        history = self.db.get_price_history(None, supplier_id=1)
+
+        # Ряды сгруппированы по позициям, все цены - одного поставщика
+        self.assertIn(1, history)
+        self.assertIn(2, history)
+        for nomenclature_id, prices in history.items():
+            self.assertTrue(all(p.nomenclature_id == nomenclature_id for p in prices))
+            self.assertTrue(all(p.supplier_id == 1 for p in prices))
+            self.assertTrue(prices[0].nomenclature.name)
+            dates = [p.start_date for p in prices]
+            self.assertEqual(dates, sorted(dates))
+
+        # Без позиции и поставщика история не запрашивается
+        with self.assertRaises(ValueError):
+            self.db.get_price_history(None)
+
+    def test_price_history_uses_index(self):
+        """Запрос истории цен использует индекс"""
+        with self.db.get_connection() as conn:
+            plan = conn.execute("""
+                EXPLAIN QUERY PLAN
+                SELECT * FROM supplier_prices
+                WHERE nomenclature_id = ? ORDER BY supplier_id, start_date
+            """, (1,)).fetchall()
+
+        details = " ".join(row['detail'] for row in plan)
+        self.assertIn("idx_supplier_prices_history", details)
+        self.assertNotIn("TEMP B-TREE", details)
+
+    def _raw_spend_by_event(self):
+        """Расходы по мероприятиям, посчитанные по сырым позициям заказов"""
+        with self.db.get_connection() as conn:
+            rows = conn.execute("""
+                SELECT o.event_id, SUM(oi.total_price) as total
+                FROM order_items oi JOIN orders o ON oi.order_id = o.id
+                GROUP BY o.event_id
+            """).fetchall()
+        return {row['event_id']: Decimal(str(row['total'])) for row in rows}
+
+    def test_spend_rollups_incremental(self):
+        """Инкрементальное обновление сводных расходов совпадает с полным пересчетом"""
+        self.assertGreater(self.db.refresh_spend_rollups(), 0)
+        self.assertEqual(self.db.get_spend_totals('event_id'), self._raw_spend_by_event())
+
+        # Повторное обновление без новых позиций ничего не меняет
+        self.assertEqual(self.db.refresh_spend_rollups(), 0)
+
+        order = Order(event_id=1, order_date=datetime(2025, 10, 5, 12, 0))
+        order.add_item(OrderItem(nomenclature_id=1, supplier_id=1,
+                                 quantity=Decimal('2'), unit_price=Decimal('100')))
+        order_id = self.db.create_order(order)
+
+        self.assertEqual(self.db.refresh_spend_rollups(), 1)
+        self.assertEqual(self.db.get_spend_totals('event_id'), self._raw_spend_by_event())
+
+        daily = self.db.get_spend_totals('day', date_from=date(2025, 10, 5), date_to=date(2025, 10, 5))
+        self.assertEqual(daily, {date(2025, 10, 5): Decimal('200.0')})
+
+        incremental = self.db.get_spend_totals('category_id')
+        self.db.rebuild_spend_rollups()
+        self.assertEqual(self.db.get_spend_totals('category_id'), incremental)
+
+        # Удаление заказа вычитает его позиции из сводной таблицы
+        self.db.delete_order(order_id)
+        self.assertEqual(self.db.get_spend_totals('day', date_from=date(2025, 10, 5),
+                                                  date_to=date(2025, 10, 5)), {})
+
+        with self.assertRaises(ValueError):
+            self.db.get_spend_totals('order_id')
+
+    def test_completed_event_spend(self):
+        """Расходы завершенных мероприятий по категориям"""
+        self.db.refresh_spend_rollups()
+        signature = self.db.get_completed_events_signature()
+
+        with self.db.get_connection() as conn:
+            conn.execute("UPDATE events SET status = 'завершено' WHERE id = 1")
+            conn.commit()
+
+        self.assertNotEqual(self.db.get_completed_events_signature(), signature)
+
+        rows = self.db.get_completed_event_spend()
+        self.assertTrue(rows)
+        self.assertTrue(all(row[0] == 1 for row in rows))
+        self.assertEqual(sum(row[4] for row in rows), self._raw_spend_by_event()[1])
+
+    def test_event_summary_read_only(self):
+        """Сводка по мероприятию через соединение только для чтения"""
+        self.db.refresh_spend_rollups()
+        read_only = DatabaseManager(self.db.db_path, read_only=True)
+
+        summary = read_only.get_event_summary(1)
+        self.assertEqual(summary.event.id, 1)
+        self.assertEqual(summary.total_orders, len(self.db.get_orders_for_event(1)))
+        self.assertTrue(summary.categories_summary)
+        self.assertIsNone(read_only.get_event_summary(99999))
+
+        with self.assertRaises(sqlite3.OperationalError):
+            read_only.add_category(CostCategory(name="Запись запрещена"))
+
+
+if __name__ == '__main__':
+    unittest.main()
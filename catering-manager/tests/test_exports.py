@@ -0,0 +1,425 @@
+"""
+Тесты экспорта отчетов и выгрузок
+"""
+
+import csv
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from time import monotonic, sleep
+
+import openpyxl
+
+from models import *
+from utils.batch_reports import BatchReportRunner
+from utils.chart_service import ChartService
+from utils.export_utils import ExportUtils
+from utils.event_book import EventBookExporter
+from utils.export_jobs import ExportCancelled, ExportJob, ExportJobQueue, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+from utils.incremental_export import IncrementalExporter
+from utils.pdf_export import PdfReportRenderer
+from utils.stream_export import StreamExporter, ORDER_ITEM_EXPORT
+from tests.fixtures import DatabaseTestCase
+
+
+class TestBatchReportRunner(DatabaseTestCase):
+    """Тесты пакетной генерации отчетов"""
+
+    def test_run(self):
+        """Отчеты формируются в пуле процессов, ошибки не прерывают пакет"""
+        output_dir = self.temp_dir / "reports"
+        progress = []
+
+        results = BatchReportRunner(self.db_path, output_dir, max_workers=2,
+                                    chart_cache_dir=self.temp_dir / "charts").run([1, 3, 999], progress.append)
+
+        self.assertEqual(sorted(p[0] for p in progress), [1, 2, 3])
+        self.assertIsInstance(results[999], ValueError)
+        for event_id in (1, 3):
+            files = [Path(f) for f in results[event_id]]
+            self.assertEqual(sorted(f.suffix for f in files), ['.png', '.xlsx'])
+            self.assertTrue(all(f.exists() for f in files))
+        self.assertTrue(list((self.temp_dir / "charts").glob("*.png")))
+
+    def test_cancel_from_report(self):
+        """Исключение из report прерывает пакет: не начатые отчеты не формируются"""
+        output_dir = self.temp_dir / "reports"
+
+        def report(progress):
+            raise ExportCancelled("Пакет отчетов")
+
+        runner = BatchReportRunner(self.db_path, output_dir, max_workers=1,
+                                   chart_cache_dir=self.temp_dir / "charts")
+        with self.assertRaises(ExportCancelled):
+            runner.run([1, 2, 3, 4, 5, 6], report)
+        self.assertLess(len(list(output_dir.glob("*.xlsx"))), 6)
+
+
+class TestExcelExport(unittest.TestCase):
+    """Тесты потоковой выгрузки в Excel"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_export_order_items(self):
+        """Строки из генератора пишутся с общими именованными стилями"""
+        def rows():
+            for i in range(2500):
+                yield (f"ORD-{i}", "2025-10-01 14:30:00", "Выставка", "Кофе", "шт.", "Напитки",
+                       "Поставщик", 2.0, 150.0, 300.0, None)
+
+        filename = self.temp_dir / "items.xlsx"
+        self.assertEqual(ExportUtils.export_order_items_to_excel(rows(), filename), 2500)
+
+        wb = openpyxl.load_workbook(filename)
+        ws = wb.active
+        self.assertEqual(ws.max_row, 2501)
+        self.assertEqual(ws['A1'].value, "Номер заказа")
+        self.assertEqual(ws['A1'].style, "vostok_header")
+        self.assertEqual(ws['J2501'].value, 300.0)
+        self.assertEqual(ws['J2501'].style, "vostok_money")
+        self.assertEqual(ws['B2'].value, datetime(2025, 10, 1, 14, 30))
+
+    def test_export_expense_report(self):
+        """Итоги отчета по расходам - формулами"""
+        summary = EventSummary(
+            event=Event(id=1, name="Выставка", budget=Decimal('100000')),
+            total_orders=1,
+            total_amount=Decimal('30000'),
+            budget_utilization=30.0,
+            categories_summary=[
+                ExpenseReportItem("Кухня", Decimal('10000'), Decimal('20000')),
+                ExpenseReportItem("Напитки", Decimal('0'), Decimal('10000')),
+            ]
+        )
+        filename = self.temp_dir / "expenses.xlsx"
+        self.assertTrue(ExportUtils.export_expense_report_to_excel(summary, filename))
+
+        ws = openpyxl.load_workbook(filename).active
+        self.assertEqual(ws['A9'].value, "Категория затрат")
+        self.assertEqual(ws['E10'].style, "vostok_percent_warning")
+        self.assertEqual(ws['C12'].value, "=SUM(C10:C11)")
+
+
+class TestStreamExporter(DatabaseTestCase):
+    """Тесты потоковой выгрузки в CSV и NDJSON"""
+
+    def test_csv_and_ndjson(self):
+        """Позиции заказов пишутся из курсора с преобразованием денежных колонок"""
+        rows = [
+            ("ORD-1", datetime(2025, 10, 1, 14, 30), "Выставка", "Кофе", "шт.", "Напитки",
+             "Поставщик", Decimal('2'), Decimal('150'), 300.0, None),
+        ]
+
+        csv_path = self.temp_dir / "items.csv"
+        self.assertEqual(StreamExporter.to_csv(iter(rows), ORDER_ITEM_EXPORT, csv_path), 1)
+        with open(csv_path, encoding='utf-8-sig', newline='') as f:
+            header, line = list(csv.reader(f))
+        self.assertEqual(header[0], "Номер заказа")
+        self.assertEqual(line[1], "2025-10-01T14:30:00")
+        self.assertEqual(line[8:], ["150.00", "300.00", ""])
+
+        json_path = self.temp_dir / "items.ndjson"
+        self.assertEqual(StreamExporter.to_ndjson(iter(rows), ORDER_ITEM_EXPORT, json_path), 1)
+        record = json.loads(json_path.read_text(encoding='utf-8'))
+        self.assertEqual(record["quantity"], 2.0)
+        self.assertEqual(record["unit_price"], 150.0)
+        self.assertIsNone(record["notes"])
+
+        # Выгрузка всей базы: по строке на позицию
+        count = StreamExporter.to_ndjson(self.db.iter_order_items(batch_size=7), ORDER_ITEM_EXPORT, json_path)
+        with open(json_path, encoding='utf-8') as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), count)
+        self.assertEqual(count, len(list(self.db.iter_order_items())))
+
+
+class TestPdfReportRenderer(DatabaseTestCase):
+    """Тесты отчетов в PDF"""
+
+    def setUp(self):
+        super().setUp()
+        self.charts = ChartService(self.temp_dir / "charts")
+
+    def test_event_report(self):
+        """Отчет по мероприятию с диаграммой и позициями из БД"""
+        filename = self.temp_dir / "event.pdf"
+        pages = PdfReportRenderer.export_event(self.db, 1, filename, self.charts)
+
+        self.assertGreaterEqual(pages, 1)
+        self.assertEqual(filename.read_bytes()[:4], b"%PDF")
+
+        with self.assertRaises(ValueError):
+            PdfReportRenderer.export_event(self.db, 99999, filename, self.charts)
+
+    def test_track_and_cancel(self):
+        """Позиции читаются через track задачи экспорта; отмена прерывает верстку"""
+        job = ExportJob(1, "PDF", lambda job: None)
+        PdfReportRenderer.export_event(self.db, 1, self.temp_dir / "event.pdf", self.charts,
+                                       lambda rows: job.track(rows, self.db.count_order_items(1)))
+        self.assertEqual(job.done, self.db.count_order_items(1))
+
+        job.cancel()
+        with self.assertRaises(ExportCancelled):
+            PdfReportRenderer.export_portfolio(self.db.get_all_events(), {}, self.temp_dir / "all.pdf",
+                                               self.charts, job.track)
+
+    def test_markup_in_names(self):
+        """Символы разметки reportlab в названиях выводятся как текст"""
+        event_id = self.db.add_event(Event(name="Банкет <b>VIP & x<y>", budget=Decimal("1000")))
+        pages = PdfReportRenderer.export_event(self.db, event_id, self.temp_dir / "markup.pdf", self.charts)
+        self.assertGreaterEqual(pages, 1)
+
+        pages = PdfReportRenderer.export_portfolio(self.db.get_all_events(), {}, self.temp_dir / "all.pdf",
+                                                   self.charts)
+        self.assertGreaterEqual(pages, 1)
+
+    def test_large_report_is_paged(self):
+        """Позиции из генератора верстаются частями на нескольких страницах"""
+        summary = self.db.get_event_summary(1)
+        consumed = []
+
+        def rows():
+            for i in range(300):
+                consumed.append(i)
+                yield (f"ORD-{i}", "2025-10-01 14:30:00", "Выставка", "Кофе", "шт.", "Напитки",
+                       "Поставщик", 2.0, 150.0, 300.0, None)
+
+        pages = PdfReportRenderer.render_event_summary(summary, self.temp_dir / "big.pdf", None, rows())
+        self.assertGreater(pages, 300 // 40)
+        self.assertEqual(len(consumed), 300)
+
+    def test_portfolio(self):
+        """Общий отчет по всем мероприятиям"""
+        filename = self.temp_dir / "portfolio.pdf"
+        pages = PdfReportRenderer.export_portfolio(
+            self.db.get_all_events(), self.db.get_spend_totals('event_id'), filename, self.charts
+        )
+        self.assertGreaterEqual(pages, 1)
+        self.assertTrue(filename.exists())
+
+
+class TestExportJobQueue(unittest.TestCase):
+    """Тесты очереди задач экспорта"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.jobs = ExportJobQueue(self.temp_dir, max_workers=2)
+
+    def tearDown(self):
+        self.jobs.shutdown()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _wait(self, job, timeout: float = 10):
+        """Опрашивать очередь, как это делает главное окно, до завершения задачи"""
+        deadline = monotonic() + timeout
+        while not job.finished and monotonic() < deadline:
+            self.jobs.dispatch()
+            sleep(0.01)
+        self.jobs.dispatch()
+
+    def test_progress_and_completion(self):
+        """Ход выполнения передается подписчикам, итог - один раз"""
+        updates, results, errors = [], [], []
+        self.jobs.add_listener(lambda job: updates.append((job.status, job.done)))
+
+        def export(job):
+            return sum(1 for _ in job.track(range(2000), 2000))
+
+        job = self.jobs.submit("Строки", export, on_done=results.append)
+        failed = self.jobs.submit("Ошибка", lambda job: 1 / 0, on_error=errors.append)
+        self._wait(job)
+        self._wait(failed)
+        self.jobs.dispatch()
+
+        self.assertEqual(job.status, JOB_DONE)
+        self.assertEqual(results, [2000])
+        self.assertEqual(job.progress, 1.0)
+        self.assertIsNotNone(job.duration)
+        self.assertIn((JOB_DONE, 2000), updates)
+
+        self.assertEqual(failed.status, JOB_FAILED)
+        self.assertIsInstance(errors[0], ZeroDivisionError)
+        self.assertEqual({j.id for j in self.jobs.finished_jobs()}, {job.id, failed.id})
+        self.assertEqual(self.jobs.active_jobs(), [])
+
+    def test_failing_callback(self):
+        """Ошибка колбэка итога не мешает итогам других задач"""
+        results = []
+
+        def broken(result):
+            raise RuntimeError("файл не открылся")
+
+        first = self.jobs.submit("Первая", lambda job: 1, on_done=broken)
+        second = self.jobs.submit("Вторая", lambda job: 2, on_done=results.append)
+        while not (first.finished and second.finished):
+            sleep(0.01)
+
+        with self.assertLogs('utils.export_jobs', level='ERROR'):
+            self.assertEqual(self.jobs.dispatch(), 2)
+        self.assertEqual(results, [2])
+
+    def test_cancel_removes_partial_file(self):
+        """Отмененная задача останавливается и не оставляет недописанный файл"""
+        target = self.jobs.output_path("items.csv")
+        started = threading.Event()
+
+        def endless():
+            while True:
+                started.set()
+                yield ("ORD-1", None, "", "", "", "", "", 1, 1.0, 1.0, None)
+
+        job = self.jobs.submit(
+            "Бесконечная выгрузка",
+            lambda job: StreamExporter.to_csv(job.track(endless()), ORDER_ITEM_EXPORT, target),
+            target
+        )
+        self.assertTrue(started.wait(5))
+
+        # Файл уже формируется - второй экспорт в него не ставится
+        with self.assertRaises(ValueError):
+            self.jobs.submit("Повтор", lambda job: None, target)
+        self.assertNotEqual(self.jobs.output_path("items.csv"), target)
+
+        self.assertTrue(self.jobs.cancel(job.id))
+        self._wait(job)
+        self.assertEqual(job.status, JOB_CANCELLED)
+        self.assertFalse(target.exists())
+        self.assertFalse(self.jobs.cancel(job.id))
+
+
+class TestIncrementalExporter(DatabaseTestCase):
+    """Тесты выгрузки изменений для бухгалтерии"""
+
+    def _read(self, filename: Path) -> list:
+        with open(filename, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_incremental_export(self):
+        """Первая выгрузка полная, дальше - только измененные и удаленные позиции"""
+        filename = self.temp_dir / "changes.ndjson"
+        total = self.db.count_order_items()
+
+        result = IncrementalExporter.export(self.db, filename)
+        self.assertTrue(result.full)
+        self.assertEqual(result.upserts, total)
+
+        result = IncrementalExporter.export(self.db, filename)
+        self.assertFalse(result.full)
+        self.assertEqual((result.upserts, result.deletes), (0, 0))
+        self.assertEqual(self._read(filename), [])
+
+        orders = self.db.get_orders_for_event(1)
+        changed, deleted = orders[0], orders[1]
+        with self.db.get_connection() as conn:
+            conn.execute("UPDATE orders SET notes = 'сверено' WHERE id = ?", (changed.id,))
+            conn.commit()
+        deleted_items = self.db.count_order_items(1)
+        self.db.delete_order(deleted.id)
+        deleted_items -= self.db.count_order_items(1)
+
+        result = IncrementalExporter.export(self.db, filename)
+        records = self._read(filename)
+        self.assertEqual(result.deletes, deleted_items)
+        self.assertEqual(len(records), result.upserts + result.deletes)
+        self.assertTrue(all(r["order_number"] == changed.order_number
+                            for r in records if r["op"] == "upsert"))
+        self.assertTrue(all(r["order_number"] is None for r in records if r["op"] == "delete"))
+
+        # Журнал, выгруженный всеми, очищается
+        self.assertEqual(len(list(self.db.iter_order_item_changes(0, self.db.get_last_change_id()))), 0)
+
+        result = IncrementalExporter.export(self.db, self.temp_dir / "full.csv", full=True)
+        self.assertTrue(result.full)
+        self.assertEqual(result.upserts, total - deleted_items)
+
+
+class TestEventBookExporter(DatabaseTestCase):
+    """Тесты книги мероприятия"""
+
+    def test_export(self):
+        """Все листы в одной книге, итоги - формулами"""
+        filename = self.temp_dir / "book.xlsx"
+        counts = EventBookExporter.export(self.db, 1, filename)
+
+        wb = openpyxl.load_workbook(filename)
+        self.assertEqual(wb.sheetnames, ["Сводка", "Заказы", "Позиции", "Поставщики", "Категории"])
+        self.assertEqual(counts["Позиции"], wb["Позиции"].max_row - 1)
+        self.assertEqual(counts["Заказы"], len(self.db.get_orders_for_event(1)))
+
+        summary = {row[0]: row[1] for row in wb["Сводка"].iter_rows(values_only=True) if row and row[0]}
+        self.assertEqual(summary["Мероприятие:"], self.db.get_event_by_id(1).name)
+        self.assertTrue(summary["Потрачено (по позициям):"].startswith("=SUM('Позиции'!$J$2:"))
+
+        orders = wb["Заказы"]
+        self.assertTrue(orders.cell(2, 6).value.startswith("=SUMPRODUCT(('Позиции'!$A$2:"))
+
+        # Поток позиций - через track (ход выполнения и отмена задачи экспорта)
+        tracked = []
+        EventBookExporter.export(self.db, 1, self.temp_dir / "tracked.xlsx",
+                                 lambda rows: (tracked.append(row) or row for row in rows))
+        self.assertEqual(len(tracked), counts["Позиции"])
+        self.assertEqual(orders.cell(orders.max_row, 1).value, "ИТОГО")
+
+        with self.assertRaises(ValueError):
+            EventBookExporter.export(self.db, 99999, filename)
+
+    def test_wildcard_names(self):
+        """Названия с *, ?, ~ и ведущим > сравниваются точно, а не как критерий SUMIF/COUNTIF"""
+        with self.db.get_connection() as conn:
+            supplier_id, category_id = conn.execute("""
+                SELECT oi.supplier_id, n.category_id
+                FROM order_items oi
+                JOIN orders o ON oi.order_id = o.id
+                JOIN nomenclatures n ON oi.nomenclature_id = n.id
+                WHERE o.event_id = 1 LIMIT 1
+            """).fetchone()
+            conn.execute("UPDATE suppliers SET name = '*Мясо?~' WHERE id = ?", (supplier_id,))
+            conn.execute("UPDATE cost_categories SET name = '>Напитки' WHERE id = ?", (category_id,))
+            conn.commit()
+
+        filename = self.temp_dir / "book.xlsx"
+        EventBookExporter.export(self.db, 1, filename)
+        wb = openpyxl.load_workbook(filename)
+
+        for sheet, name in (("Поставщики", "*Мясо?~"), ("Категории", ">Напитки")):
+            ws = wb[sheet]
+            row = next(cells for cells in ws.iter_rows(min_row=2) if cells[0].value == name)
+            formulas = [cell.value for cell in row if isinstance(cell.value, str) and cell.value.startswith("=")]
+            self.assertTrue(formulas)
+            for formula in formulas:
+                self.assertNotIn("SUMIF", formula)
+                self.assertNotIn("COUNTIF", formula)
+            self.assertIn(f"=A{row[0].row})", formulas[0])
+
+    def test_export_event_without_orders(self):
+        """Мероприятие без заказов: итоги - нули, без формул со ссылкой на строку ИТОГО"""
+        event_id = self.db.add_event(Event(name="Пустое мероприятие", budget=Decimal("1000")))
+        filename = self.temp_dir / "empty.xlsx"
+        counts = EventBookExporter.export(self.db, event_id, filename)
+        self.assertEqual(set(counts.values()), {0})
+
+        wb = openpyxl.load_workbook(filename)
+        summary = {row[0]: row[1] for row in wb["Сводка"].iter_rows(values_only=True) if row and row[0]}
+        for label in ("Заказов:", "Позиций:", "Потрачено (по позициям):", "Сумма заказов:"):
+            self.assertEqual(summary[label], 0)
+
+        for sheet in ("Заказы", "Поставщики", "Категории"):
+            ws = wb[sheet]
+            self.assertEqual(ws.max_row, 2)
+            self.assertEqual(ws.cell(2, 1).value, "ИТОГО")
+            totals = [cell.value for cell in ws[2][1:] if cell.value is not None]
+            self.assertTrue(totals)
+            self.assertEqual(set(totals), {0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,521 @@
+"""
+Тесты данных интерфейса, не требующих Tk
+"""
+
+import threading
+import unittest
+from datetime import date
+from decimal import Decimal
+from time import monotonic, sleep
+
+from models import *
+from utils.background import BackgroundLoader
+from utils.calendar_data import CalendarDataProvider, COMPLETED_COLOR, HEAT_COLORS, SELECTED_COLOR, TODAY_COLOR
+from utils.filter_index import FilterIndex
+from utils.page_registry import PageRegistry
+from utils.quick_entry import QuickEntryIndex, load_order_catalogs
+from utils.row_sources import ListSource, PagedSource
+from utils.search_pipeline import SearchPipeline
+from utils.tree_sync import TreeSync, diff_items
+from utils.ui_updates import UiUpdateScheduler
+from utils.view_models import EventRows, NomenclatureRows
+from tests.fixtures import DatabaseTestCase, FakeTimerWidget, FakeTree
+
+
+class TestRowSources(unittest.TestCase):
+    """Тесты источников строк виртуальной таблицы"""
+
+    def test_list_source_formats_requested_rows(self):
+        """Форматируются только запрошенные строки"""
+        formatted = []
+
+        def formatter(number):
+            formatted.append(number)
+            return (number, f"Позиция {number}"), ('active',)
+
+        source = ListSource(list(range(50000)), formatter)
+        rows = source.rows(49990, 30)
+
+        self.assertEqual(len(source), 50000)
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(rows[0], ((49990, "Позиция 49990"), ('active',)))
+        self.assertEqual(len(formatted), 10)
+        self.assertEqual(source.index_of(lambda number: number == 777), 777)
+
+    def test_paged_source_caches_pages(self):
+        """Страницы запрашиваются по мере прокрутки и кэшируются"""
+        fetched = []
+
+        def fetch(offset, limit):
+            fetched.append(offset)
+            return list(range(offset, min(offset + limit, 1000)))
+
+        source = PagedSource(lambda: 1000, fetch, lambda n: ((n,), ()), page_size=100, cache_limit=2)
+        self.assertEqual([row[0][0] for row in source.rows(95, 10)], list(range(95, 105)))
+        self.assertEqual(fetched, [0, 100])
+
+        source.rows(95, 10)
+        self.assertEqual(fetched, [0, 100])  # Из кэша
+
+        self.assertEqual(source.item(999), 999)
+        source.rows(0, 1)
+        self.assertEqual(fetched, [0, 100, 900, 0])  # Первая страница вытеснена
+        with self.assertRaises(IndexError):
+            source.item(1000)
+
+
+class TestFilterIndex(unittest.TestCase):
+    """Тесты индекса фильтрации списков"""
+
+    def setUp(self):
+        self.suppliers = [
+            Supplier(id=1, name="Кофейный двор", contact_person="Иван Петров", rating=4.5),
+            Supplier(id=2, name="Мясной ряд", contact_person="Петр Иванов", rating=3.0),
+            Supplier(id=3, name="Кофе и чай", contact_person="Анна Смирнова", rating=5.0),
+            Supplier(id=4, name="Фрукты", contact_person="", rating=1.0),
+        ]
+        categories = {1: "Напитки", 2: "Мясо", 3: "Напитки", 4: "Фрукты"}
+        self.index = FilterIndex(
+            self.suppliers,
+            text=lambda s: (s.name, s.contact_person),
+            fields={'category': lambda s: categories[s.id], 'rating': lambda s: int(s.rating)}
+        )
+
+    def test_search_by_word_prefix(self):
+        """Каждое слово запроса - начало слова модели, регистр не важен"""
+        self.assertEqual(self.index.match("коф"), [0, 2])
+        self.assertEqual(self.index.match("КОФЕ чай"), [2])
+        self.assertEqual(self.index.match("петр"), [0, 1])
+        self.assertEqual(self.index.match("ряд коф"), [])
+        self.assertEqual(self.index.match("  "), [0, 1, 2, 3])
+
+    def test_buckets(self):
+        """Фильтры по категории и минимальному рейтингу"""
+        self.assertEqual(self.index.match(equals={'category': "Напитки"}), [0, 2])
+        self.assertEqual(self.index.match(equals={'category': "Нет такой"}), [])
+        self.assertEqual(self.index.match(at_least={'rating': 4}), [0, 2])
+        self.assertEqual(self.index.match("коф", {'category': "Напитки"}, {'rating': 5}), [2])
+        self.assertEqual([s.id for s in self.index.items_at([1, 3])], [2, 4])
+
+    def test_large_list(self):
+        """Фильтрация большого списка не перебирает модели"""
+        items = [Nomenclature(id=i, name=f"Позиция {i} {'кофе' if i % 100 == 0 else 'чай'}")
+                 for i in range(50000)]
+        index = FilterIndex(items, text=lambda n: (n.name,), fields={'even': lambda n: n.id % 2 == 0})
+
+        started = monotonic()
+        positions = index.match("кофе", {'even': True})
+        elapsed = monotonic() - started
+
+        self.assertEqual(len(positions), 500)
+        self.assertLess(elapsed, 0.05)
+
+
+class TestSearchPipeline(unittest.TestCase):
+    """Тесты поиска с задержкой ввода"""
+
+    def setUp(self):
+        self.widget = FakeTimerWidget()
+        self.results = []
+        self.search = SearchPipeline(self.widget, lambda items, total: self.results.append((items, total)))
+        names = ["Кофе американо", "Кофе латте", "Капучино", "Чай черный", "Чай зеленый"] * 200
+        self.search.set_index(FilterIndex(
+            [Nomenclature(id=i, name=name) for i, name in enumerate(names)],
+            text=lambda n: (n.name,),
+            fields={'even': lambda n: n.id % 2 == 0}
+        ))
+
+    def test_debounce(self):
+        """Поиск выполняется один раз после паузы в наборе"""
+        for query in ("к", "ко", "коф"):
+            self.search.set_query(query)
+        self.assertEqual(self.results, [])
+        self.assertEqual(len(self.widget.timers), 1)
+
+        self.widget.fire()
+        items, total = self.results[-1]
+        self.assertEqual((len(items), total), (400, 1000))
+        self.assertEqual(self.search.passes, 1)
+
+    def test_incremental_narrowing(self):
+        """Удлинение запроса сужает прежний результат, смена фильтров - полный поиск"""
+        self.search.set_query("кофе")
+        self.search.run_now()
+        self.search.set_query("кофе лат")
+        self.search.run_now()
+        self.assertEqual(len(self.results[-1][0]), 200)
+        self.assertEqual(self.search.narrowed_passes, 1)
+
+        # Тот же запрос - результат из кэша
+        self.search.run_now()
+        self.assertEqual(self.search.passes, 2)
+
+        self.search.set_filters({'even': True})
+        self.assertEqual(len(self.results[-1][0]), 100)
+        self.assertEqual(self.search.narrowed_passes, 1)
+
+        # Запрос укоротился - поиск заново по всему индексу
+        self.search.set_query("ч")
+        self.search.run_now()
+        self.assertEqual(len(self.results[-1][0]), 200)
+        self.assertEqual(self.search.narrowed_passes, 1)
+
+
+class TestBackgroundLoader(unittest.TestCase):
+    """Тесты загрузки данных страниц в рабочих потоках"""
+
+    def setUp(self):
+        self.widget = FakeTimerWidget()
+        self.loader = BackgroundLoader()
+        self.addCleanup(self.loader.shutdown)
+
+    def _pump(self, until, timeout: float = 5.0):
+        """Выполнять опросы главного потока, пока не выполнится условие"""
+        deadline = monotonic() + timeout
+        while not until() and monotonic() < deadline:
+            self.widget.fire()
+            sleep(0.01)
+
+    def test_superseded_request_dropped(self):
+        """Результат замененного запроса не доходит до страницы"""
+        release = threading.Event()
+        results = []
+
+        def slow():
+            release.wait(5)
+            return "старые данные"
+
+        self.loader.load(self.widget, "events", slow, results.append)
+        self.loader.load(self.widget, "events", lambda: "новые данные", results.append)
+        release.set()
+
+        self._pump(lambda: results and not self.loader.is_loading("events") and self.loader.dropped)
+        self.assertEqual(results, ["новые данные"])
+        self.assertEqual(self.loader.dropped, 1)
+
+    def test_error_and_thread(self):
+        """Запрос выполняется не в главном потоке, ошибка передается в on_error"""
+        threads, errors = [], []
+        self.loader.load(self.widget, "a", threading.current_thread, threads.append)
+        self.loader.load(self.widget, "b", lambda: 1 / 0, self.fail, errors.append)
+
+        self._pump(lambda: threads and errors)
+        self.assertIsNot(threads[0], threading.current_thread())
+        self.assertIsInstance(errors[0], ZeroDivisionError)
+
+
+class TestPageRegistry(unittest.TestCase):
+    """Тесты ленивого создания и выгрузки страниц"""
+
+    class Page:
+        def __init__(self, name):
+            self.name = name
+            self.destroyed = False
+
+        def destroy(self):
+            self.destroyed = True
+
+    def setUp(self):
+        self.now = 0.0
+        self.pages = PageRegistry(idle_timeout=600, clock=lambda: self.now)
+        self.pages.register('events', lambda: self.Page('events'), pinned=True)
+        for name in ('nomenclature', 'suppliers', 'reports'):
+            self.pages.register(name, lambda name=name: self.Page(name))
+
+    def test_lazy_creation_and_prewarm(self):
+        """Страница создается при первом переходе; заранее - по одной"""
+        events = self.pages.show('events')
+        self.assertEqual(self.pages.created, 1)
+        self.assertIs(self.pages.show('events'), events)
+
+        self.assertEqual(self.pages.prewarm_next(), 'nomenclature')
+        self.assertEqual(self.pages.created, 2)
+        self.pages.show('reports')
+        self.assertEqual(self.pages.prewarm_next(), 'suppliers')
+        self.assertIsNone(self.pages.prewarm_next())
+        self.assertEqual(self.pages.created, 4)
+
+    def test_idle_unload(self):
+        """Скрытые страницы выгружаются после простоя, текущая и закрепленная - нет"""
+        self.pages.show('events')
+        suppliers = self.pages.show('suppliers')
+        self.pages.show('reports')
+
+        self.now = 599
+        self.assertEqual(self.pages.unload_idle(), [])
+
+        self.now = 700
+        self.pages.show('nomenclature')
+        self.assertEqual(self.pages.unload_idle(), ['suppliers'])
+        self.assertTrue(suppliers.destroyed)
+        self.assertTrue(self.pages.is_loaded('events'))
+
+        # Повторный переход создает страницу заново
+        self.assertIsNot(self.pages.show('suppliers'), suppliers)
+        self.now = 1400
+        self.assertEqual(self.pages.unload_idle(), ['reports', 'nomenclature'])
+        self.assertEqual(self.pages.unloaded, 3)
+
+
+class TestTreeSync(unittest.TestCase):
+    """Тесты обновления таблиц по разнице списков"""
+
+    def test_diff_items(self):
+        """Добавленные, измененные и удаленные - по id"""
+        old = [CostCategory(id=i, name=f"К{i}") for i in range(5)]
+        new = [CostCategory(id=0, name="К0"), CostCategory(id=2, name="Другое"),
+               CostCategory(id=7, name="К7"), CostCategory(id=3, name="К3"), CostCategory(id=4, name="К4")]
+
+        diff = diff_items(old, new)
+        self.assertEqual((diff.inserted, diff.updated, diff.removed), ([7], [2], [1]))
+        self.assertFalse(diff.reordered)
+        self.assertEqual(diff.count, 3)
+        self.assertTrue(diff_items(old, list(reversed(old))).reordered)
+
+    def test_patches_only_changes(self):
+        """После добавления одной строки в таблицу пишется одна строка"""
+        tree = FakeTree()
+        sync = TreeSync(tree, lambda c: ((c.id, c.name), ()))
+        categories = [CostCategory(id=i, name=f"К{i}") for i in range(0, 1000, 2)]
+        sync.update(categories)
+        self.assertEqual(tree.calls, 500)
+
+        tree.calls = 0
+        diff = sync.update(categories[:10] + [CostCategory(id=21, name="Новая")] + categories[10:])
+        self.assertEqual((diff.inserted, tree.calls), (['21'], 1))
+        self.assertEqual(tree.order.index('21'), 10)
+
+        tree.calls = 0
+        renamed = [CostCategory(id=c.id, name="Переименована" if c.id == 4 else c.name) for c in categories]
+        sync.update(list(reversed(renamed)))
+        self.assertEqual(tree.order, [str(c.id) for c in reversed(categories)])
+        self.assertEqual(tree.values['4'], (4, "Переименована"))
+        self.assertEqual(tree.calls, 2 + 500)
+
+
+class TestUiUpdateScheduler(unittest.TestCase):
+    """Тесты схлопывания обновлений интерфейса"""
+
+    def setUp(self):
+        self.widget = FakeTimerWidget()
+        self.ui = UiUpdateScheduler(self.widget)
+        self.statuses, self.budgets = [], []
+        self.spent = Decimal('100')
+        self.ui.register('status', self.statuses.append)
+        self.ui.register('budget', self.budgets.append, compute=lambda: {'spent': self.spent})
+
+    def test_coalesced_updates(self):
+        """Несколько изменений за кадр - один обработчик и одно применение"""
+        for number in range(10):
+            self.ui.set('status', f"Экспорт - {number * 10}%")
+            self.ui.mark_dirty('budget')
+        self.assertEqual(len(self.widget.timers), 1)
+
+        self.widget.fire()
+        self.assertEqual(self.statuses, ["Экспорт - 90%"])
+        self.assertEqual(self.budgets, [{'spent': Decimal('100')}])
+        self.assertEqual((self.ui.flushes, self.ui.computations), (1, 1))
+
+    def test_recompute_only_when_dirty(self):
+        """Бюджет пересчитывается только после mark_dirty и применяется, если изменился"""
+        self.ui.mark_dirty('budget')
+        self.widget.fire()
+
+        self.ui.set('status', "Готов к работе")
+        self.widget.fire()
+        self.assertEqual(self.ui.computations, 1)
+
+        # Данные те же - значение не применяется повторно
+        self.ui.mark_dirty('budget')
+        self.widget.fire()
+        self.assertEqual((self.ui.computations, len(self.budgets)), (2, 1))
+
+        self.spent = Decimal('250')
+        self.ui.mark_dirty('budget')
+        self.widget.fire()
+        self.assertEqual(self.budgets[-1], {'spent': Decimal('250')})
+        self.assertEqual(self.ui.value('budget'), {'spent': Decimal('250')})
+
+
+class TestCalendarData(DatabaseTestCase):
+    """Тесты данных календаря мероприятий"""
+
+    def test_month_query(self):
+        """Дни месяца одним запросом по индексу даты"""
+        for status in ("планируется", "идет"):
+            self.db.add_event(Event(name="Фуршет", event_date=date(2025, 10, 5), budget=Decimal('250000'),
+                                    status=status))
+
+        days = self.db.get_event_days(date(2025, 10, 1), date(2025, 10, 31))
+        stats = days[date(2025, 10, 5)]
+        self.assertEqual(stats.events_count, 3)
+        self.assertEqual(stats.budget, Decimal('1500000'))
+        self.assertEqual(stats.statuses, {"планируется": 2, "идет": 1})
+
+        with self.db.get_connection() as conn:
+            plan = " ".join(row[3] for row in conn.execute("""
+                EXPLAIN QUERY PLAN
+                SELECT event_date, status, COUNT(*), SUM(budget) FROM events
+                WHERE event_date >= '2025-10-01' AND event_date <= '2025-10-31'
+                GROUP BY event_date, status
+            """))
+        self.assertIn("COVERING INDEX idx_events_date", plan)
+
+    def test_provider_cache_and_cells(self):
+        """Месяц запрашивается один раз; цвета дней - выбор, сегодня, число мероприятий"""
+        provider = CalendarDataProvider(self.db.get_event_days, cache_limit=2)
+        october = provider.month(2025, 10)
+        self.assertIs(provider.month(2025, 10), october)
+        self.assertEqual(provider.queries, 1)
+        self.assertEqual(provider.adjacent(2025, 12), [(2025, 11), (2026, 1)])
+
+        provider.month(2025, 11)
+        provider.month(2025, 12)
+        self.assertIsNone(provider.cached(2025, 10))
+
+        days = {date(2025, 10, 5): EventDayStats(date(2025, 10, 5), 2, Decimal('1'), {"планируется": 2}),
+                date(2025, 10, 6): EventDayStats(date(2025, 10, 6), 1, Decimal('1'), {"завершено": 1})}
+        cells = provider.cells(2025, 10, days, selected=date(2025, 10, 20), today=date(2025, 10, 10))
+        # Октябрь 2025 начинается со среды
+        self.assertEqual(len(cells), 42)
+        self.assertEqual((cells[0].text, cells[0].state), ("", "disabled"))
+        by_day = {int(cell.text): cell for cell in cells if cell.text}
+        self.assertEqual(by_day[5].fg_color, HEAT_COLORS[1][1])
+        self.assertEqual(by_day[6].fg_color, COMPLETED_COLOR)
+        self.assertEqual(by_day[10].fg_color, TODAY_COLOR)
+        self.assertEqual(by_day[20].fg_color, SELECTED_COLOR)
+        self.assertEqual((by_day[9].text_color, by_day[11].text_color), ("gray", None))
+
+    def test_invalidate_during_fetch(self):
+        """Результат запроса, начатого до сброса кэша, не сохраняется"""
+        def fetch(date_from, date_to):
+            days = self.db.get_event_days(date_from, date_to)
+            if provider.queries == 0:
+                # Мероприятия изменились, пока выполнялся первый запрос
+                provider.invalidate()
+            return days
+
+        provider = CalendarDataProvider(fetch)
+        provider.month(2025, 10)
+        self.assertIsNone(provider.cached(2025, 10))
+
+        october = provider.month(2025, 10)
+        self.assertIs(provider.cached(2025, 10), october)
+        self.assertEqual(provider.queries, 2)
+
+
+class TestQuickEntryIndex(unittest.TestCase):
+    """Тесты автодополнения и выбора по индексу быстрого ввода"""
+
+    def setUp(self):
+        self.items = [Nomenclature(id=i, name=f"Позиция {i:05d}", unit="шт.") for i in range(50000)]
+        self.items += [Nomenclature(id=50000, name="Кофе Латте", unit="шт."),
+                       Nomenclature(id=50001, name="Кофе латте", unit="шт."),
+                       Nomenclature(id=50002, name="Тёмный шоколад", unit="кг")]
+        self.catalog = QuickEntryIndex(self.items, lambda n: f"{n.name} ({n.unit})")
+
+    def test_complete(self):
+        """Совпадения с началом названия и слов, без учета регистра и ё"""
+        self.assertEqual(self.catalog.complete("поз", limit=3),
+                         ["Позиция 00000 (шт.)", "Позиция 00001 (шт.)", "Позиция 00002 (шт.)"])
+        self.assertEqual(self.catalog.complete("латте"), ["Кофе Латте (шт.)", "Кофе латте (шт.) #50001"])
+        self.assertEqual(self.catalog.complete("темный"), ["Тёмный шоколад (кг)"])
+        self.assertEqual(self.catalog.complete("шокол"), ["Тёмный шоколад (кг)"])
+        self.assertEqual(len(self.catalog.complete("")), 50)
+
+    def test_resolve_by_label(self):
+        """Выбранный текст определяет модель, одинаковые названия различаются id"""
+        self.assertEqual(self.catalog.resolve("Позиция 04242 (шт.)").id, 4242)
+        self.assertEqual(self.catalog.resolve("кофе латте (шт.) #50001").id, 50001)
+        self.assertEqual(self.catalog.resolve("Кофе Латте (шт.)").id, 50000)
+        self.assertIsNone(self.catalog.resolve("Кофе"))
+        self.assertEqual(self.catalog.label(50002), "Тёмный шоколад (кг)")
+
+        started = monotonic()
+        for number in range(1000):
+            self.catalog.complete(f"позиция {number:03d}")
+            self.catalog.resolve(f"Позиция {number:05d} (шт.)")
+        self.assertLess(monotonic() - started, 1.0)
+
+
+    def test_order_catalogs(self):
+        """Справочники формы заказа: в индексах быстрого ввода только активные"""
+        class Controller:
+            def get_all_nomenclatures(self):
+                return [Nomenclature(id=1, name="Сок", unit="л"), Nomenclature(id=2, name="Квас", is_active=False)]
+
+            def get_all_suppliers(self):
+                return [Supplier(id=5, name="Напитки Плюс")]
+
+        catalogs = load_order_catalogs(Controller())
+        self.assertEqual(len(catalogs.nomenclatures), 2)
+        self.assertEqual(len(catalogs.nomenclature_index), 1)
+        self.assertEqual(catalogs.nomenclature_index.resolve("Сок (л)").id, 1)
+        self.assertEqual(catalogs.supplier_index.complete("плюс"), ["Напитки Плюс"])
+
+
+class TestViewModels(unittest.TestCase):
+    """Тесты кэша форматированных строк таблиц"""
+
+    def setUp(self):
+        self.events = [Event(id=i, name=f"Мероприятие {i}", event_date=date(2024, 1, 1 + i % 28),
+                             budget=Decimal("150000.50"), location="Банкетный зал на набережной")
+                       for i in range(20000)]
+        self.projections = {}
+        self.rows = EventRows(self.projections.get)
+
+    def test_row_formatting(self):
+        """Строка мероприятия и прогноз расходов"""
+        self.projections[1] = BudgetProjection(event_id=1, budget=Decimal("100"), spent=Decimal("50"),
+                                               projected_amount=Decimal("150000"))
+        values, tags = self.rows(self.events[1])
+        self.assertEqual(values[2], "02.01.2024")
+        self.assertEqual(values[5], "150,000.50")
+        self.assertEqual(values[6], "⚠ 150,000.00")
+        self.assertEqual(values[8], "Банкетный зал на ...")
+        self.assertEqual(tags, ("планируется",))
+        self.assertEqual(self.rows(self.events[2])[0][6], "—")
+
+    def test_rows_cached_until_version_changes(self):
+        """Повторный показ берет строки из кэша, измененная модель форматируется заново"""
+        started = monotonic()
+        first = self.rows.rows(self.events)
+        formatting = monotonic() - started
+        started = monotonic()
+        second = self.rows.rows(self.events)
+        cached = monotonic() - started
+
+        self.assertEqual(self.rows.misses, 20000)
+        self.assertEqual(self.rows.hits, 20000)
+        self.assertIs(first[5], second[5])
+        self.assertLess(cached, formatting)
+
+        # Изменились поле модели и зависимость (прогноз) - только их строки пересчитываются
+        self.events[5].status = "завершено"
+        self.projections[6] = BudgetProjection(event_id=6, budget=Decimal("100"), spent=Decimal("10"),
+                                               projected_amount=Decimal("20"))
+        third = self.rows.rows(self.events)
+        self.assertEqual(self.rows.misses, 20002)
+        self.assertEqual(third[5][1], ("завершено",))
+        self.assertEqual(third[6][0][6], "20.00")
+
+        self.rows.retain(self.events[:10])
+        self.assertEqual(len(self.rows), 10)
+        self.rows.invalidate(0)
+        self.rows(self.events[0])
+        self.assertEqual(self.rows.misses, 20003)
+
+    def test_dependency_names(self):
+        """Название категории входит в версию строки"""
+        names = {1: "Напитки"}
+        rows = NomenclatureRows(lambda n: names.get(n.category_id, ""))
+        item = Nomenclature(id=1, name="Сок", category_id=1)
+        self.assertEqual(rows(item)[0][2], "Напитки")
+        names[1] = "Безалкогольные напитки"
+        self.assertEqual(rows(item)[0][2], "Безалкогольные напитки")
+        self.assertEqual(rows(item)[1], ("active",))
+        self.assertEqual((rows.hits, rows.misses), (1, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,3 +5,9 @@
 from .validators import *
 from .formatters import *
 from .export_utils import *
+from .background import *
+from .budget_projection import *
+from .budget_estimator import *
+from .excel_stream import *
+from .stream_export import *
+from .export_jobs import *
@@ -0,0 +1,186 @@
+"""
+Фоновое выполнение задач с передачей результата в главный поток Tk
+"""
+
+import logging
+import queue
+import threading
+import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Период опроса результата из главного потока, мс
+POLL_INTERVAL_MS = 50
+# Рабочих потоков загрузчика данных страниц
+LOADER_WORKERS = 2
+
+
+def run_in_background(widget, func: Callable[..., Any],
+                      on_done: Callable[[Any], None],
+                      on_error: Optional[Callable[[Exception], None]] = None,
+                      on_progress: Optional[Callable[[Any], None]] = None) -> threading.Thread:
+    """
+    Выполнить func в отдельном потоке.
+    Результат (или исключение) передается в on_done/on_error в главном потоке через after().
+    Если задан on_progress, func получает функцию report(value) для сообщений о ходе работы
+    """
+    results: "queue.Queue" = queue.Queue(maxsize=1)
+    progress: "queue.Queue" = queue.Queue()
+
+    def worker():
+        try:
+            results.put((True, func(progress.put) if on_progress else func()))
+        except Exception as e:
+            results.put((False, e))
+
+    def drain_progress():
+        while True:
+            try:
+                value = progress.get_nowait()
+            except queue.Empty:
+                return
+            on_progress(value)
+
+    def poll():
+        if on_progress:
+            drain_progress()
+
+        try:
+            success, value = results.get_nowait()
+        except queue.Empty:
+            _schedule()
+            return
+
+        if on_progress:
+            drain_progress()
+
+        if success:
+            on_done(value)
+        elif on_error:
+            on_error(value)
+        else:
+            logger.error(f"Ошибка фоновой задачи: {value}")
+
+    def _schedule():
+        try:
+            widget.after(POLL_INTERVAL_MS, poll)
+        except tk.TclError:
+            # Виджет уже уничтожен - результат никому не нужен
+            pass
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    _schedule()
+    return thread
+
+
+class BackgroundLoader:
+    """
+    Загрузка данных страниц в пуле рабочих потоков. Результат передается
+    в главный поток через after(); запрос заменяет предыдущий с тем же ключом,
+    и результат замененного запроса отбрасывается
+    """
+
+    def __init__(self, max_workers: int = LOADER_WORKERS):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Ключ -> номер последнего запроса и его Future
+        self._generations: Dict[Hashable, int] = {}
+        self._futures: Dict[Hashable, Future] = {}
+        self.dropped = 0
+
+    def load(self, widget, key: Hashable, func: Callable[[], Any],
+             on_done: Callable[[Any], None],
+             on_error: Optional[Callable[[Exception], None]] = None) -> int:
+        """
+        Выполнить func в рабочем потоке; on_done/on_error вызываются в главном потоке,
+        только если за это время не было нового запроса с тем же ключом.
+        Вернуть номер запроса
+        """
+        with self._lock:
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+            previous = self._futures.get(key)
+            if previous is not None:
+                # Еще не начатый запрос не занимает поток
+                previous.cancel()
+            future = self._get_executor().submit(func)
+            self._futures[key] = future
+
+        self._poll(widget, key, generation, future, on_done, on_error)
+        return generation
+
+    def cancel(self, key: Hashable):
+        """Отменить запрос по ключу (результат будет отброшен)"""
+        with self._lock:
+            if key in self._generations:
+                self._generations[key] += 1
+            future = self._futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def is_loading(self, key: Hashable) -> bool:
+        """Есть ли незавершенный запрос с этим ключом"""
+        with self._lock:
+            return key in self._futures
+
+    def shutdown(self):
+        """Остановить пул (при закрытии приложения)"""
+        with self._lock:
+            for key in self._generations:
+                self._generations[key] += 1
+            self._futures.clear()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Пул создается при первом запросе"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="loader")
+        return self._executor
+
+    def _poll(self, widget, key: Hashable, generation: int, future: Future,
+              on_done: Callable[[Any], None], on_error: Optional[Callable[[Exception], None]]):
+        """Дождаться результата опросом из главного потока"""
+        if not self._is_current(key, generation):
+            self._drop(key, generation, future)
+            return
+
+        try:
+            alive = widget.winfo_exists()
+        except tk.TclError:
+            alive = False
+        if not alive:
+            # Страница выгружена - результат никому не нужен
+            self.cancel(key)
+            return
+
+        if not future.done():
+            widget.after(POLL_INTERVAL_MS, self._poll, widget, key, generation, future, on_done, on_error)
+            return
+
+        with self._lock:
+            if self._futures.get(key) is future:
+                del self._futures[key]
+
+        error = future.exception()
+        if error is None:
+            on_done(future.result())
+        elif on_error:
+            on_error(error)
+        else:
+            logger.error(f"Ошибка загрузки данных ({key}): {error}")
+
+    def _is_current(self, key: Hashable, generation: int) -> bool:
+        with self._lock:
+            return self._generations.get(key) == generation
+
+    def _drop(self, key: Hashable, generation: int, future: Future):
+        """Отбросить результат замененного запроса"""
+        future.cancel()
+        self.dropped += 1
+        logger.debug(f"Отброшен устаревший запрос {key} #{generation}")
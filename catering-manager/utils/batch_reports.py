@@ -0,0 +1,115 @@
+"""
+Пакетная генерация отчетов по мероприятиям в пуле процессов
+"""
+
+import logging
+import multiprocessing
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from database import DatabaseManager
+from utils.chart_service import ChartService, CHART_EXPENSE_CATEGORIES, expense_chart_data
+from utils.export_utils import ExportUtils
+from utils.pdf_export import PdfReportRenderer
+
+logger = logging.getLogger(__name__)
+
+
+def generate_event_report(db_path: str, event_id: int, output_dir: str,
+                          report_format: str = "excel", chart_cache_dir: Optional[str] = None) -> List[str]:
+    """
+    Сформировать отчет по одному мероприятию (выполняется в отдельном процессе).
+    Каждый процесс работает со своим соединением только для чтения;
+    chart_cache_dir - папка кэша диаграмм (None - папка по умолчанию)
+    """
+    db = DatabaseManager(Path(db_path), read_only=True)
+    charts = ChartService(Path(chart_cache_dir)) if chart_cache_dir else ChartService()
+    summary = db.get_event_summary(event_id)
+    if not summary:
+        raise ValueError(f"Мероприятие {event_id} не найдено")
+
+    base_name = f"{event_id}_{_safe_filename(summary.event.name)}"
+    output = Path(output_dir)
+
+    if report_format == "pdf":
+        pdf_path = output / f"{base_name}.pdf"
+        PdfReportRenderer.export_event(db, event_id, pdf_path, charts)
+        return [str(pdf_path)]
+
+    files = []
+    chart_path = None
+    cached_chart = charts.render(CHART_EXPENSE_CATEGORIES, expense_chart_data(summary))
+    if cached_chart:
+        chart_path = output / f"{base_name}.png"
+        shutil.copyfile(cached_chart, chart_path)
+        files.append(str(chart_path))
+
+    excel_path = output / f"{base_name}.xlsx"
+    if not ExportUtils.export_expense_report_to_excel(summary, excel_path, chart_path):
+        raise RuntimeError(f"Не удалось сохранить {excel_path.name}")
+    files.append(str(excel_path))
+
+    return files
+
+
+def _safe_filename(name: str) -> str:
+    """Имя мероприятия, пригодное для имени файла"""
+    return re.sub(r'[^\w\-]+', '_', name).strip('_')[:50] or "event"
+
+
+class BatchReportRunner:
+    """Распределяет формирование отчетов по мероприятиям между процессами"""
+
+    def __init__(self, db_path: Path, output_dir: Path, max_workers: Optional[int] = None,
+                 report_format: str = "excel", chart_cache_dir: Optional[Path] = None):
+        self.db_path = str(Path(db_path).resolve())
+        self.output_dir = str(Path(output_dir).resolve())
+        self.chart_cache_dir = str(Path(chart_cache_dir).resolve()) if chart_cache_dir else None
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.report_format = report_format
+
+    def run(self, event_ids: List[int],
+            report: Optional[Callable[[tuple], None]] = None) -> Dict[int, object]:
+        """
+        Сформировать отчеты (блокирующий вызов - запускать в фоне).
+        report((готово, всего, id мероприятия)) вызывается по мере готовности;
+        исключение из report прерывает пакет (ожидаются только начатые отчеты).
+        Результат: id мероприятия -> список файлов или исключение
+        """
+        results: Dict[int, object] = {}
+        if not event_ids:
+            return results
+
+        Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+        workers = min(self.max_workers, len(event_ids))
+
+        # spawn: дочерние процессы не наследуют состояние Tk главного процесса
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = {
+                executor.submit(generate_event_report, self.db_path, event_id, self.output_dir,
+                                self.report_format, self.chart_cache_dir): event_id
+                for event_id in event_ids
+            }
+
+            for done, future in enumerate(as_completed(futures), start=1):
+                event_id = futures[future]
+                try:
+                    results[event_id] = future.result()
+                except Exception as e:
+                    logger.error(f"Ошибка отчета по мероприятию {event_id}: {e}")
+                    results[event_id] = e
+
+                if report:
+                    try:
+                        report((done, len(event_ids), event_id))
+                    except Exception:
+                        # Отмена из report: еще не начатые отчеты не формируются
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        raise
+
+        return results
@@ -0,0 +1,89 @@
+"""
+Оценка бюджета нового мероприятия по завершенным мероприятиям
+"""
+
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models import BudgetEstimate
+
+# Сколько ближайших по размеру мероприятий учитывать
+NEIGHBOURS_COUNT = 3
+
+
+class BudgetEstimator:
+    """
+    Матрица затрат на гостя (мероприятия x категории) по завершенным мероприятиям.
+    Строится один раз на набор завершенных мероприятий (signature)
+    """
+
+    def __init__(self, rows: List[Tuple[int, int, int, str, Decimal]], signature: str = ""):
+        self.signature = signature
+
+        # Колонки матрицы - категории в порядке появления
+        columns: Dict[int, int] = {}
+        self.category_names: List[str] = []
+        events: Dict[int, Tuple[int, Dict[int, float]]] = {}
+
+        for event_id, guests_count, category_id, category_name, total in rows:
+            if guests_count <= 0:
+                continue
+            if category_id not in columns:
+                columns[category_id] = len(self.category_names)
+                self.category_names.append(category_name)
+            _, totals = events.setdefault(event_id, (guests_count, {}))
+            totals[columns[category_id]] = float(total)
+
+        # Строки упорядочены по размеру мероприятия для поиска соседей
+        ordered = sorted(events.items(), key=lambda item: item[1][0])
+        self.event_ids = np.array([event_id for event_id, _ in ordered], dtype=int)
+        self.log_guests = np.log(np.array([guests for _, (guests, _) in ordered], dtype=float))
+        self.per_guest = np.zeros((len(ordered), len(self.category_names)))
+
+        for i, (_, (guests_count, totals)) in enumerate(ordered):
+            for column, total in totals.items():
+                self.per_guest[i, column] = total / guests_count
+
+    @property
+    def is_empty(self) -> bool:
+        """Нет данных для оценки"""
+        return len(self.event_ids) == 0
+
+    def estimate(self, guests_count: int, neighbours: int = NEIGHBOURS_COUNT) -> Optional[BudgetEstimate]:
+        """Оценить бюджет по ближайшим по числу гостей мероприятиям"""
+        if self.is_empty or guests_count <= 0:
+            return None
+
+        # Размер сравнивается в логарифмах: 50 и 100 гостей так же далеки, как 200 и 400
+        target = np.log(guests_count)
+        position = int(np.searchsorted(self.log_guests, target))
+        start = max(position - neighbours, 0)
+        stop = min(position + neighbours, len(self.event_ids))
+
+        distances = np.abs(self.log_guests[start:stop] - target)
+        nearest = start + np.argsort(distances, kind='stable')[:neighbours]
+
+        weights = 1.0 / (np.abs(self.log_guests[nearest] - target) + 0.1)
+        per_guest = weights @ self.per_guest[nearest] / weights.sum()
+        amounts = per_guest * guests_count
+
+        categories = {
+            self.category_names[column]: self._to_money(amounts[column])
+            for column in np.argsort(-amounts, kind='stable')
+            if amounts[column] > 0
+        }
+
+        return BudgetEstimate(
+            guests_count=guests_count,
+            total_amount=self._to_money(amounts.sum()),
+            per_guest=self._to_money(per_guest.sum()),
+            categories=categories,
+            similar_events=[int(event_id) for event_id in self.event_ids[nearest]]
+        )
+
+    @staticmethod
+    def _to_money(value: float) -> Decimal:
+        """Округлить значение до копеек"""
+        return Decimal(str(round(float(value), 2)))
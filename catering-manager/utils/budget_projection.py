@@ -0,0 +1,87 @@
+"""
+Прогноз расходов мероприятий на дату проведения
+"""
+
+from datetime import datetime, date, time
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models import Event, BudgetProjection
+
+# Секунд в сутках (ось времени прогноза - в днях)
+SECONDS_PER_DAY = 86400.0
+
+
+class BudgetForecaster:
+    """Прогноз траектории расходов по хронологии заказов"""
+
+    @staticmethod
+    def project(events: List[Event],
+                timelines: Dict[int, List[Tuple[datetime, Decimal]]],
+                today: Optional[date] = None) -> Dict[int, BudgetProjection]:
+        """
+        Спрогнозировать расходы на дату каждого мероприятия.
+        Накопленные расходы аппроксимируются прямой (МНК) сразу для всех
+        мероприятий: ряды выравниваются в матрицу с маской
+        """
+        if not events:
+            return {}
+
+        today = today or date.today()
+        width = max((len(timelines.get(event.id, [])) for event in events), default=0) or 1
+
+        # Время относительно даты мероприятия (в днях) и суммы заказов
+        t = np.zeros((len(events), width))
+        amounts = np.zeros((len(events), width))
+        mask = np.zeros((len(events), width), dtype=bool)
+        days_left = np.zeros(len(events))
+
+        for i, event in enumerate(events):
+            event_start = datetime.combine(event.event_date, time())
+            days_left[i] = max((event.event_date - today).days, 0)
+
+            points = timelines.get(event.id, [])
+            for j, (order_date, amount) in enumerate(points):
+                t[i, j] = (order_date - event_start).total_seconds() / SECONDS_PER_DAY
+                amounts[i, j] = float(amount)
+            mask[i, :len(points)] = True
+
+        # Накопленные расходы; хвост матрицы заполнен нулями и не меняет сумму
+        spent = np.cumsum(amounts, axis=1)
+        w = mask.astype(float)
+
+        # МНК для y = a + b*t построчно
+        n = w.sum(axis=1)
+        sx = (t * w).sum(axis=1)
+        sy = (spent * w).sum(axis=1)
+        sxx = (t * t * w).sum(axis=1)
+        sxy = (t * spent * w).sum(axis=1)
+        denom = n * sxx - sx ** 2
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = np.where(denom > 1e-9, (n * sxy - sx * sy) / denom, 0.0)
+
+        # Расходы не уменьшаются; прогноз отсчитывается от фактических трат
+        daily_rate = np.clip(slope, 0.0, None)
+        current = spent[:, -1]
+        projected = current + daily_rate * days_left
+
+        projections = {}
+        for i, event in enumerate(events):
+            projections[event.id] = BudgetProjection(
+                event_id=event.id,
+                budget=event.budget,
+                spent=BudgetForecaster._to_money(current[i]),
+                projected_amount=BudgetForecaster._to_money(projected[i]),
+                daily_rate=BudgetForecaster._to_money(daily_rate[i]),
+                days_left=int(days_left[i])
+            )
+
+        return projections
+
+    @staticmethod
+    def _to_money(value: float) -> Decimal:
+        """Округлить значение до копеек"""
+        return Decimal(str(round(float(value), 2)))
@@ -0,0 +1,148 @@
+"""
+Данные календаря мероприятий: статистика по дням месяца (одним запросом,
+с кэшем и подгрузкой соседних месяцев) и состояние кнопок дней
+"""
+
+import calendar
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models import EventDayStats
+
+# Месяцев в кэше
+MONTH_CACHE_LIMIT = 12
+# Кнопок дней в сетке (6 недель)
+CALENDAR_CELLS = 42
+
+# Цвета дней
+SELECTED_COLOR = "#4ECDC4"
+TODAY_COLOR = "#FFD166"
+PAST_TEXT_COLOR = "gray"
+# Все мероприятия дня завершены
+COMPLETED_COLOR = "#A0A0A0"
+# Тепловая карта: (мероприятий в день не меньше, цвет) по возрастанию
+HEAT_COLORS = ((1, "#95D5B2"), (2, "#52B788"), (4, "#2D6A4F"))
+
+Month = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class DayCell:
+    """Состояние кнопки дня (text_color None - цвет текста по умолчанию)"""
+    text: str = ""
+    fg_color: str = "transparent"
+    text_color: Optional[str] = None
+    state: str = "disabled"
+
+
+class CalendarDataProvider:
+    """Статистика мероприятий по дням месяца: fetch(с, по) - запрос за период"""
+
+    def __init__(self, fetch: Callable[[date, date], Dict[date, EventDayStats]],
+                 cache_limit: int = MONTH_CACHE_LIMIT):
+        self.fetch = fetch
+        self.cache_limit = cache_limit
+        self._lock = threading.Lock()
+        self._months: "OrderedDict[Month, Dict[date, EventDayStats]]" = OrderedDict()
+        # Поколение кэша: растет при сбросе, результат более раннего запроса не сохраняется
+        self._generation = 0
+        self.queries = 0
+
+    def month(self, year: int, month: int) -> Dict[date, EventDayStats]:
+        """Дни месяца с мероприятиями (из кэша или запросом); можно вызывать из рабочего потока"""
+        days = self.cached(year, month)
+        if days is not None:
+            return days
+
+        with self._lock:
+            generation = self._generation
+        days = self.fetch(*self.month_range(year, month))
+        with self._lock:
+            self.queries += 1
+            if generation != self._generation:
+                # Кэш сброшен во время запроса: данные могли устареть
+                return days
+            self._months[(year, month)] = days
+            self._months.move_to_end((year, month))
+            while len(self._months) > self.cache_limit:
+                self._months.popitem(last=False)
+        return days
+
+    def cached(self, year: int, month: int) -> Optional[Dict[date, EventDayStats]]:
+        """Дни месяца из кэша (None - месяц еще не загружен)"""
+        with self._lock:
+            days = self._months.get((year, month))
+            if days is not None:
+                self._months.move_to_end((year, month))
+            return days
+
+    def invalidate(self):
+        """Сбросить кэш (мероприятия изменились)"""
+        with self._lock:
+            self._generation += 1
+            self._months.clear()
+
+    @staticmethod
+    def month_range(year: int, month: int) -> Tuple[date, date]:
+        """Первый и последний день месяца"""
+        return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+    @staticmethod
+    def adjacent(year: int, month: int) -> List[Month]:
+        """Предыдущий и следующий месяцы"""
+        first = date(year, month, 1)
+        previous = first - timedelta(days=1)
+        following = first + timedelta(days=31)
+        return [(previous.year, previous.month), (following.year, following.month)]
+
+    @staticmethod
+    def heat_color(stats: Optional[EventDayStats]) -> Optional[str]:
+        """Цвет дня по числу мероприятий (None - мероприятий нет)"""
+        if not stats or not stats.events_count:
+            return None
+        if set(stats.statuses) == {"завершено"}:
+            return COMPLETED_COLOR
+
+        color = None
+        for minimum, heat in HEAT_COLORS:
+            if stats.events_count >= minimum:
+                color = heat
+        return color
+
+    @staticmethod
+    def cells(year: int, month: int, days: Dict[date, EventDayStats],
+              selected: Optional[date] = None, today: Optional[date] = None,
+              marked: Optional[Dict[date, str]] = None) -> List[DayCell]:
+        """Состояние 42 кнопок дней месяца (неделя начинается с понедельника)"""
+        today = today or date.today()
+        marked = marked or {}
+        result: List[DayCell] = []
+
+        for week in calendar.monthcalendar(year, month):
+            for day in week:
+                if day == 0:
+                    result.append(DayCell())
+                    continue
+
+                day_date = date(year, month, day)
+                if selected and day_date == selected:
+                    color = SELECTED_COLOR
+                elif day_date == today:
+                    color = TODAY_COLOR
+                elif day_date in marked:
+                    color = marked[day_date]
+                else:
+                    color = CalendarDataProvider.heat_color(days.get(day_date)) or "transparent"
+
+                result.append(DayCell(
+                    text=str(day),
+                    fg_color=color,
+                    text_color=PAST_TEXT_COLOR if day_date < today else None,
+                    state="normal"
+                ))
+
+        result.extend(DayCell() for _ in range(CALENDAR_CELLS - len(result)))
+        return result
@@ -0,0 +1,150 @@
+"""
+Подсказки при наведении на диаграммы: поиск элемента под курсором бинарным поиском
+по заранее отсортированным координатам и перерисовка только слоя подсказок (blit)
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Sequence, Tuple
+
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+
+# Найденный элемент: точка привязки подсказки (в данных) и текст
+HoverHit = Tuple[Tuple[float, float], str]
+
+# Радиус попадания в точку линии, пикселей
+POINT_HIT_RADIUS = 8
+
+
+class BarHoverIndex:
+    """Индекс столбцов диаграммы по левой границе (столбцы одного ряда не перекрываются)"""
+
+    def __init__(self, bars, labels: Sequence[str]):
+        items = []
+        for bar, label in zip(bars, labels):
+            left, bottom = bar.get_x(), bar.get_y()
+            right, top = left + bar.get_width(), bottom + bar.get_height()
+            items.append((left, right, min(bottom, top), max(bottom, top), label))
+        items.sort()
+
+        self._lefts = [item[0] for item in items]
+        self._items = items
+
+    def hit(self, x: Optional[float], y: Optional[float]) -> Optional[HoverHit]:
+        """Столбец под точкой (в координатах данных)"""
+        if x is None or y is None:
+            return None
+        i = bisect_right(self._lefts, x) - 1
+        if i < 0:
+            return None
+
+        left, right, bottom, top, label = self._items[i]
+        if x > right or not bottom <= y <= top:
+            return None
+        return ((left + right) / 2, top), label
+
+
+class PointHoverIndex:
+    """Индекс точек линии по x; попадание проверяется в пикселях (учитывает масштаб)"""
+
+    def __init__(self, ax: Axes, xs: Sequence[float], ys: Sequence[float], labels: Sequence[str],
+                 radius: float = POINT_HIT_RADIUS):
+        self.ax = ax
+        self.radius = radius
+        points = sorted(zip(xs, ys, labels))
+        self._xs = [point[0] for point in points]
+        self._points = points
+
+    def hit(self, x: Optional[float], y: Optional[float]) -> Optional[HoverHit]:
+        """Ближайшая к курсору точка в пределах радиуса"""
+        if x is None or y is None or not self._points:
+            return None
+
+        to_pixels = self.ax.transData.transform
+        cursor_x, cursor_y = to_pixels((x, y))
+        # Окно кандидатов по x: ширина радиуса в единицах данных
+        left_x, _ = self.ax.transData.inverted().transform((cursor_x - self.radius, cursor_y))
+        right_x, _ = self.ax.transData.inverted().transform((cursor_x + self.radius, cursor_y))
+        start = bisect_left(self._xs, min(left_x, right_x))
+        end = bisect_right(self._xs, max(left_x, right_x))
+
+        best, best_distance = None, self.radius ** 2
+        for point in self._points[start:end]:
+            point_x, point_y = to_pixels(point[:2])
+            distance = (point_x - cursor_x) ** 2 + (point_y - cursor_y) ** 2
+            if distance <= best_distance:
+                best, best_distance = point, distance
+
+        if best is None:
+            return None
+        return (best[0], best[1]), best[2]
+
+
+class BlitHover:
+    """
+    Подсказки для нескольких осей фигуры. Подсказки анимированные: полная отрисовка их
+    не рисует, при движении мыши восстанавливается сохраненный фон и рисуется только подсказка
+    """
+
+    def __init__(self, figure: Figure):
+        self.figure = figure
+        self._targets: List[tuple] = []
+        self._background = None
+        # Показанная подсказка: (номер цели, текст)
+        self._current: Optional[tuple] = None
+
+        canvas = figure.canvas
+        self._connections = [
+            canvas.mpl_connect('draw_event', self._on_draw),
+            canvas.mpl_connect('motion_notify_event', self._on_move),
+        ]
+
+    def add(self, ax: Axes, index) -> None:
+        """Подсказки для осей по индексу элементов (BarHoverIndex/PointHoverIndex)"""
+        annotation = ax.annotate('', xy=(0, 0), xytext=(20, 20), textcoords="offset points",
+                                 bbox=dict(boxstyle="round", fc="w", ec="b", lw=1),
+                                 arrowprops=dict(arrowstyle="->", connectionstyle="arc3,rad=0"),
+                                 visible=False, animated=True)
+        self._targets.append((ax, index, annotation))
+
+    def disconnect(self):
+        """Отключить обработчики событий"""
+        for connection in self._connections:
+            self.figure.canvas.mpl_disconnect(connection)
+        self._connections = []
+
+    def hit(self, event) -> Optional[tuple]:
+        """Цель и элемент под курсором: (номер цели, HoverHit)"""
+        for number, (ax, index, _) in enumerate(self._targets):
+            if event.inaxes is ax:
+                found = index.hit(event.xdata, event.ydata)
+                return (number, found) if found else None
+        return None
+
+    def _on_draw(self, event):
+        """Полная перерисовка: сохранить фон без подсказок"""
+        self._background = self.figure.canvas.copy_from_bbox(self.figure.bbox)
+        self._current = None
+
+    def _on_move(self, event):
+        """Движение мыши: перерисовать подсказку, только если элемент под курсором сменился"""
+        if self._background is None:
+            return
+
+        found = self.hit(event)
+        key = (found[0], found[1][1]) if found else None
+        if key == self._current:
+            return
+        self._current = key
+
+        canvas = self.figure.canvas
+        canvas.restore_region(self._background)
+        if found:
+            number, (anchor, label) = found
+            ax, _, annotation = self._targets[number]
+            annotation.xy = anchor
+            annotation.set_text(label)
+            annotation.set_visible(True)
+            ax.draw_artist(annotation)
+            annotation.set_visible(False)
+        canvas.blit(self.figure.bbox)
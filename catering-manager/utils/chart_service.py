@@ -0,0 +1,216 @@
+"""
+Построение диаграмм вне экрана (Agg) с кэшем PNG
+Диаграммы рисуются на matplotlib.figure.Figure без pyplot - фигуры не копятся
+в глобальном реестре и освобождаются сборщиком мусора
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from datetime import date
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from config import CHART_CACHE_DIR
+from models import Event, EventSummary, SupplierPrice
+from utils.live_plots import ExpenseAnalysisPlot, PriceHistoryPlot
+
+# Виды диаграмм
+CHART_EXPENSE_CATEGORIES = "expense_categories"
+CHART_EXPENSE_ANALYSIS = "expense_analysis"
+CHART_PORTFOLIO_BUDGET = "portfolio_budget"
+CHART_PRICE_HISTORY = "price_history"
+
+# Сколько PNG хранить в кэше
+CHART_CACHE_LIMIT = 200
+DEFAULT_DPI = 100
+
+
+# ===== Подготовка данных (простые структуры - ключ кэша и передача в процессы) =====
+
+def expense_chart_data(summary: EventSummary) -> tuple:
+    """(название мероприятия, ((категория, план, факт), ...))"""
+    return (
+        summary.event.name,
+        tuple((item.category_name, float(item.planned_amount), float(item.actual_amount))
+              for item in summary.categories_summary)
+    )
+
+
+def portfolio_chart_data(events: List[Event], spent_by_event: Dict[int, Any]) -> tuple:
+    """((название, бюджет, потрачено), ...)"""
+    return tuple((event.name, float(event.budget), float(spent_by_event.get(event.id, 0)))
+                 for event in events)
+
+
+def daily_spend_chart_data(spend_by_day: Dict[date, Any]) -> tuple:
+    """((дата, сумма), ...) по возрастанию даты"""
+    return tuple((day, float(amount)) for day, amount in sorted(spend_by_day.items()))
+
+
+def price_history_chart_data(history: Dict[int, List[SupplierPrice]], by_nomenclature: bool = False) -> tuple:
+    """((поставщик или позиция - при by_nomenclature, ((дата, цена), ...)), ...)"""
+    def label(price: SupplierPrice) -> str:
+        owner = price.nomenclature if by_nomenclature else price.supplier
+        return owner.name if owner else "Неизвестно"
+
+    return tuple(
+        (label(prices[0]), tuple((p.start_date, float(p.price)) for p in prices))
+        for prices in history.values() if prices
+    )
+
+
+# ===== Построители диаграмм: рисуют на фигуре, False - нет данных =====
+
+def _draw_expense_categories(fig: Figure, data: tuple) -> bool:
+    """Расходы по категориям (горизонтальные столбцы)"""
+    name, items = data
+    if not items:
+        return False
+
+    ax = fig.add_subplot()
+    ax.barh([item[0] for item in items], [item[2] for item in items], color='lightcoral')
+    ax.invert_yaxis()
+    ax.set_xlabel('Сумма, руб')
+    ax.set_title(f'Расходы по категориям - {name}')
+    ax.grid(True, axis='x', alpha=0.3)
+    return True
+
+
+def _draw_expense_analysis(fig: Figure, data: tuple) -> bool:
+    """Структура фактических расходов и сравнение план/факт"""
+    return ExpenseAnalysisPlot(fig).update(data)
+
+
+def _draw_portfolio_budget(fig: Figure, data: tuple, limit: int = 15) -> bool:
+    """Бюджет и расходы крупнейших мероприятий"""
+    top = sorted(data, key=lambda item: item[1], reverse=True)[:limit]
+    if not top:
+        return False
+
+    positions = range(len(top))
+    ax = fig.add_subplot()
+    ax.barh([p - 0.2 for p in positions], [item[1] for item in top], height=0.4,
+            color='lightblue', label='Бюджет')
+    ax.barh([p + 0.2 for p in positions], [item[2] for item in top], height=0.4,
+            color='lightcoral', label='Потрачено')
+    ax.set_yticks(list(positions))
+    ax.set_yticklabels([item[0] for item in top])
+    ax.invert_yaxis()
+    ax.set_xlabel('Сумма, руб')
+    ax.set_title('Бюджет и расходы мероприятий')
+    ax.grid(True, axis='x', alpha=0.3)
+    ax.legend()
+    return True
+
+
+def _draw_price_history(fig: Figure, data: tuple) -> bool:
+    """Динамика цен по поставщикам"""
+    return PriceHistoryPlot(fig).update(data)
+
+
+CHART_BUILDERS: Dict[str, Callable[..., bool]] = {
+    CHART_EXPENSE_CATEGORIES: _draw_expense_categories,
+    CHART_EXPENSE_ANALYSIS: _draw_expense_analysis,
+    CHART_PORTFOLIO_BUDGET: _draw_portfolio_budget,
+    CHART_PRICE_HISTORY: _draw_price_history,
+}
+
+
+class ChartService:
+    """Рисует диаграммы в PNG (в том числе в рабочем потоке) и кэширует их по версии данных и параметрам"""
+
+    def __init__(self, cache_dir: Path = CHART_CACHE_DIR, max_entries: int = CHART_CACHE_LIMIT):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @staticmethod
+    def cache_key(kind: str, data: Any, size: Tuple[float, float], dpi: int,
+                  version: Optional[str] = None, **params) -> str:
+        """Ключ кэша: вид диаграммы, версия данных (по умолчанию - хэш самих данных) и параметры"""
+        version = version if version is not None else repr(data)
+        source = repr((kind, version, tuple(size), dpi, sorted(params.items())))
+        return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+    def render(self, kind: str, data: Any, size: Tuple[float, float] = (8, 4.5), dpi: int = DEFAULT_DPI,
+               version: Optional[str] = None, **params) -> Optional[Path]:
+        """PNG диаграммы (из кэша или построенный заново); None - нет данных"""
+        builder = CHART_BUILDERS.get(kind)
+        if builder is None:
+            raise ValueError(f"Неизвестный вид диаграммы: {kind}")
+
+        key = self.cache_key(kind, data, size, dpi, version, **params)
+        path = self.cache_dir / f"{kind}_{key}.png"
+        try:
+            os.utime(path)  # Отметка использования - для вытеснения давно не использованных
+            with self._lock:
+                self.hits += 1
+            return path
+        except OSError:
+            with self._lock:
+                self.misses += 1
+
+        fig = Figure(figsize=size, dpi=dpi)
+        FigureCanvasAgg(fig)
+        if not builder(fig, data, **params):
+            return None
+        fig.tight_layout()
+
+        # Запись через временный файл: кэш общий для потоков и процессов
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                fig.savefig(f, format='png')
+            os.replace(temp_name, path)
+        except Exception:
+            if os.path.exists(temp_name):
+                os.unlink(temp_name)
+            raise
+
+        self._evict()
+        return path
+
+    def submit(self, kind: str, data: Any, **kwargs) -> Future:
+        """Построить диаграмму в рабочем потоке сервиса"""
+        with self._lock:
+            if self._executor is None:
+                # Один поток: matplotlib не рассчитан на параллельное рисование
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="charts")
+        return self._executor.submit(self.render, kind, data, **kwargs)
+
+    def clear(self):
+        """Очистить кэш диаграмм"""
+        for path in self.cache_dir.glob("*.png"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _evict(self):
+        """Удалить давно не использованные PNG сверх лимита"""
+        files = list(self.cache_dir.glob("*.png"))
+        if len(files) <= self.max_entries:
+            return
+
+        def mtime(path: Path) -> float:
+            try:
+                return path.stat().st_mtime
+            except OSError:
+                return 0.0
+
+        files.sort(key=mtime)
+        for path in files[:len(files) - self.max_entries]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
@@ -0,0 +1,77 @@
+"""
+Прореживание временных рядов для диаграмм (Largest-Triangle-Three-Buckets)
+На экран выводится не больше точек, чем помещается пикселей по ширине,
+форма ряда (пики и провалы) при этом сохраняется
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Any, List, Sequence, Tuple
+
+from matplotlib.dates import date2num
+
+# Точек на пиксель ширины осей
+POINTS_PER_PIXEL = 1.0
+# Меньше этого числа точек ряд не прореживается
+MIN_CHART_POINTS = 50
+
+Point = Tuple[Any, float]
+
+
+class Downsampler:
+    """Прореживание рядов (x, y); x - число, дата или дата-время"""
+
+    @staticmethod
+    def x_value(x: Any) -> float:
+        """Координата x в числах matplotlib (даты - в днях)"""
+        if isinstance(x, date):
+            return float(date2num(x))
+        return float(x)
+
+    @staticmethod
+    def points_for_width(pixel_width: float) -> int:
+        """Сколько точек выводить на оси заданной ширины"""
+        return max(MIN_CHART_POINTS, int(pixel_width * POINTS_PER_PIXEL))
+
+    @staticmethod
+    def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+        """Индексы точек, выбранных LTTB (первая и последняя точки сохраняются)"""
+        count = len(xs)
+        if threshold >= count or threshold < 3:
+            return list(range(count))
+
+        selected = [0]
+        bucket_size = (count - 2) / (threshold - 2)
+        previous = 0
+
+        for bucket in range(threshold - 2):
+            start = int(bucket * bucket_size) + 1
+            end = int((bucket + 1) * bucket_size) + 1
+
+            # Средняя точка следующей корзины - третья вершина треугольника
+            next_start, next_end = end, min(int((bucket + 2) * bucket_size) + 1, count)
+            if next_start >= next_end:
+                next_start, next_end = count - 1, count
+            span = next_end - next_start
+            avg_x = sum(xs[next_start:next_end]) / span
+            avg_y = sum(ys[next_start:next_end]) / span
+
+            prev_x, prev_y = xs[previous], ys[previous]
+            best, best_area = start, -1.0
+            for i in range(start, end):
+                area = abs((prev_x - avg_x) * (ys[i] - prev_y) - (prev_x - xs[i]) * (avg_y - prev_y))
+                if area > best_area:
+                    best, best_area = i, area
+
+            selected.append(best)
+            previous = best
+
+        selected.append(count - 1)
+        return selected
+
+    @staticmethod
+    def visible_range(xs: Sequence[float], x_min: float, x_max: float) -> Tuple[int, int]:
+        """Срез точек в пределах оси x (с одной соседней точкой по краям, чтобы линия не обрывалась)"""
+        start = max(bisect_left(xs, x_min) - 1, 0)
+        end = min(bisect_right(xs, x_max) + 1, len(xs))
+        return start, end
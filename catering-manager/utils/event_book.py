@@ -0,0 +1,226 @@
+"""
+Книга мероприятия: сводка, заказы, позиции, поставщики и категории в одном файле Excel
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Union
+
+from openpyxl.utils import get_column_letter
+
+from utils.export_utils import ExportUtils
+from utils.excel_stream import (
+    ExcelStreamWriter, ExcelColumn, STYLE_TITLE, STYLE_BOLD, STYLE_MONEY, STYLE_TOTAL_MONEY,
+    STYLE_PERCENT, STYLE_DATE
+)
+from utils.formatters import Formatters
+
+SHEET_SUMMARY = "Сводка"
+SHEET_ORDERS = "Заказы"
+SHEET_ITEMS = "Позиции"
+SHEET_SUPPLIERS = "Поставщики"
+SHEET_CATEGORIES = "Категории"
+
+# Колонки листа позиций, на которые ссылаются формулы
+ITEMS_ORDER_COLUMN = 1
+ITEMS_CATEGORY_COLUMN = 6
+ITEMS_SUPPLIER_COLUMN = 7
+ITEMS_TOTAL_COLUMN = 10
+
+
+def _column_range(sheet: str, column: int, rows: int) -> str:
+    """Абсолютная ссылка на данные колонки листа (без строки заголовков)"""
+    letter = get_column_letter(column)
+    return f"'{sheet}'!${letter}$2:${letter}${max(rows + 1, 2)}"
+
+
+def _sheet_total(function: str, sheet: str, column: int, rows: int) -> Union[str, int]:
+    """Итог колонки другого листа формулой (нет строк - 0: диапазон задел бы строку ИТОГО)"""
+    if not rows:
+        return 0
+    return f"={function}({_column_range(sheet, column, rows)})"
+
+
+def _count_equal(criteria_range: str, cell: str) -> str:
+    """
+    Число строк диапазона, равных ячейке. Точное сравнение вместо COUNTIF:
+    в критерии COUNTIF символы *, ?, ~ и ведущие <, >, = в названиях - шаблон или оператор
+    """
+    return f"=SUMPRODUCT(--({criteria_range}={cell}))"
+
+
+def _sum_equal(criteria_range: str, cell: str, sum_range: str) -> str:
+    """Сумма строк диапазона, равных ячейке (точное сравнение вместо SUMIF)"""
+    return f"=SUMPRODUCT(({criteria_range}={cell})*{sum_range})"
+
+
+def _total(function: str, column: str, rows: int) -> Union[str, int]:
+    """Итог колонки для строки ИТОГО того же листа (нет строк - 0, без ссылки на саму строку)"""
+    if not rows:
+        return 0
+    return f"={function}({column}2:{column}{rows + 1})"
+
+
+class EventBookExporter:
+    """Выгрузка всех данных мероприятия в одну книгу за постоянное число запросов"""
+
+    @staticmethod
+    def export(db, event_id: int, filename: Path,
+               track: Optional[Callable[[Iterable], Iterable]] = None) -> Dict[str, int]:
+        """
+        Сформировать книгу мероприятия. Позиции заказов читаются потоком (track
+        оборачивает его: ход и отмена), итоги считаются формулами Excel.
+        Возвращает число строк по листам
+        """
+        event = db.get_event_by_id(event_id)
+        if not event:
+            raise ValueError(f"Мероприятие {event_id} не найдено")
+
+        orders = db.get_event_orders_overview(event_id)
+        suppliers = db.get_event_suppliers(event_id)
+        categories = db.get_event_categories(event_id)
+
+        with ExcelStreamWriter(filename) as writer:
+            # Листы создаются в порядке вкладок; сводка заполняется последней
+            summary_ws = writer.add_sheet(SHEET_SUMMARY, [ExcelColumn("", 32), ExcelColumn("", 25)])
+            orders_ws = writer.add_sheet(SHEET_ORDERS, [
+                ExcelColumn("Номер заказа", 22),
+                ExcelColumn("Дата заказа", 12, STYLE_DATE),
+                ExcelColumn("Статус", 14),
+                ExcelColumn("Позиций", 10),
+                ExcelColumn("Сумма заказа", 15, STYLE_MONEY),
+                ExcelColumn("Сумма по позициям", 18, STYLE_MONEY),
+                ExcelColumn("Примечания", 30),
+            ])
+            items_ws = writer.add_sheet(SHEET_ITEMS, ExportUtils.order_item_columns())
+            suppliers_ws = writer.add_sheet(SHEET_SUPPLIERS, [
+                ExcelColumn("Поставщик", 30),
+                ExcelColumn("Контактное лицо", 22),
+                ExcelColumn("Телефон", 16),
+                ExcelColumn("Email", 24),
+                ExcelColumn("Рейтинг", 10),
+                ExcelColumn("Позиций", 10),
+                ExcelColumn("Сумма", 15, STYLE_MONEY),
+                ExcelColumn("Доля расходов", 15, STYLE_PERCENT),
+            ])
+            categories_ws = writer.add_sheet(SHEET_CATEGORIES, [
+                ExcelColumn("Категория", 30),
+                ExcelColumn("Позиций", 10),
+                ExcelColumn("Сумма", 15, STYLE_MONEY),
+                ExcelColumn("Доля бюджета", 15, STYLE_PERCENT),
+                ExcelColumn("Доля расходов", 15, STYLE_PERCENT),
+            ])
+
+            # Позиции заказов - поток из БД
+            items_ws.worksheet.freeze_panes = 'A2'
+            items_ws.write_header()
+            items = db.iter_order_items(event_id)
+            items_count = items_ws.write_rows(
+                ExportUtils.convert_order_item_rows(track(items) if track else items)
+            )
+
+            item_orders = _column_range(SHEET_ITEMS, ITEMS_ORDER_COLUMN, items_count)
+            item_categories = _column_range(SHEET_ITEMS, ITEMS_CATEGORY_COLUMN, items_count)
+            item_suppliers = _column_range(SHEET_ITEMS, ITEMS_SUPPLIER_COLUMN, items_count)
+            item_totals = _column_range(SHEET_ITEMS, ITEMS_TOTAL_COLUMN, items_count)
+
+            # Сводка: строки и адреса ключевых ячеек
+            summary_rows = [
+                ("Мероприятие:", event.name, None),
+                ("Дата проведения:", event.event_date, STYLE_DATE),
+                ("Время начала:", Formatters.format_time(event.start_time), None),
+                ("Количество гостей:", event.guests_count, None),
+                ("Статус:", event.status, None),
+                ("Место проведения:", event.location, None),
+                ("Ответственный:", event.responsible_person, None),
+                None,
+                ("Бюджет:", float(event.budget), STYLE_MONEY),
+                ("Заказов:", _sheet_total("COUNTA", SHEET_ORDERS, 1, len(orders)), None),
+                ("Позиций:", _sheet_total("COUNTA", SHEET_ITEMS, ITEMS_ORDER_COLUMN, items_count), None),
+                ("Потрачено (по позициям):", _sheet_total("SUM", SHEET_ITEMS, ITEMS_TOTAL_COLUMN, items_count),
+                 STYLE_TOTAL_MONEY),
+                ("Сумма заказов:", _sheet_total("SUM", SHEET_ORDERS, 5, len(orders)), STYLE_MONEY),
+                ("Остаток бюджета:", "={budget}-{spent}", STYLE_MONEY),
+                ("Использовано бюджета:", "=IF({budget}>0,{spent}/{budget},0)", STYLE_PERCENT),
+                ("Расход на гостя:", "=IF({guests}>0,{spent}/{guests},0)", STYLE_MONEY),
+            ]
+            # Данные сводки начинаются с 3-й строки (заголовок и пустая строка)
+            cells = {}
+            for row, entry in enumerate(summary_rows, start=3):
+                if entry:
+                    cells[entry[0]] = f"'{SHEET_SUMMARY}'!$B${row}"
+            refs = {
+                'budget': cells["Бюджет:"],
+                'spent': cells["Потрачено (по позициям):"],
+                'guests': cells["Количество гостей:"],
+            }
+
+            # Заказы: сумма по позициям - формулой по листу позиций
+            orders_ws.write_header()
+            orders_ws.write_rows(
+                (number,
+                 datetime.fromisoformat(order_date) if order_date else None,
+                 status,
+                 items,
+                 total,
+                 _sum_equal(item_orders, f"A{row}", item_totals),
+                 notes)
+                for row, (number, order_date, status, items, total, notes) in enumerate(orders, start=2)
+            )
+            rows = len(orders)
+            orders_ws.append(
+                ["ИТОГО", None, None, _total("SUM", "D", rows), _total("SUM", "E", rows), _total("SUM", "F", rows)],
+                [STYLE_BOLD, None, None, STYLE_BOLD, STYLE_TOTAL_MONEY, STYLE_TOTAL_MONEY]
+            )
+
+            # Поставщики
+            suppliers_ws.write_header()
+            suppliers_ws.write_rows(
+                (name, contact, phone, email, rating,
+                 _count_equal(item_suppliers, f"A{row}"),
+                 _sum_equal(item_suppliers, f"A{row}", item_totals),
+                 f"=IF({refs['spent']}>0,G{row}/{refs['spent']},0)")
+                for row, (name, contact, phone, email, rating) in enumerate(suppliers, start=2)
+            )
+            rows = len(suppliers)
+            suppliers_ws.append(
+                ["ИТОГО", None, None, None, None, _total("SUM", "F", rows), _total("SUM", "G", rows),
+                 _total("SUM", "H", rows)],
+                [STYLE_BOLD, None, None, None, None, STYLE_BOLD, STYLE_TOTAL_MONEY, STYLE_PERCENT]
+            )
+
+            # Категории
+            categories_ws.write_header()
+            categories_ws.write_rows(
+                (name,
+                 _count_equal(item_categories, f"A{row}"),
+                 _sum_equal(item_categories, f"A{row}", item_totals),
+                 f"=IF({refs['budget']}>0,C{row}/{refs['budget']},0)",
+                 f"=IF({refs['spent']}>0,C{row}/{refs['spent']},0)")
+                for row, name in enumerate(categories, start=2)
+            )
+            rows = len(categories)
+            categories_ws.append(
+                ["ИТОГО", _total("SUM", "B", rows), _total("SUM", "C", rows), _total("SUM", "D", rows),
+                 _total("SUM", "E", rows)],
+                [STYLE_BOLD, STYLE_BOLD, STYLE_TOTAL_MONEY, STYLE_PERCENT, STYLE_PERCENT]
+            )
+
+            # Сводка - последней, когда известны диапазоны всех листов
+            summary_ws.append([f"Книга мероприятия: {event.name}"], [STYLE_TITLE])
+            summary_ws.skip_row()
+            for entry in summary_rows:
+                if not entry:
+                    summary_ws.skip_row()
+                    continue
+                label, value, style = entry
+                if isinstance(value, str) and value.startswith("="):
+                    value = value.format(**refs)
+                summary_ws.append([label, value], [STYLE_BOLD, style])
+
+        return {
+            SHEET_ORDERS: len(orders),
+            SHEET_ITEMS: items_count,
+            SHEET_SUPPLIERS: len(suppliers),
+            SHEET_CATEGORIES: len(categories),
+        }
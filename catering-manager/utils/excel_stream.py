@@ -0,0 +1,140 @@
+"""
+Потоковая запись книг Excel (openpyxl write-only)
+Строки пишутся сразу во временный файл, стили - общие именованные
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Sequence
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+from openpyxl.utils import get_column_letter
+
+# Именованные стили книги
+STYLE_TITLE = "vostok_title"
+STYLE_HEADER = "vostok_header"
+STYLE_BOLD = "vostok_bold"
+STYLE_MONEY = "vostok_money"
+STYLE_TOTAL_MONEY = "vostok_total_money"
+STYLE_QUANTITY = "vostok_quantity"
+STYLE_PERCENT = "vostok_percent"
+STYLE_PERCENT_WARNING = "vostok_percent_warning"
+STYLE_DATE = "vostok_date"
+
+MONEY_FORMAT = '#,##0.00'
+PERCENT_FORMAT = '0.0%'
+
+
+def _build_named_styles() -> List[NamedStyle]:
+    """Набор стилей, регистрируемых в каждой книге один раз"""
+    return [
+        NamedStyle(name=STYLE_TITLE, font=Font(bold=True, size=14)),
+        NamedStyle(
+            name=STYLE_HEADER,
+            font=Font(bold=True, color="FFFFFF"),
+            fill=PatternFill(start_color="2F75B5", end_color="2F75B5", fill_type="solid"),
+            alignment=Alignment(horizontal="center", vertical="center")
+        ),
+        NamedStyle(name=STYLE_BOLD, font=Font(bold=True)),
+        NamedStyle(name=STYLE_MONEY, number_format=MONEY_FORMAT),
+        NamedStyle(name=STYLE_TOTAL_MONEY, number_format=MONEY_FORMAT, font=Font(bold=True)),
+        NamedStyle(name=STYLE_QUANTITY, number_format='#,##0.###'),
+        NamedStyle(name=STYLE_PERCENT, number_format=PERCENT_FORMAT),
+        NamedStyle(name=STYLE_PERCENT_WARNING, number_format=PERCENT_FORMAT,
+                   font=Font(color="FF0000", bold=True)),
+        NamedStyle(name=STYLE_DATE, number_format='DD.MM.YYYY'),
+    ]
+
+
+@dataclass
+class ExcelColumn:
+    """Колонка листа: заголовок, ширина и стиль значений"""
+    title: str
+    width: float = 15
+    style: Optional[str] = None
+
+
+class ExcelStreamSheet:
+    """Лист, в который строки дописываются последовательно"""
+
+    def __init__(self, worksheet, columns: List[ExcelColumn]):
+        self.worksheet = worksheet
+        self.columns = columns
+        self.row_count = 0
+
+        # Стили колонок по индексам (только колонки со стилем)
+        self._styled_columns = [(i, c.style) for i, c in enumerate(columns) if c.style]
+
+        for i, column in enumerate(columns, start=1):
+            self.worksheet.column_dimensions[get_column_letter(i)].width = column.width
+
+    def append(self, values: Sequence[Any], styles: Optional[Sequence[Optional[str]]] = None):
+        """Дописать строку; styles - стили по колонкам (None - без стиля)"""
+        row = list(values)
+        if styles:
+            for i, style in enumerate(styles):
+                if style and i < len(row):
+                    row[i] = self._cell(row[i], style)
+        self.worksheet.append(row)
+        self.row_count += 1
+
+    def write_header(self):
+        """Строка заголовков колонок"""
+        self.append([c.title for c in self.columns], [STYLE_HEADER] * len(self.columns))
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> int:
+        """Дописать строки из итератора со стилями колонок, вернуть количество"""
+        worksheet = self.worksheet
+        styled_columns = self._styled_columns
+        cell = self._cell
+        written = 0
+
+        for values in rows:
+            row = list(values)
+            for i, style in styled_columns:
+                if row[i] is not None:
+                    row[i] = cell(row[i], style)
+            worksheet.append(row)
+            written += 1
+
+        self.row_count += written
+        return written
+
+    def skip_row(self):
+        """Пустая строка"""
+        self.append([])
+
+    def _cell(self, value: Any, style: str) -> WriteOnlyCell:
+        """Ячейка с именованным стилем книги"""
+        cell = WriteOnlyCell(self.worksheet, value)
+        cell.style = style
+        return cell
+
+
+class ExcelStreamWriter:
+    """Книга Excel в режиме write-only: память не растет с числом строк"""
+
+    def __init__(self, filename: Path):
+        self.filename = Path(filename)
+        self.workbook = openpyxl.Workbook(write_only=True)
+        for style in _build_named_styles():
+            self.workbook.add_named_style(style)
+
+    def add_sheet(self, title: str, columns: Optional[List[ExcelColumn]] = None) -> ExcelStreamSheet:
+        """Добавить лист (листы заполняются по очереди)"""
+        # Имя листа Excel - не длиннее 31 символа
+        return ExcelStreamSheet(self.workbook.create_sheet(title[:31]), columns or [])
+
+    def save(self):
+        """Записать книгу на диск"""
+        self.workbook.save(self.filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.save()
+        return False
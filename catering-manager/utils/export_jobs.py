@@ -0,0 +1,291 @@
+"""
+Очередь фоновых задач экспорта: рабочие потоки, ход выполнения и отмена
+Обновления передаются в главный поток Tk через dispatch(), вызываемый из after()
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional
+
+from config import REPORTS_DIR
+
+logger = logging.getLogger(__name__)
+
+# Состояния задачи
+JOB_QUEUED = "в очереди"
+JOB_RUNNING = "выполняется"
+JOB_DONE = "готово"
+JOB_FAILED = "ошибка"
+JOB_CANCELLED = "отменено"
+
+# Период опроса очереди из главного потока, мс
+EXPORT_POLL_INTERVAL_MS = 100
+# Рабочих потоков по умолчанию
+EXPORT_WORKERS = 2
+# Сколько завершенных задач хранить в списке
+FINISHED_JOBS_LIMIT = 50
+# Сообщать о ходе выполнения не чаще, чем раз в столько строк
+PROGRESS_STEP = 500
+
+
+class ExportCancelled(Exception):
+    """Задача экспорта отменена пользователем"""
+
+
+@dataclass(eq=False)
+class ExportJob:
+    """Задача экспорта и ее состояние"""
+    id: int
+    title: str
+    func: Callable[["ExportJob"], Any]
+    target: Optional[Path] = None
+    on_done: Optional[Callable[[Any], None]] = None
+    on_error: Optional[Callable[[Exception], None]] = None
+    status: str = JOB_QUEUED
+    done: int = 0
+    total: Optional[int] = None
+    result: Any = None
+    error: Optional[Exception] = None
+    created_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+    _updates: Optional["queue.Queue"] = field(default=None, repr=False)
+    _completion_dispatched: bool = field(default=False, repr=False)
+
+    @property
+    def cancelled(self) -> bool:
+        """Запрошена ли отмена"""
+        return self._cancel.is_set()
+
+    @property
+    def finished(self) -> bool:
+        """Задача завершена (успешно, с ошибкой или отменена)"""
+        return self.status in (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+    @property
+    def progress(self) -> Optional[float]:
+        """Доля выполнения 0..1 (None - объем работы неизвестен)"""
+        if not self.total:
+            return None
+        return min(self.done / self.total, 1.0)
+
+    @property
+    def wait_time(self) -> float:
+        """Время ожидания в очереди, сек"""
+        return (self.started_at or self.finished_at or time.monotonic()) - self.created_at
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Время выполнения, сек (для незапущенной задачи - None)"""
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def cancel(self):
+        """Запросить отмену (задача остановится на ближайшей проверке)"""
+        self._cancel.set()
+
+    def check_cancelled(self):
+        """Прервать выполнение, если запрошена отмена"""
+        if self._cancel.is_set():
+            raise ExportCancelled(self.title)
+
+    def report(self, done: int, total: Optional[int] = None):
+        """Сообщить о ходе выполнения (из рабочего потока)"""
+        self.check_cancelled()
+        self.done = done
+        if total is not None:
+            self.total = total
+        self._notify()
+
+    def track(self, rows: Iterable, total: Optional[int] = None) -> Iterator:
+        """Обернуть поток строк: считать строки, проверять отмену, сообщать о ходе"""
+        if total is not None:
+            self.total = total
+        done = 0
+        for row in rows:
+            if self._cancel.is_set():
+                raise ExportCancelled(self.title)
+            yield row
+            done += 1
+            if done % PROGRESS_STEP == 0:
+                self.done = done
+                self._notify()
+        self.done = done
+        self._notify()
+
+    def _notify(self):
+        """Поставить задачу в очередь обновлений для главного потока"""
+        if self._updates is not None:
+            self._updates.put(self)
+
+
+class ExportJobQueue:
+    """Выполняет задачи экспорта в пуле рабочих потоков"""
+
+    def __init__(self, output_dir: Path = REPORTS_DIR, max_workers: int = EXPORT_WORKERS):
+        self.output_dir = Path(output_dir)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self._updates: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._active: List[ExportJob] = []
+        self._finished: Deque[ExportJob] = deque(maxlen=FINISHED_JOBS_LIMIT)
+        self._listeners: List[Callable[[ExportJob], None]] = []
+
+    def submit(self, title: str, func: Callable[[ExportJob], Any], target: Optional[Path] = None,
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None) -> ExportJob:
+        """
+        Поставить задачу в очередь. func(job) выполняется в рабочем потоке и может
+        вызывать job.report()/job.track(). on_done/on_error вызываются из dispatch()
+        """
+        target = Path(target).resolve() if target else None
+
+        with self._lock:
+            if target and any(job.target == target for job in self._active):
+                raise ValueError(f"Файл {target.name} уже формируется")
+
+            job = ExportJob(self._next_id, title, func, target, on_done, on_error, _updates=self._updates)
+            self._next_id += 1
+            self._active.append(job)
+
+        self._updates.put(job)
+        self._executor.submit(self._run, job)
+        return job
+
+    def output_path(self, filename: str) -> Path:
+        """Свободное имя файла в папке отчетов (с учетом задач, которые еще пишут файлы)"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = (self.output_dir / filename).resolve()
+
+        with self._lock:
+            busy = {job.target for job in self._active}
+        number = 2
+        candidate = path
+        while candidate.exists() or candidate in busy:
+            candidate = path.with_name(f"{path.stem} ({number}){path.suffix}")
+            number += 1
+        return candidate
+
+    def cancel(self, job_id: int) -> bool:
+        """Отменить задачу по номеру"""
+        with self._lock:
+            for job in self._active:
+                if job.id == job_id:
+                    job.cancel()
+                    return True
+        return False
+
+    def active_jobs(self) -> List[ExportJob]:
+        """Задачи в очереди и в работе"""
+        with self._lock:
+            return list(self._active)
+
+    def finished_jobs(self) -> List[ExportJob]:
+        """Завершенные задачи, последние - первыми"""
+        with self._lock:
+            return list(reversed(self._finished))
+
+    def add_listener(self, callback: Callable[[ExportJob], None]):
+        """Подписка на изменения задач (вызывается в главном потоке из dispatch)"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[ExportJob], None]):
+        """Отписка от изменений задач"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def dispatch(self) -> int:
+        """
+        Передать накопленные обновления подписчикам и колбэкам задач.
+        Вызывать из главного потока (например, из after()); вернуть число обновлений
+        """
+        latest = {}
+        while True:
+            try:
+                job = self._updates.get_nowait()
+            except queue.Empty:
+                break
+            # Промежуточные обновления одной задачи схлопываются
+            latest[job.id] = job
+
+        for job in latest.values():
+            for listener in list(self._listeners):
+                try:
+                    listener(job)
+                except Exception as e:
+                    logger.error(f"Ошибка обработчика задачи экспорта: {e}")
+
+            # Итог задачи передается ровно один раз
+            if not job.finished or job._completion_dispatched:
+                continue
+            job._completion_dispatched = True
+            try:
+                if job.status == JOB_DONE and job.on_done:
+                    job.on_done(job.result)
+                elif job.status == JOB_FAILED and job.on_error:
+                    job.on_error(job.error)
+            except Exception as e:
+                # Ошибка колбэка не мешает итогам остальных задач
+                logger.error(f"Ошибка обработчика итога задачи '{job.title}': {e}")
+
+        return len(latest)
+
+    def shutdown(self, cancel: bool = True):
+        """Остановить очередь (при закрытии приложения)"""
+        if cancel:
+            with self._lock:
+                for job in self._active:
+                    job.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=cancel)
+
+    def _run(self, job: ExportJob):
+        """Выполнение задачи в рабочем потоке"""
+        if job.cancelled:
+            self._finish(job, JOB_CANCELLED)
+            return
+
+        job.started_at = time.monotonic()
+        job.status = JOB_RUNNING
+        self._updates.put(job)
+
+        try:
+            job.result = job.func(job)
+            # Задачи без проверок отмены: результат отбрасывается
+            job.check_cancelled()
+            self._finish(job, JOB_DONE)
+        except ExportCancelled:
+            self._finish(job, JOB_CANCELLED)
+        except Exception as e:
+            logger.error(f"Ошибка задачи экспорта '{job.title}': {e}")
+            job.error = e
+            self._finish(job, JOB_FAILED)
+
+    def _finish(self, job: ExportJob, status: str):
+        """Перевести задачу в завершенные"""
+        if status != JOB_DONE and job.target and job.target.exists():
+            # Недописанный файл не оставляем
+            try:
+                job.target.unlink()
+            except OSError as e:
+                logger.warning(f"Не удалось удалить {job.target}: {e}")
+
+        job.status = status
+        job.finished_at = time.monotonic()
+        if job.started_at is None:
+            job.started_at = job.finished_at
+
+        with self._lock:
+            if job in self._active:
+                self._active.remove(job)
+            self._finished.append(job)
+
+        self._updates.put(job)
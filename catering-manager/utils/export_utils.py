@@ -7,12 +7,16 @@ import json
 from datetime import datetime
 from decimal import Decimal
 from pathlib import Path
-from typing import List, Dict, Any
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional
+from openpyxl.drawing.image import Image as XLImage
 
 from config import Config
 from models import *
+from utils.formatters import Formatters
+from utils.excel_stream import (
+    ExcelStreamWriter, ExcelColumn, STYLE_TITLE, STYLE_BOLD, STYLE_MONEY, STYLE_TOTAL_MONEY,
+    STYLE_QUANTITY, STYLE_PERCENT, STYLE_PERCENT_WARNING, STYLE_DATE
+)
 
 
 class ExportUtils:
@@ -57,104 +61,141 @@ class ExportUtils:
             return False
 
     @staticmethod
-    def export_expense_report_to_excel(event_summary: EventSummary, filename: Path) -> bool:
-        """Экспорт отчета по расходам в Excel"""
+    def export_expense_report_to_excel(event_summary: EventSummary, filename: Path,
+                                       chart_path: Optional[Path] = None) -> bool:
+        """Экспорт отчета по расходам в Excel (с диаграммой, если передан путь к PNG)"""
         try:
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Отчет по расходам"
-
-            # Стили
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="2F75B5", end_color="2F75B5", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-
-            money_format = '#,##0.00'
-            percent_format = '0.0%'
-
-            # Заголовок
-            ws.merge_cells('A1:E1')
-            ws['A1'] = f"Отчет по расходам на мероприятие: {event_summary.event.name}"
-            ws['A1'].font = Font(bold=True, size=14)
-            ws['A1'].alignment = Alignment(horizontal="center")
-
-            # Информация о мероприятии
-            ws['A3'] = "Мероприятие:"
-            ws['B3'] = event_summary.event.name
-
-            ws['A4'] = "Дата проведения:"
-            ws['B4'] = Formatters.format_date(event_summary.event.event_date)
-
-            ws['A5'] = "Общий бюджет:"
-            ws['B5'] = Formatters.format_currency(event_summary.event.budget)
-
-            ws['A6'] = "Общие расходы:"
-            ws['B6'] = Formatters.format_currency(event_summary.total_amount)
-
-            ws['A7'] = "Использовано бюджета:"
-            ws['B7'] = Formatters.format_percentage(event_summary.budget_utilization)
-
-            # Таблица расходов по категориям
-            ws['A9'] = "Категория затрат"
-            ws['B9'] = "План, руб"
-            ws['C9'] = "Факт, руб"
-            ws['D9'] = "Отклонение, руб"
-            ws['E9'] = "% выполнения"
-
-            for col in ['A', 'B', 'C', 'D', 'E']:
-                cell = ws[f'{col}9']
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-
-            row = 10
-            for item in event_summary.categories_summary:
-                ws[f'A{row}'] = item.category_name
-                ws[f'B{row}'] = float(item.planned_amount)
-                ws[f'B{row}'].number_format = money_format
-
-                ws[f'C{row}'] = float(item.actual_amount)
-                ws[f'C{row}'].number_format = money_format
-
-                deviation = item.actual_amount - item.planned_amount
-                ws[f'D{row}'] = float(deviation)
-                ws[f'D{row}'].number_format = money_format
-
-                percentage = item.percentage / 100
-                ws[f'E{row}'] = percentage
-                ws[f'E{row}'].number_format = percent_format
-
-                # Цветовое выделение превышения бюджета
-                if percentage > 1.0:  # Превышение 100%
-                    ws[f'E{row}'].font = Font(color="FF0000", bold=True)
-
-                row += 1
-
-            # Итоговая строка
-            ws[f'A{row}'] = "ИТОГО"
-            ws[f'A{row}'].font = Font(bold=True)
-
-            ws[f'B{row}'] = f"=SUM(B10:B{row - 1})"
-            ws[f'B{row}'].number_format = money_format
-            ws[f'B{row}'].font = Font(bold=True)
-
-            ws[f'C{row}'] = f"=SUM(C10:C{row - 1})"
-            ws[f'C{row}'].number_format = money_format
-            ws[f'C{row}'].font = Font(bold=True)
-
-            # Настройка ширины колонок
-            column_widths = {'A': 30, 'B': 15, 'C': 15, 'D': 15, 'E': 15}
-            for col, width in column_widths.items():
-                ws.column_dimensions[col].width = width
-
-            # Сохранение
-            wb.save(filename)
+            with ExcelStreamWriter(filename) as writer:
+                ws = writer.add_sheet("Отчет по расходам", [
+                    ExcelColumn("Категория затрат", 30),
+                    ExcelColumn("План, руб", 15, STYLE_MONEY),
+                    ExcelColumn("Факт, руб", 15, STYLE_MONEY),
+                    ExcelColumn("Отклонение, руб", 15, STYLE_MONEY),
+                    ExcelColumn("% выполнения", 15, STYLE_PERCENT),
+                ])
+
+                # Заголовок
+                ws.append([f"Отчет по расходам на мероприятие: {event_summary.event.name}"], [STYLE_TITLE])
+                ws.skip_row()
+
+                # Информация о мероприятии
+                ws.append(["Мероприятие:", event_summary.event.name])
+                ws.append(["Дата проведения:", Formatters.format_date(event_summary.event.event_date)])
+                ws.append(["Общий бюджет:", Formatters.format_currency(event_summary.event.budget)])
+                ws.append(["Общие расходы:", Formatters.format_currency(event_summary.total_amount)])
+                ws.append(["Использовано бюджета:", Formatters.format_percentage(event_summary.budget_utilization)])
+                ws.skip_row()
+
+                # Таблица расходов по категориям
+                ws.write_header()
+                first_row = ws.row_count + 1
+
+                for item in event_summary.categories_summary:
+                    percentage = item.percentage / 100
+                    ws.append(
+                        [item.category_name, float(item.planned_amount), float(item.actual_amount),
+                         float(item.actual_amount - item.planned_amount), percentage],
+                        # Цветовое выделение превышения бюджета
+                        [None, STYLE_MONEY, STYLE_MONEY, STYLE_MONEY,
+                         STYLE_PERCENT_WARNING if percentage > 1.0 else STYLE_PERCENT]
+                    )
+
+                # Итоговая строка
+                last_row = ws.row_count
+                ws.append(
+                    ["ИТОГО", f"=SUM(B{first_row}:B{last_row})", f"=SUM(C{first_row}:C{last_row})"],
+                    [STYLE_BOLD, STYLE_TOTAL_MONEY, STYLE_TOTAL_MONEY]
+                )
+
+                # Диаграмма справа от таблицы
+                if chart_path:
+                    ws.worksheet.add_image(XLImage(str(chart_path)), 'G3')
+
+            return True
+
+        except Exception as e:
+            print(f"Ошибка экспорта в Excel: {e}")
+            return False
+
+    @staticmethod
+    def export_overall_report_to_excel(events: List[Event], spent_by_event: Dict[int, Decimal],
+                                       filename: Path,
+                                       track: Optional[Callable[[Iterable], Iterable]] = None) -> bool:
+        """Экспорт общего отчета по мероприятиям в Excel; track оборачивает строки (ход и отмена)"""
+        try:
+            with ExcelStreamWriter(filename) as writer:
+                ws = writer.add_sheet("Мероприятия", [
+                    ExcelColumn("Название мероприятия", 35),
+                    ExcelColumn("Дата", 12, STYLE_DATE),
+                    ExcelColumn("Статус", 14),
+                    ExcelColumn("Гостей", 10),
+                    ExcelColumn("Бюджет", 15, STYLE_MONEY),
+                    ExcelColumn("Потрачено", 15, STYLE_MONEY),
+                    ExcelColumn("Остаток", 15, STYLE_MONEY),
+                    ExcelColumn("Использовано (%)", 16, STYLE_PERCENT),
+                ])
+                ws.write_header()
+
+                def rows():
+                    for event in events:
+                        spent = spent_by_event.get(event.id, Decimal('0'))
+                        yield (
+                            event.name,
+                            event.event_date,
+                            event.status,
+                            event.guests_count,
+                            float(event.budget),
+                            float(spent),
+                            float(event.budget - spent),
+                            float(spent / event.budget) if event.budget > 0 else 0.0
+                        )
+
+                ws.write_rows(track(rows()) if track else rows())
+
             return True
 
         except Exception as e:
             print(f"Ошибка экспорта в Excel: {e}")
             return False
 
+    @staticmethod
+    def order_item_columns() -> List[ExcelColumn]:
+        """Колонки листа позиций заказов (порядок - как в iter_order_items)"""
+        return [
+            ExcelColumn("Номер заказа", 22),
+            ExcelColumn("Дата заказа", 12, STYLE_DATE),
+            ExcelColumn("Мероприятие", 30),
+            ExcelColumn("Позиция", 30),
+            ExcelColumn("Ед. изм.", 8),
+            ExcelColumn("Категория", 20),
+            ExcelColumn("Поставщик", 25),
+            ExcelColumn("Количество", 12, STYLE_QUANTITY),
+            ExcelColumn("Цена", 14, STYLE_MONEY),
+            ExcelColumn("Стоимость", 15, STYLE_MONEY),
+            ExcelColumn("Примечания", 30),
+        ]
+
+    @staticmethod
+    def convert_order_item_rows(rows: Iterable[tuple]) -> Iterator[list]:
+        """Подготовить строки iter_order_items к записи (дата заказа хранится строкой ISO)"""
+        for row in rows:
+            row = list(row)
+            if row[1]:
+                row[1] = datetime.fromisoformat(row[1])
+            yield row
+
+    @staticmethod
+    def export_order_items_to_excel(rows: Iterable[tuple], filename: Path) -> int:
+        """
+        Потоковая выгрузка позиций заказов (строки DatabaseManager.iter_order_items).
+        Возвращает количество выгруженных строк
+        """
+        with ExcelStreamWriter(filename) as writer:
+            ws = writer.add_sheet("Позиции заказов", ExportUtils.order_item_columns())
+            ws.worksheet.freeze_panes = 'A2'
+            ws.write_header()
+            return ws.write_rows(ExportUtils.convert_order_item_rows(rows))
+
     @staticmethod
     def prepare_event_data_for_export(event: Event, orders: List[Order]) -> Dict[str, Any]:
         """Подготовка данных мероприятия для экспорта"""
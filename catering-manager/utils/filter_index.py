@@ -0,0 +1,121 @@
+"""
+Фильтрация загруженных моделей по заранее построенному индексу:
+корзины по значениям полей (категория, рейтинг) и индекс слов для поиска
+"""
+
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Слово для поиска: буквы и цифры
+WORD_PATTERN = re.compile(r"\w+")
+# До этого числа кандидатов слова проверяются у самих моделей, а не по всему индексу слов
+NARROW_SCAN_LIMIT = 2000
+
+
+def tokenize(text: str) -> List[str]:
+    """Слова строки в нижнем регистре"""
+    return WORD_PATTERN.findall(text.lower())
+
+
+class FilterIndex:
+    """
+    Индекс списка моделей. Поиск - по началу слов (каждое слово запроса должно
+    быть началом какого-либо слова модели), фильтры - по корзинам значений полей
+    """
+
+    def __init__(self, items: Iterable[Any], text: Optional[Callable[[Any], Iterable[str]]] = None,
+                 fields: Optional[Dict[str, Callable[[Any], Hashable]]] = None):
+        self.items: List[Any] = list(items)
+
+        # Поле -> значение -> номера моделей (по возрастанию)
+        self._buckets: Dict[str, Dict[Hashable, List[int]]] = {}
+        for name, key in (fields or {}).items():
+            buckets: Dict[Hashable, List[int]] = defaultdict(list)
+            for position, item in enumerate(self.items):
+                buckets[key(item)].append(position)
+            self._buckets[name] = dict(buckets)
+
+        # Слово -> номера моделей; отсортированный список слов - для поиска по началу
+        self._words: Dict[str, Set[int]] = defaultdict(set)
+        # Слова каждой модели - для сужения небольшого набора кандидатов
+        self._item_words: List[Tuple[str, ...]] = []
+        if text:
+            for position, item in enumerate(self.items):
+                words = tuple(word for value in text(item) for word in tokenize(str(value or "")))
+                self._item_words.append(words)
+                for word in words:
+                    self._words[word].add(position)
+        self._sorted_words = sorted(self._words)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def values(self, field: str) -> List[Hashable]:
+        """Значения поля, встречающиеся в индексе"""
+        return list(self._buckets[field])
+
+    def match(self, query: str = "", equals: Optional[Dict[str, Hashable]] = None,
+              at_least: Optional[Dict[str, Any]] = None,
+              within: Optional[Sequence[int]] = None) -> List[int]:
+        """
+        Номера подходящих моделей по возрастанию.
+        equals - поле равно значению, at_least - поле не меньше значения,
+        within - искать только среди этих номеров (сужение предыдущего результата)
+        """
+        equals = equals or {}
+        words = tokenize(query)
+        if within is None and not words and not at_least and len(equals) <= 1:
+            # Одна корзина или весь список - без пересечений и сортировки
+            if not equals:
+                return list(range(len(self.items)))
+            (field, value), = equals.items()
+            return list(self._buckets[field].get(value, ()))
+
+        candidates: Optional[Set[int]] = set(within) if within is not None else None
+
+        for field, value in equals.items():
+            candidates = self._narrow(candidates, self._buckets[field].get(value, ()))
+
+        for field, minimum in (at_least or {}).items():
+            positions: Set[int] = set()
+            for value, bucket in self._buckets[field].items():
+                if value >= minimum:
+                    positions.update(bucket)
+            candidates = self._narrow(candidates, positions)
+
+        for word in words:
+            candidates = self._narrow(candidates, self._prefix_positions(word, candidates))
+            if not candidates:
+                return []
+
+        if candidates is None:
+            return list(range(len(self.items)))
+        return sorted(candidates)
+
+    def items_at(self, positions: List[int]) -> List[Any]:
+        """Модели по номерам"""
+        return [self.items[position] for position in positions]
+
+    def _prefix_positions(self, prefix: str, candidates: Optional[Set[int]]) -> Set[int]:
+        """Номера моделей, у которых есть слово, начинающееся с prefix"""
+        if candidates is not None and len(candidates) <= NARROW_SCAN_LIMIT and self._item_words:
+            return {position for position in candidates
+                    if any(word.startswith(prefix) for word in self._item_words[position])}
+
+        positions: Set[int] = set()
+        words = self._sorted_words
+        index = bisect_left(words, prefix)
+        while index < len(words) and words[index].startswith(prefix):
+            bucket = self._words[words[index]]
+            positions.update(bucket if candidates is None else bucket & candidates)
+            index += 1
+        return positions
+
+    @staticmethod
+    def _narrow(candidates: Optional[Set[int]], positions: Iterable[int]) -> Set[int]:
+        """Пересечение с текущими кандидатами (None - все модели)"""
+        if candidates is None:
+            return set(positions)
+        return candidates.intersection(positions)
@@ -0,0 +1,55 @@
+"""
+Инкрементальная выгрузка позиций заказов для бухгалтерии:
+только строки, измененные после последней выгрузки (по журналу изменений)
+"""
+
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from database import CHANGE_UPSERT, CHANGE_DELETE
+from models import ChangeExportResult
+from utils.stream_export import StreamExporter, ExportColumn, ORDER_ITEM_EXPORT, KIND_NUMBER
+
+# Контрольная точка выгрузки для бухгалтерии
+CHECKPOINT_ACCOUNTING = "accounting_order_items"
+
+# Колонки выгрузки изменений: операция и id позиции перед полями позиции
+ORDER_ITEM_CHANGE_EXPORT = [
+    ExportColumn("op", "Операция"),
+    ExportColumn("id", "ID позиции", KIND_NUMBER),
+] + ORDER_ITEM_EXPORT
+
+
+class IncrementalExporter:
+    """Выгрузка изменений позиций заказов с контрольной точкой"""
+
+    @staticmethod
+    def export(db, filename: Path, full: bool = False, checkpoint: str = CHECKPOINT_ACCOUNTING,
+               track: Optional[Callable[[Iterable], Iterable]] = None) -> ChangeExportResult:
+        """
+        Записать в CSV/NDJSON (по расширению) позиции, измененные после контрольной точки.
+        full=True или первая выгрузка - все позиции (полная пересинхронизация).
+        Контрольная точка сохраняется только после успешной записи файла
+        """
+        since_id = None if full else db.get_export_checkpoint(checkpoint)
+        until_id = db.get_last_change_id()
+        counts = {CHANGE_UPSERT: 0, CHANGE_DELETE: 0}
+
+        def rows():
+            for row in db.iter_order_item_changes(since_id, until_id):
+                counts[row[0]] += 1
+                yield row
+
+        source = track(rows()) if track else rows()
+        if Path(filename).suffix == '.ndjson':
+            StreamExporter.to_ndjson(source, ORDER_ITEM_CHANGE_EXPORT, filename)
+        else:
+            StreamExporter.to_csv(source, ORDER_ITEM_CHANGE_EXPORT, filename)
+
+        db.save_export_checkpoint(checkpoint, until_id)
+        return ChangeExportResult(
+            full=since_id is None,
+            upserts=counts[CHANGE_UPSERT],
+            deletes=counts[CHANGE_DELETE],
+            checkpoint=until_id
+        )
@@ -0,0 +1,256 @@
+"""
+Постоянные диаграммы: при обновлении меняются данные готовых элементов
+(высоты столбцов, точки линий, подписи), а фигура перестраивается только при смене структуры
+"""
+
+import math
+from typing import Any, Hashable, List, Optional, Sequence
+
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+
+from utils.downsampling import Downsampler
+
+# Начальный угол круговой диаграммы, градусов
+PIE_START_ANGLE = 90
+# Расстояние подписей категорий и процентов от центра (в радиусах)
+PIE_LABEL_DISTANCE = 1.1
+PIE_PCT_DISTANCE = 0.6
+
+
+class LivePlot:
+    """Диаграмма на постоянной фигуре (должен быть переопределен)"""
+
+    def __init__(self, figure: Figure):
+        self.figure = figure
+        # Структура текущих элементов (None - фигура пуста)
+        self._shape: Optional[Hashable] = None
+        # Была ли фигура перестроена при последнем обновлении
+        self.rebuilt = False
+        self.rebuilds = 0
+
+    def update(self, data: Any) -> bool:
+        """Показать данные; False - нет данных для построения"""
+        self.rebuilt = False
+        if self.is_empty(data):
+            self.reset()
+            return False
+
+        shape = self.shape(data)
+        if shape == self._shape:
+            self.refresh(data)
+            return True
+
+        self.figure.clear()
+        self.build(data)
+        self._shape = shape
+        self.rebuilt = True
+        self.rebuilds += 1
+        return True
+
+    def reset(self):
+        """Очистить фигуру (следующее обновление перестроит ее)"""
+        self.figure.clear()
+        self._shape = None
+
+    def is_empty(self, data: Any) -> bool:
+        """Нет данных для построения"""
+        return not data
+
+    def shape(self, data: Any) -> Hashable:
+        """Структура диаграммы: при ее смене фигура строится заново"""
+        raise NotImplementedError
+
+    def build(self, data: Any):
+        """Построить элементы диаграммы на пустой фигуре"""
+        raise NotImplementedError
+
+    def refresh(self, data: Any):
+        """Обновить данные готовых элементов"""
+        raise NotImplementedError
+
+
+class ExpenseAnalysisPlot(LivePlot):
+    """Структура фактических расходов и сравнение план/факт (данные - expense_chart_data)"""
+
+    def is_empty(self, data: tuple) -> bool:
+        return not data or not data[1]
+
+    def shape(self, data: tuple) -> Hashable:
+        _, items = data
+        # Круговая диаграмма строится только при ненулевых расходах
+        return tuple(item[0] for item in items), sum(item[2] for item in items) > 0
+
+    def build(self, data: tuple):
+        name, items = data
+        categories = [item[0] for item in items]
+
+        self.pie_ax, self.bar_ax = self.figure.subplots(1, 2)
+        self.title = self.figure.suptitle(f'Анализ расходов - {name}', fontsize=14)
+
+        # Элементы круговой диаграммы создаются здесь, положение задает _place_pie()
+        self.wedges, self.pie_labels, self.pie_percents = [], [], []
+        if sum(item[2] for item in items) > 0:
+            self.wedges, self.pie_labels, self.pie_percents = self.pie_ax.pie(
+                [item[2] for item in items], labels=categories, autopct='%1.1f%%',
+                startangle=PIE_START_ANGLE, labeldistance=PIE_LABEL_DISTANCE,
+                pctdistance=PIE_PCT_DISTANCE, textprops={'fontsize': 8}
+            )
+        self.pie_ax.set_title('Фактические расходы по категориям')
+
+        x = range(len(categories))
+        width = 0.4
+        self.planned_bars = self.bar_ax.bar([i - width / 2 for i in x], [item[1] for item in items],
+                                            width, label='План', alpha=0.7)
+        self.actual_bars = self.bar_ax.bar([i + width / 2 for i in x], [item[2] for item in items],
+                                           width, label='Факт', alpha=0.7)
+        self.bar_ax.set_xlabel('Категории')
+        self.bar_ax.set_ylabel('Сумма, руб')
+        self.bar_ax.set_title('Сравнение плановых и фактических расходов')
+        self.bar_ax.set_xticks(list(x))
+        self.bar_ax.set_xticklabels(categories, rotation=45, ha='right', fontsize=8)
+        self.bar_ax.legend()
+
+    def refresh(self, data: tuple):
+        name, items = data
+        self.title.set_text(f'Анализ расходов - {name}')
+
+        for bar, item in zip(self.planned_bars, items):
+            bar.set_height(item[1])
+        for bar, item in zip(self.actual_bars, items):
+            bar.set_height(item[2])
+        self.bar_ax.relim()
+        self.bar_ax.autoscale_view()
+
+        if self.wedges:
+            self._place_pie([item[2] for item in items])
+
+    def _place_pie(self, values: List[float]):
+        """Пересчитать углы секторов и положение подписей (как в Axes.pie)"""
+        total = sum(values)
+        start = PIE_START_ANGLE / 360
+        for wedge, label, percent, value in zip(self.wedges, self.pie_labels, self.pie_percents, values):
+            fraction = value / total
+            end = start + fraction
+            wedge.set_theta1(360 * start)
+            wedge.set_theta2(360 * end)
+
+            middle = math.pi * (start + end)
+            x, y = math.cos(middle), math.sin(middle)
+            label.set_position((PIE_LABEL_DISTANCE * x, PIE_LABEL_DISTANCE * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            percent.set_position((PIE_PCT_DISTANCE * x, PIE_PCT_DISTANCE * y))
+            percent.set_text(f'{fraction * 100:.1f}%')
+            start = end
+
+
+class TimeSeriesPlot(LivePlot):
+    """
+    Линии по датам с прореживанием: полный ряд хранится, на оси выводится не больше
+    точек, чем пикселей по ширине; при изменении пределов оси (масштаб) ряд прореживается заново
+    """
+
+    def __init__(self, figure: Figure):
+        super().__init__(figure)
+        # Линии и полные ряды: (линия, x в числах, y)
+        self._series: List[tuple] = []
+
+    def _plot_series(self, ax: Axes, points: Sequence[tuple], **kwargs) -> Line2D:
+        """Построить линию по ряду (x, y), отсортированному по x"""
+        xs = [Downsampler.x_value(p[0]) for p in points]
+        ys = [p[1] for p in points]
+        # Первичное построение - по исходным x, чтобы ось получила единицы дат
+        indexes = Downsampler.lttb(xs, ys, Downsampler.points_for_width(ax.bbox.width))
+        line, = ax.plot([points[i][0] for i in indexes], [ys[i] for i in indexes], **kwargs)
+        self._series.append((line, xs, ys))
+
+        if len(self._series) == 1:
+            ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+        return line
+
+    def _set_series(self, number: int, points: Sequence[tuple]):
+        """Заменить ряд линии (пределы осей пересчитываются вызывающим)"""
+        line, _, _ = self._series[number]
+        xs = [Downsampler.x_value(p[0]) for p in points]
+        ys = [p[1] for p in points]
+        self._series[number] = (line, xs, ys)
+        self._resample_line(line, xs, ys, 0, len(xs))
+
+    def _fit_view(self, ax: Axes):
+        """Пределы оси по новым данным (масштаб с панели отключает автомасштаб - включаем снова)"""
+        ax.set_autoscalex_on(True)
+        ax.set_autoscaley_on(True)
+        ax.relim()
+        ax.autoscale_view()
+
+    def reset(self):
+        super().reset()
+        self._series = []
+
+    def build(self, data: Any):
+        self._series = []
+
+    def resample(self):
+        """Проредить ряды под текущие пределы и ширину осей"""
+        for line, xs, ys in self._series:
+            x_min, x_max = sorted(line.axes.get_xlim())
+            start, end = Downsampler.visible_range(xs, x_min, x_max)
+            self._resample_line(line, xs, ys, start, end)
+
+    def _resample_line(self, line: Line2D, xs: List[float], ys: List[float], start: int, end: int):
+        threshold = Downsampler.points_for_width(line.axes.bbox.width)
+        indexes = Downsampler.lttb(xs[start:end], ys[start:end], threshold)
+        line.set_data([xs[start + i] for i in indexes], [ys[start + i] for i in indexes])
+
+    def _on_xlim_changed(self, ax: Axes):
+        """Пределы оси изменились (масштаб, сдвиг, новые данные)"""
+        self.resample()
+
+
+class PriceHistoryPlot(TimeSeriesPlot):
+    """Динамика цен по поставщикам или позициям (данные - price_history_chart_data)"""
+
+    def shape(self, data: tuple) -> Hashable:
+        return tuple(supplier for supplier, _ in data)
+
+    def build(self, data: tuple):
+        super().build(data)
+        self.ax = self.figure.add_subplot()
+        self.lines = [
+            self._plot_series(self.ax, points, marker='o', label=supplier, linewidth=2)
+            for supplier, points in data
+        ]
+
+        self.ax.set_xlabel('Дата')
+        self.ax.set_ylabel('Цена, руб')
+        self.ax.set_title('Динамика изменения цен')
+        self.ax.legend()
+        self.ax.grid(True, alpha=0.3)
+        self.figure.autofmt_xdate()
+
+    def refresh(self, data: tuple):
+        for number, (_, points) in enumerate(data):
+            self._set_series(number, points)
+        self._fit_view(self.ax)
+
+
+class SpendTimelinePlot(TimeSeriesPlot):
+    """Расходы по дням за период (данные - daily_spend_chart_data)"""
+
+    def shape(self, data: tuple) -> Hashable:
+        # Одна линия: фигура строится один раз, дальше меняются только точки
+        return 'spend'
+
+    def build(self, data: tuple):
+        super().build(data)
+        self.ax = self.figure.add_subplot()
+        self.line = self._plot_series(self.ax, data, color='lightcoral', linewidth=1.5)
+        self.ax.set_ylabel('Сумма, руб')
+        self.ax.set_title('Расходы по дням')
+        self.ax.grid(True, alpha=0.3)
+        self.figure.autofmt_xdate()
+
+    def refresh(self, data: tuple):
+        self._set_series(0, data)
+        self._fit_view(self.ax)
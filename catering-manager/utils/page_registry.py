@@ -0,0 +1,97 @@
+"""
+Страницы главного окна: создаются при первом переходе (или заранее, после
+первой отрисовки) и выгружаются, если долго остаются скрытыми
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class PageRegistry:
+    """Реестр страниц по имени; страница - объект с методом destroy()"""
+
+    def __init__(self, idle_timeout: float = 0, clock: Callable[[], float] = time.monotonic):
+        # Через сколько секунд скрытая страница выгружается (0 - не выгружать)
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        # Страницы, которые не выгружаются
+        self._pinned: Set[str] = set()
+        self._pages: Dict[str, Any] = {}
+        # Когда страница последний раз была видна (или создана)
+        self._last_used: Dict[str, float] = {}
+        self.current: Optional[str] = None
+        self.created = 0
+        self.unloaded = 0
+
+    def register(self, name: str, factory: Callable[[], Any], pinned: bool = False):
+        """Зарегистрировать страницу; factory() создает ее при первом обращении"""
+        self._factories[name] = factory
+        if pinned:
+            self._pinned.add(name)
+
+    def get(self, name: str) -> Any:
+        """Страница по имени (создается, если еще не создана)"""
+        page = self._pages.get(name)
+        if page is None:
+            started = self.clock()
+            page = self._factories[name]()
+            self._pages[name] = page
+            self.created += 1
+            logger.debug(f"Страница {name} создана за {self.clock() - started:.3f} с")
+        self._last_used[name] = self.clock()
+        return page
+
+    def show(self, name: str) -> Any:
+        """Сделать страницу текущей; вернуть ее (предыдущая считается скрытой с этого момента)"""
+        if self.current is not None and self.current in self._pages:
+            self._last_used[self.current] = self.clock()
+        page = self.get(name)
+        self.current = name
+        return page
+
+    def is_loaded(self, name: str) -> bool:
+        """Создана ли страница"""
+        return name in self._pages
+
+    def loaded(self) -> List[Any]:
+        """Созданные страницы"""
+        return list(self._pages.values())
+
+    def prewarm_next(self) -> Optional[str]:
+        """Создать следующую (в порядке регистрации) еще не созданную страницу; вернуть ее имя"""
+        for name in self._factories:
+            if name not in self._pages:
+                self.get(name)
+                return name
+        return None
+
+    def unload_idle(self) -> List[str]:
+        """Выгрузить страницы, скрытые дольше idle_timeout; вернуть их имена"""
+        if not self.idle_timeout:
+            return []
+
+        now = self.clock()
+        names = [
+            name for name in self._pages
+            if name != self.current and name not in self._pinned
+            and now - self._last_used.get(name, now) >= self.idle_timeout
+        ]
+        for name in names:
+            self.unload(name)
+        return names
+
+    def unload(self, name: str):
+        """Уничтожить страницу (при следующем обращении она будет создана заново)"""
+        page = self._pages.pop(name, None)
+        self._last_used.pop(name, None)
+        if page is None:
+            return
+        try:
+            page.destroy()
+        except Exception as e:
+            logger.warning(f"Не удалось выгрузить страницу {name}: {e}")
+        self.unloaded += 1
@@ -0,0 +1,340 @@
+"""
+Отчеты в PDF (reportlab platypus)
+Таблицы верстаются частями, flowables создаются по мере заполнения страниц
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+import matplotlib
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from config import Config
+from models import Event, EventSummary
+from utils.chart_service import (
+    ChartService, CHART_EXPENSE_CATEGORIES, CHART_PORTFOLIO_BUDGET, expense_chart_data, portfolio_chart_data
+)
+from utils.formatters import Formatters
+
+# Шрифты с кириллицей (поставляются вместе с matplotlib)
+PDF_FONT = "VostokSans"
+PDF_FONT_BOLD = "VostokSans-Bold"
+
+# Строк в одной части таблицы (примерно страница A4)
+TABLE_CHUNK_ROWS = 40
+# Сколько flowables держать готовыми наперед
+FEED_BUFFER_SIZE = 10
+
+PAGE_MARGIN = 15 * mm
+CONTENT_WIDTH = A4[0] - 2 * PAGE_MARGIN
+
+HEADER_COLOR = colors.HexColor("#2F75B5")
+
+_fonts = None
+
+
+def _register_fonts() -> tuple:
+    """Зарегистрировать шрифты один раз; без DejaVu - стандартные шрифты PDF"""
+    global _fonts
+    if _fonts is None:
+        font_dir = Path(matplotlib.get_data_path()) / "fonts" / "ttf"
+        try:
+            pdfmetrics.registerFont(TTFont(PDF_FONT, str(font_dir / "DejaVuSans.ttf")))
+            pdfmetrics.registerFont(TTFont(PDF_FONT_BOLD, str(font_dir / "DejaVuSans-Bold.ttf")))
+            _fonts = (PDF_FONT, PDF_FONT_BOLD)
+        except Exception:
+            _fonts = ("Helvetica", "Helvetica-Bold")
+    return _fonts
+
+
+def _styles() -> Dict[str, ParagraphStyle]:
+    """Стили абзацев отчета"""
+    regular, bold = _register_fonts()
+    base = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle('VostokTitle', parent=base['Title'], fontName=bold, fontSize=16),
+        'heading': ParagraphStyle('VostokHeading', parent=base['Heading2'], fontName=bold, fontSize=12),
+        'normal': ParagraphStyle('VostokNormal', parent=base['Normal'], fontName=regular, fontSize=9),
+        'cell': ParagraphStyle('VostokCell', parent=base['Normal'], fontName=regular, fontSize=8, leading=9.5),
+    }
+
+
+class _FlowableFeed(list):
+    """Список flowables, пополняемый из генератора по мере верстки страниц"""
+
+    def __init__(self, flowables: Iterable, buffer_size: int = FEED_BUFFER_SIZE):
+        super().__init__()
+        self._source = iter(flowables)
+        self._buffer_size = buffer_size
+
+    def __len__(self):
+        # platypus проверяет длину перед каждым flowable - здесь и дозаполняем
+        while self._source is not None and list.__len__(self) < self._buffer_size:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+        return list.__len__(self)
+
+
+def _draw_footer(canvas, doc):
+    """Колонтитул: организация, дата формирования и номер страницы"""
+    regular, _ = _register_fonts()
+    canvas.saveState()
+    canvas.setFont(regular, 7)
+    canvas.setFillColor(colors.grey)
+    canvas.drawString(PAGE_MARGIN, 8 * mm, f"{Config.APP_COMPANY} · {doc.generated_at}")
+    canvas.drawRightString(A4[0] - PAGE_MARGIN, 8 * mm, f"Страница {doc.page}")
+    canvas.restoreState()
+
+
+def _table_style(bold_font: str, has_total: bool = False) -> TableStyle:
+    """Оформление таблиц отчета"""
+    commands = [
+        ('FONTNAME', (0, 0), (-1, -1), _register_fonts()[0]),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('FONTNAME', (0, 0), (-1, 0), bold_font),
+        ('BACKGROUND', (0, 0), (-1, 0), HEADER_COLOR),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.lightgrey),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor("#F2F2F2")]),
+    ]
+    if has_total:
+        commands += [
+            ('FONTNAME', (0, -1), (-1, -1), bold_font),
+            ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor("#DDEBF7")),
+        ]
+    return TableStyle(commands)
+
+
+def _chunked_table(header: Sequence[str], rows: Iterable[Sequence], col_widths: Sequence[float],
+                   total: Optional[Sequence] = None) -> Iterator[Table]:
+    """Таблица частями по TABLE_CHUNK_ROWS строк, заголовок повторяется в каждой части"""
+    _, bold = _register_fonts()
+    chunk: List[Sequence] = []
+
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == TABLE_CHUNK_ROWS:
+            yield Table([header] + chunk, colWidths=col_widths, style=_table_style(bold))
+            chunk = []
+
+    if total:
+        chunk.append(total)
+    if chunk or total is not None:
+        yield Table([header] + chunk, colWidths=col_widths, style=_table_style(bold, bool(total)))
+
+
+def _text(value: Optional[str], style: ParagraphStyle) -> Paragraph:
+    """Абзац из данных: разметка reportlab в названиях экранируется"""
+    return Paragraph(escape(value or ""), style)
+
+
+def _image(path: Path, max_height: float = 95 * mm) -> Image:
+    """Изображение диаграммы, вписанное в ширину страницы"""
+    width, height = ImageReader(str(path)).getSize()
+    scale = min(CONTENT_WIDTH / width, max_height / height)
+    return Image(str(path), width=width * scale, height=height * scale)
+
+
+def _db_date(value: Optional[str]) -> str:
+    """Дата из строки БД (ISO) в формате отчетов"""
+    if not value:
+        return ""
+    return Formatters.format_date(datetime.fromisoformat(value).date())
+
+
+def _money(value) -> str:
+    """Денежная сумма без символа валюты (колонки таблиц)"""
+    return Formatters.format_currency(value, show_symbol=False)
+
+
+class PdfReportRenderer:
+    """Формирование отчетов в PDF"""
+
+    @staticmethod
+    def build(flowables: Iterable, filename: Path, title: str) -> int:
+        """Сверстать документ из генератора flowables, вернуть число страниц"""
+        doc = SimpleDocTemplate(
+            str(filename),
+            pagesize=A4,
+            leftMargin=PAGE_MARGIN, rightMargin=PAGE_MARGIN,
+            topMargin=PAGE_MARGIN, bottomMargin=PAGE_MARGIN,
+            title=title,
+            author=Config.APP_COMPANY
+        )
+        doc.generated_at = Formatters.format_datetime(datetime.now())
+        doc.build(_FlowableFeed(flowables), onFirstPage=_draw_footer, onLaterPages=_draw_footer)
+        return doc.page
+
+    @staticmethod
+    def render_event_summary(summary: EventSummary, filename: Path, chart_path: Optional[Path] = None,
+                             items: Optional[Iterable[Sequence]] = None) -> int:
+        """
+        Отчет по расходам мероприятия. items - строки позиций заказов
+        (как из DatabaseManager.iter_order_items), читаются по мере верстки
+        """
+        return PdfReportRenderer.build(
+            PdfReportRenderer._event_flowables(summary, chart_path, items),
+            filename,
+            f"Отчет по мероприятию: {summary.event.name}"
+        )
+
+    @staticmethod
+    def render_portfolio(events: List[Event], spent_by_event: Dict[int, Decimal], filename: Path,
+                         chart_path: Optional[Path] = None,
+                         track: Optional[Callable[[Iterable], Iterable]] = None) -> int:
+        """Общий отчет по всем мероприятиям; track оборачивает строки таблицы (ход и отмена)"""
+        return PdfReportRenderer.build(
+            PdfReportRenderer._portfolio_flowables(events, spent_by_event, chart_path, track),
+            filename,
+            "Общий отчет по мероприятиям"
+        )
+
+    @staticmethod
+    def export_event(db, event_id: int, filename: Path, charts: Optional[ChartService] = None,
+                     track: Optional[Callable[[Iterable], Iterable]] = None) -> int:
+        """Отчет по мероприятию из БД с диаграммой из кэша; track оборачивает поток позиций"""
+        summary = db.get_event_summary(event_id)
+        if not summary:
+            raise ValueError(f"Мероприятие {event_id} не найдено")
+
+        chart_path = (charts or ChartService()).render(CHART_EXPENSE_CATEGORIES, expense_chart_data(summary))
+        items = db.iter_order_items(event_id)
+        return PdfReportRenderer.render_event_summary(
+            summary, filename, chart_path, track(items) if track else items
+        )
+
+    @staticmethod
+    def export_portfolio(events: List[Event], spent_by_event: Dict[int, Decimal], filename: Path,
+                         charts: Optional[ChartService] = None,
+                         track: Optional[Callable[[Iterable], Iterable]] = None) -> int:
+        """Общий отчет с диаграммой бюджета и расходов"""
+        chart_path = (charts or ChartService()).render(
+            CHART_PORTFOLIO_BUDGET, portfolio_chart_data(events, spent_by_event),
+            size=(8, 0.35 * min(len(events), 15) + 1.5)
+        )
+        return PdfReportRenderer.render_portfolio(events, spent_by_event, filename, chart_path, track)
+
+    @staticmethod
+    def _event_flowables(summary: EventSummary, chart_path: Optional[Path],
+                         items: Optional[Iterable[Sequence]]) -> Iterator:
+        """Содержимое отчета по мероприятию"""
+        styles = _styles()
+        event = summary.event
+        cell = styles['cell']
+
+        yield _text(f"Отчет по расходам: {event.name}", styles['title'])
+
+        info = [
+            ("Дата проведения", Formatters.format_date(event.event_date)),
+            ("Количество гостей", str(event.guests_count)),
+            ("Статус", event.status),
+            ("Место проведения", event.location or "-"),
+            ("Ответственный", event.responsible_person or "-"),
+            ("Бюджет", Formatters.format_currency(event.budget)),
+            ("Потрачено", Formatters.format_currency(summary.total_amount)),
+            ("Остаток", Formatters.format_currency(event.budget - summary.total_amount)),
+            ("Использовано бюджета", Formatters.format_percentage(summary.budget_utilization)),
+            ("Заказов", str(summary.total_orders)),
+        ]
+        regular, bold = _register_fonts()
+        yield Table(info, colWidths=[55 * mm, CONTENT_WIDTH - 55 * mm], style=TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), regular),
+            ('FONTNAME', (0, 0), (0, -1), bold),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('LINEBELOW', (0, 0), (-1, -1), 0.25, colors.lightgrey),
+        ]))
+
+        if chart_path:
+            yield Spacer(1, 6 * mm)
+            yield _image(chart_path)
+
+        yield Paragraph("Расходы по категориям", styles['heading'])
+        planned = sum((item.planned_amount for item in summary.categories_summary), Decimal('0'))
+        actual = sum((item.actual_amount for item in summary.categories_summary), Decimal('0'))
+        yield from _chunked_table(
+            ["Категория", "План", "Факт", "Отклонение", "Исполнение"],
+            ((_text(item.category_name, cell),
+              _money(item.planned_amount),
+              _money(item.actual_amount),
+              _money(item.actual_amount - item.planned_amount),
+              Formatters.format_percentage(item.percentage))
+             for item in summary.categories_summary),
+            [CONTENT_WIDTH - 128 * mm, 32 * mm, 32 * mm, 34 * mm, 30 * mm],
+            ["ИТОГО", _money(planned), _money(actual), _money(actual - planned), ""]
+        )
+
+        if items is None:
+            return
+
+        yield Paragraph("Позиции заказов", styles['heading'])
+        yield from _chunked_table(
+            ["Заказ", "Дата", "Позиция", "Поставщик", "Кол-во", "Цена", "Сумма"],
+            ((number,
+              _db_date(order_date),
+              _text(nomenclature, cell),
+              _text(supplier, cell),
+              Formatters.format_quantity(quantity or 0, unit or ""),
+              _money(unit_price or 0),
+              _money(total or 0))
+             for number, order_date, _, nomenclature, unit, _, supplier, quantity, unit_price, total, _
+             in items),
+            [28 * mm, 18 * mm, CONTENT_WIDTH - 152 * mm, 36 * mm, 20 * mm, 24 * mm, 26 * mm]
+        )
+
+    @staticmethod
+    def _portfolio_flowables(events: List[Event], spent_by_event: Dict[int, Decimal],
+                             chart_path: Optional[Path],
+                             track: Optional[Callable[[Iterable], Iterable]] = None) -> Iterator:
+        """Содержимое общего отчета"""
+        styles = _styles()
+        cell = styles['cell']
+
+        total_budget = sum((event.budget for event in events), Decimal('0'))
+        total_spent = sum((spent_by_event.get(event.id, Decimal('0')) for event in events), Decimal('0'))
+
+        yield Paragraph("Общий отчет по мероприятиям", styles['title'])
+        yield Paragraph(
+            f"Мероприятий: {len(events)} · Бюджет: {Formatters.format_currency(total_budget)} · "
+            f"Потрачено: {Formatters.format_currency(total_spent)}",
+            styles['normal']
+        )
+
+        if chart_path:
+            yield Spacer(1, 6 * mm)
+            yield _image(chart_path)
+        yield Spacer(1, 6 * mm)
+
+        def rows():
+            for event in events:
+                spent = spent_by_event.get(event.id, Decimal('0'))
+                percentage = float(spent / event.budget * 100) if event.budget > 0 else 0.0
+                yield (_text(event.name, cell),
+                       Formatters.format_date(event.event_date),
+                       event.status,
+                       str(event.guests_count),
+                       _money(event.budget),
+                       _money(spent),
+                       Formatters.format_percentage(percentage))
+
+        total_percentage = float(total_spent / total_budget * 100) if total_budget > 0 else 0.0
+        yield from _chunked_table(
+            ["Мероприятие", "Дата", "Статус", "Гостей", "Бюджет", "Потрачено", "Исп."],
+            track(rows()) if track else rows(),
+            [CONTENT_WIDTH - 129 * mm, 20 * mm, 22 * mm, 14 * mm, 28 * mm, 28 * mm, 17 * mm],
+            ["ИТОГО", "", "", str(sum(event.guests_count for event in events)),
+             _money(total_budget), _money(total_spent), Formatters.format_percentage(total_percentage)]
+        )
@@ -0,0 +1,108 @@
+"""
+Индекс быстрого ввода: автодополнение по началу названия или любого его слова
+(отсортированные нормализованные названия + bisect) и выбор модели по id
+"""
+
+import operator
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from models import Nomenclature, Supplier
+
+# Вариантов в выпадающем списке
+QUICK_ENTRY_LIMIT = 50
+
+
+def normalize(text: str) -> str:
+    """Название для сравнения: нижний регистр, ё -> е, одиночные пробелы"""
+    return " ".join(str(text or "").lower().replace("ё", "е").split())
+
+
+class QuickEntryIndex:
+    """
+    Индекс моделей по отображаемому названию. Одинаковые названия различаются
+    добавлением id, поэтому выбранный текст однозначно определяет модель
+    """
+
+    def __init__(self, items: Iterable[Any], label: Callable[[Any], str],
+                 key: Callable[[Any], Hashable] = operator.attrgetter('id')):
+        self._items: Dict[Hashable, Any] = {}
+        self._labels: Dict[Hashable, str] = {}
+        # Нормализованное название -> id
+        self._by_label: Dict[str, Hashable] = {}
+
+        starts: List[Tuple[str, Hashable]] = []
+        words: List[Tuple[str, Hashable]] = []
+        for item in items:
+            item_key = key(item)
+            text = label(item)
+            if normalize(text) in self._by_label:
+                text = f"{text} #{item_key}"
+            normalized = normalize(text)
+
+            self._items[item_key] = item
+            self._labels[item_key] = text
+            self._by_label[normalized] = item_key
+
+            # Начало названия и начала остальных слов - отдельные входы
+            starts.append((normalized, item_key))
+            position = normalized.find(" ")
+            while position >= 0:
+                words.append((normalized[position + 1:], item_key))
+                position = normalized.find(" ", position + 1)
+
+        starts.sort(key=operator.itemgetter(0))
+        words.sort(key=operator.itemgetter(0))
+        self._starts = [text for text, _ in starts]
+        self._start_keys = [item_key for _, item_key in starts]
+        self._words = [text for text, _ in words]
+        self._word_keys = [item_key for _, item_key in words]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def complete(self, text: str, limit: int = QUICK_ENTRY_LIMIT) -> List[str]:
+        """Названия, начинающиеся с текста (сначала совпадения с началом названия, затем слов)"""
+        prefix = normalize(text)
+        found: Dict[Hashable, None] = {}
+        for entries, keys in ((self._starts, self._start_keys), (self._words, self._word_keys)):
+            index = bisect_left(entries, prefix)
+            while index < len(entries) and len(found) < limit and entries[index].startswith(prefix):
+                found.setdefault(keys[index])
+                index += 1
+        return [self._labels[item_key] for item_key in found]
+
+    def resolve(self, text: str) -> Optional[Any]:
+        """Модель по выбранному названию (None - такого названия нет)"""
+        item_key = self._by_label.get(normalize(text))
+        return self._items.get(item_key) if item_key is not None else None
+
+    def get(self, item_key: Hashable) -> Optional[Any]:
+        """Модель по id"""
+        return self._items.get(item_key)
+
+    def label(self, item_key: Hashable) -> str:
+        """Отображаемое название модели по id"""
+        return self._labels.get(item_key, "")
+
+
+@dataclass
+class OrderCatalogs:
+    """Справочники формы заказа: все позиции и поставщики, индексы быстрого ввода - по активным"""
+    nomenclatures: List[Nomenclature]
+    suppliers: List[Supplier]
+    nomenclature_index: QuickEntryIndex
+    supplier_index: QuickEntryIndex
+
+
+def load_order_catalogs(controller) -> OrderCatalogs:
+    """Загрузить справочники формы заказа и построить индексы; выполняется в рабочем потоке"""
+    nomenclatures = controller.get_all_nomenclatures()
+    suppliers = controller.get_all_suppliers()
+    return OrderCatalogs(
+        nomenclatures,
+        suppliers,
+        QuickEntryIndex((n for n in nomenclatures if n.is_active), lambda n: f"{n.name} ({n.unit})"),
+        QuickEntryIndex((s for s in suppliers if s.is_active), lambda s: s.name)
+    )
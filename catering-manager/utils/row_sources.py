@@ -0,0 +1,102 @@
+"""
+Источники строк для виртуальных таблиц: строка форматируется и загружается
+только когда попадает в видимое окно таблицы
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, List, Sequence, Tuple
+
+# Строка таблицы: (значения колонок, теги)
+Row = Tuple[tuple, tuple]
+RowFormatter = Callable[[Any], Row]
+
+# Размер страницы и число страниц в кэше постраничного источника
+PAGE_SIZE = 200
+PAGE_CACHE_LIMIT = 10
+
+
+class RowSource:
+    """Источник строк (должен быть переопределен)"""
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def item(self, index: int) -> Any:
+        """Объект строки (модель) по номеру"""
+        raise NotImplementedError
+
+    def rows(self, start: int, count: int) -> List[Row]:
+        """Строки таблицы [start, start + count)"""
+        end = min(start + count, len(self))
+        return [self.formatter(self.item(index)) for index in range(max(start, 0), end)]
+
+    def index_of(self, predicate: Callable[[Any], bool]) -> int:
+        """Номер первой строки, для которой predicate истинен (-1 - не найдена)"""
+        for index in range(len(self)):
+            if predicate(self.item(index)):
+                return index
+        return -1
+
+
+class ListSource(RowSource):
+    """Строки из загруженного списка моделей (форматируются только видимые)"""
+
+    def __init__(self, items: Sequence[Any], formatter: RowFormatter):
+        self.items = items
+        self.formatter = formatter
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def item(self, index: int) -> Any:
+        return self.items[index]
+
+
+class PagedSource(RowSource):
+    """
+    Строки из постраничного запроса: count() - общее число строк,
+    fetch(offset, limit) - страница моделей. Последние страницы кэшируются
+    """
+
+    def __init__(self, count: Callable[[], int], fetch: Callable[[int, int], Sequence[Any]],
+                 formatter: RowFormatter, page_size: int = PAGE_SIZE, cache_limit: int = PAGE_CACHE_LIMIT):
+        self.fetch = fetch
+        self.formatter = formatter
+        self.page_size = page_size
+        self.cache_limit = cache_limit
+        self._count = count()
+        self._pages: "OrderedDict[int, Sequence[Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def item(self, index: int) -> Any:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        page, position = divmod(index, self.page_size)
+        items = self._page(page)
+        if position >= len(items):
+            # Данные уменьшились после подсчета строк
+            raise IndexError(index)
+        return items[position]
+
+    def rows(self, start: int, count: int) -> List[Row]:
+        result = []
+        for index in range(max(start, 0), min(start + count, self._count)):
+            try:
+                result.append(self.formatter(self.item(index)))
+            except IndexError:
+                break
+        return result
+
+    def _page(self, page: int) -> Sequence[Any]:
+        """Страница из кэша или из запроса"""
+        if page in self._pages:
+            self._pages.move_to_end(page)
+            return self._pages[page]
+
+        items = self.fetch(page * self.page_size, self.page_size)
+        self._pages[page] = items
+        if len(self._pages) > self.cache_limit:
+            self._pages.popitem(last=False)
+        return items
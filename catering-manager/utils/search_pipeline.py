@@ -0,0 +1,87 @@
+"""
+Поиск для страниц-списков: запуск после паузы в наборе, сужение предыдущего
+результата при удлинении запроса и отмена устаревших запусков
+"""
+
+import tkinter as tk
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.filter_index import FilterIndex, tokenize
+
+# Пауза в наборе перед поиском, мс
+SEARCH_DELAY_MS = 250
+
+
+class SearchPipeline:
+    """Поиск по FilterIndex страницы; результат передается в on_result(модели, всего моделей)"""
+
+    def __init__(self, widget, on_result: Callable[[List[Any], int], None], delay_ms: int = SEARCH_DELAY_MS):
+        self.widget = widget
+        self.on_result = on_result
+        self.delay_ms = delay_ms
+        self.index = FilterIndex([])
+
+        self._query = ""
+        self._filters: Tuple[Dict[str, Any], Dict[str, Any]] = ({}, {})
+        # Последний результат: (запрос, фильтры, номера моделей)
+        self._last: Optional[tuple] = None
+        self._pending = None
+        self.passes = 0
+        self.narrowed_passes = 0
+
+    def set_index(self, index: FilterIndex):
+        """Новый индекс (после загрузки данных); поиск запускается вызовом set_filters/run_now"""
+        self.index = index
+        self._last = None
+
+    def set_query(self, query: str):
+        """Текст поиска изменился: поиск - после паузы в наборе"""
+        self._query = query
+        self._cancel_pending()
+        try:
+            self._pending = self.widget.after(self.delay_ms, self.run_now)
+        except tk.TclError:
+            # Виджет уже уничтожен
+            self._pending = None
+
+    def set_filters(self, equals: Optional[Dict[str, Any]] = None, at_least: Optional[Dict[str, Any]] = None):
+        """Фильтры изменились: поиск сразу"""
+        self._filters = (dict(equals or {}), dict(at_least or {}))
+        self.run_now()
+
+    def run_now(self):
+        """Выполнить поиск сейчас (отложенный запуск отменяется)"""
+        self._cancel_pending()
+        positions = self.search()
+        self.on_result(self.index.items_at(positions), len(self.index))
+
+    def search(self) -> List[int]:
+        """Номера подходящих моделей (с сужением предыдущего результата, если возможно)"""
+        query = " ".join(tokenize(self._query))
+        within = None
+
+        if self._last is not None:
+            last_query, last_filters, last_positions = self._last
+            if last_filters == self._filters:
+                if query == last_query:
+                    return last_positions
+                # Запрос только удлинился: новые совпадения - подмножество прежних
+                if query.startswith(last_query) and len(last_positions) < len(self.index):
+                    within = last_positions
+
+        equals, at_least = self._filters
+        positions = self.index.match(query, equals, at_least, within=within)
+        self._last = (query, self._filters, positions)
+        self.passes += 1
+        if within is not None:
+            self.narrowed_passes += 1
+        return positions
+
+    def _cancel_pending(self):
+        """Отменить отложенный запуск"""
+        if self._pending is not None:
+            try:
+                self.widget.after_cancel(self._pending)
+            except tk.TclError:
+                pass
+            self._pending = None
@@ -0,0 +1,144 @@
+"""
+Потоковый экспорт в CSV и NDJSON прямо из курсоров БД
+"""
+
+import csv
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Sequence, Tuple
+
+# Размер буфера файла при записи, байт
+EXPORT_BUFFER_SIZE = 1024 * 1024
+
+# Типы колонок
+KIND_TEXT = "text"
+KIND_NUMBER = "number"
+KIND_MONEY = "money"
+KIND_DATE = "date"
+
+
+@dataclass
+class ExportColumn:
+    """Колонка выгрузки: ключ (NDJSON), заголовок (CSV) и тип значения"""
+    key: str
+    title: str
+    kind: str = KIND_TEXT
+
+
+# Колонки выгрузки позиций заказов (порядок - как в DatabaseManager.iter_order_items)
+ORDER_ITEM_EXPORT = [
+    ExportColumn("order_number", "Номер заказа"),
+    ExportColumn("order_date", "Дата заказа", KIND_DATE),
+    ExportColumn("event", "Мероприятие"),
+    ExportColumn("nomenclature", "Позиция"),
+    ExportColumn("unit", "Ед. изм."),
+    ExportColumn("category", "Категория"),
+    ExportColumn("supplier", "Поставщик"),
+    ExportColumn("quantity", "Количество", KIND_NUMBER),
+    ExportColumn("unit_price", "Цена", KIND_MONEY),
+    ExportColumn("total_price", "Стоимость", KIND_MONEY),
+    ExportColumn("notes", "Примечания"),
+]
+
+# Колонки общего отчета по мероприятиям
+EVENT_OVERVIEW_EXPORT = [
+    ExportColumn("name", "Название мероприятия"),
+    ExportColumn("event_date", "Дата", KIND_DATE),
+    ExportColumn("status", "Статус"),
+    ExportColumn("guests_count", "Гостей", KIND_NUMBER),
+    ExportColumn("budget", "Бюджет", KIND_MONEY),
+    ExportColumn("spent", "Потрачено", KIND_MONEY),
+    ExportColumn("remaining", "Остаток", KIND_MONEY),
+    ExportColumn("percentage", "Использовано (%)", KIND_NUMBER),
+]
+
+
+def _to_iso(value: Any) -> Any:
+    """Дата/время - в ISO (строки из БД уже в ISO)"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_money(value: Any) -> Any:
+    """Денежная сумма с двумя знаками"""
+    return "" if value is None else f"{float(value):.2f}"
+
+
+def _json_money(value: Any) -> Any:
+    """Денежная сумма числом с двумя знаками"""
+    return None if value is None else round(float(value), 2)
+
+
+def _decimal_to_float(value: Any) -> Any:
+    """Decimal - числом (json не умеет Decimal)"""
+    return float(value) if isinstance(value, Decimal) else value
+
+
+# Преобразователи по типам колонок
+CSV_CONVERTERS = {KIND_MONEY: _csv_money, KIND_DATE: _to_iso}
+JSON_CONVERTERS = {KIND_MONEY: _json_money, KIND_DATE: _to_iso, KIND_NUMBER: _decimal_to_float}
+
+
+class StreamExporter:
+    """Построчная запись выгрузок: память не зависит от объема данных"""
+
+    @staticmethod
+    def compile_converters(columns: Sequence[ExportColumn],
+                           converters: dict) -> List[Tuple[int, Callable[[Any], Any]]]:
+        """Список (индекс, функция) только для колонок, требующих преобразования"""
+        return [(i, converters[c.kind]) for i, c in enumerate(columns) if c.kind in converters]
+
+    @staticmethod
+    def _converted(rows: Iterable[Sequence[Any]],
+                   converters: List[Tuple[int, Callable[[Any], Any]]]) -> Iterable[Sequence[Any]]:
+        """Применить преобразователи к строкам"""
+        if not converters:
+            yield from rows
+            return
+
+        for row in rows:
+            row = list(row)
+            for i, convert in converters:
+                row[i] = convert(row[i])
+            yield row
+
+    @staticmethod
+    def to_csv(rows: Iterable[Sequence[Any]], columns: Sequence[ExportColumn], filename: Path,
+               delimiter: str = ',') -> int:
+        """Записать строки в CSV (utf-8 с BOM для Excel), вернуть количество строк"""
+        converters = StreamExporter.compile_converters(columns, CSV_CONVERTERS)
+        count = 0
+
+        def counted():
+            nonlocal count
+            for row in StreamExporter._converted(rows, converters):
+                count += 1
+                yield row
+
+        with open(filename, 'w', newline='', encoding='utf-8-sig', buffering=EXPORT_BUFFER_SIZE) as f:
+            writer = csv.writer(f, delimiter=delimiter)
+            writer.writerow([c.title for c in columns])
+            writer.writerows(counted())
+
+        return count
+
+    @staticmethod
+    def to_ndjson(rows: Iterable[Sequence[Any]], columns: Sequence[ExportColumn], filename: Path) -> int:
+        """Записать строки в NDJSON (один объект на строку), вернуть количество строк"""
+        converters = StreamExporter.compile_converters(columns, JSON_CONVERTERS)
+        keys = [c.key for c in columns]
+        encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+        count = 0
+
+        with open(filename, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE) as f:
+            write = f.write
+            for row in StreamExporter._converted(rows, converters):
+                write(encode(dict(zip(keys, row))))
+                write('\n')
+                count += 1
+
+        return count
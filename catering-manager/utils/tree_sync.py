@@ -0,0 +1,95 @@
+"""
+Обновление таблиц по разнице списков: строки сопоставляются по id модели,
+в Treeview меняются только добавленные, измененные и удаленные строки
+"""
+
+import operator
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Sequence
+
+from utils.row_sources import Row, RowFormatter
+
+
+@dataclass
+class ListDiff:
+    """Разница двух списков: ключи добавленных, измененных и удаленных элементов"""
+    inserted: List[Hashable] = field(default_factory=list)
+    updated: List[Hashable] = field(default_factory=list)
+    removed: List[Hashable] = field(default_factory=list)
+    # Изменился ли порядок оставшихся элементов
+    reordered: bool = False
+
+    @property
+    def count(self) -> int:
+        """Число измененных элементов"""
+        return len(self.inserted) + len(self.updated) + len(self.removed)
+
+
+def diff_items(old: Sequence[Any], new: Sequence[Any],
+               key: Callable[[Any], Hashable] = operator.attrgetter('id'),
+               same: Callable[[Any, Any], bool] = operator.eq) -> ListDiff:
+    """Сравнить списки по ключу; элементы с одним ключом сравниваются функцией same"""
+    old_by_key = {key(item): item for item in old}
+    new_keys = set()
+    diff = ListDiff()
+
+    for item in new:
+        item_key = key(item)
+        new_keys.add(item_key)
+        if item_key not in old_by_key:
+            diff.inserted.append(item_key)
+        elif not same(old_by_key[item_key], item):
+            diff.updated.append(item_key)
+
+    diff.removed = [item_key for item_key in old_by_key if item_key not in new_keys]
+
+    # Порядок оставшихся: без удаленных и добавленных последовательности должны совпасть
+    inserted = set(diff.inserted)
+    kept_old = [item_key for item_key in old_by_key if item_key in new_keys]
+    kept_new = [key(item) for item in new if key(item) not in inserted]
+    diff.reordered = kept_old != kept_new
+    return diff
+
+
+class TreeSync:
+    """
+    Синхронизация обычного Treeview со списком моделей: iid строки - ключ модели,
+    форматируются все модели, но в таблицу пишутся только изменившиеся строки
+    """
+
+    def __init__(self, tree, formatter: RowFormatter,
+                 key: Callable[[Any], Hashable] = operator.attrgetter('id')):
+        self.tree = tree
+        self.formatter = formatter
+        self.key = key
+        # Показанные строки по порядку: (iid, строка)
+        self._rows: List[tuple] = []
+
+    def update(self, items: Sequence[Any]) -> ListDiff:
+        """Показать список моделей; вернуть разницу с показанным"""
+        rows = [(str(self.key(item)), self.formatter(item)) for item in items]
+        diff = diff_items(self._rows, rows, key=operator.itemgetter(0))
+        new_rows: Dict[str, Row] = dict(rows)
+
+        for iid in diff.removed:
+            self.tree.delete(iid)
+        for iid in diff.updated:
+            values, tags = new_rows[iid]
+            self.tree.item(iid, values=values, tags=tags)
+
+        inserted = set(diff.inserted)
+        for position, (iid, (values, tags)) in enumerate(rows):
+            if iid in inserted:
+                # Вставка по возрастанию позиций: все строки выше уже на месте
+                self.tree.insert('', position, iid=iid, values=values, tags=tags)
+            elif diff.reordered:
+                self.tree.move(iid, '', position)
+
+        self._rows = rows
+        return diff
+
+    def clear(self):
+        """Очистить таблицу"""
+        for iid, _ in self._rows:
+            self.tree.delete(iid)
+        self._rows = []
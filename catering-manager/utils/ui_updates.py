@@ -0,0 +1,97 @@
+"""
+Планировщик обновлений интерфейса: изменения статусной строки, панели бюджета
+и хода выполнения схлопываются в один вызов after_idle
+"""
+
+import logging
+import tkinter as tk
+from typing import Any, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Значение источника еще не получено
+_MISSING = object()
+
+
+class UiUpdateScheduler:
+    """
+    Источники обновлений по имени. Значение источника задается через set()
+    или вычисляется compute() после mark_dirty(); apply(значение) вызывается
+    в общем обработчике, только если значение изменилось
+    """
+
+    def __init__(self, widget):
+        self.widget = widget
+        self._apply: Dict[str, Callable[[Any], None]] = {}
+        self._compute: Dict[str, Callable[[], Any]] = {}
+        # Текущие и последние примененные значения
+        self._values: Dict[str, Any] = {}
+        self._applied: Dict[str, Any] = {}
+        self._dirty: Set[str] = set()
+        self._changed: Set[str] = set()
+        self._pending = None
+        self.flushes = 0
+        self.computations = 0
+
+    def register(self, name: str, apply: Callable[[Any], None],
+                 compute: Optional[Callable[[], Any]] = None):
+        """Зарегистрировать источник; compute - для источников, пересчитываемых после mark_dirty"""
+        self._apply[name] = apply
+        if compute is not None:
+            self._compute[name] = compute
+
+    def set(self, name: str, value: Any):
+        """Новое значение источника (применяется последнее за кадр)"""
+        self._values[name] = value
+        self._changed.add(name)
+        self._schedule()
+
+    def mark_dirty(self, name: str):
+        """Данные источника изменились: пересчитать в ближайшем обработчике"""
+        self._dirty.add(name)
+        self._schedule()
+
+    def value(self, name: str, default: Any = None) -> Any:
+        """Текущее значение источника"""
+        value = self._values.get(name, _MISSING)
+        return default if value is _MISSING else value
+
+    def has_value(self, name: str) -> bool:
+        """Получено ли значение источника"""
+        return name in self._values
+
+    def flush(self):
+        """Пересчитать помеченные источники и применить изменившиеся значения"""
+        self._pending = None
+        self.flushes += 1
+
+        dirty, self._dirty = self._dirty, set()
+        for name in dirty:
+            try:
+                self._values[name] = self._compute[name]()
+                self.computations += 1
+            except Exception as e:
+                logger.error(f"Ошибка обновления '{name}': {e}")
+                continue
+            self._changed.add(name)
+
+        changed, self._changed = self._changed, set()
+        for name in changed:
+            value = self._values[name]
+            if self._applied.get(name, _MISSING) == value:
+                continue
+            self._applied[name] = value
+            try:
+                self._apply[name](value)
+            except tk.TclError:
+                # Виджет уже уничтожен
+                pass
+
+    def _schedule(self):
+        """Один обработчик на все изменения, накопленные до простоя"""
+        if self._pending is not None:
+            return
+        try:
+            self._pending = self.widget.after_idle(self.flush)
+        except tk.TclError:
+            self._pending = None
@@ -0,0 +1,213 @@
+"""
+Строки таблиц списков (модели представления): форматированные значения строки
+вычисляются один раз и кэшируются по id модели до смены ее версии
+(кортежа отображаемых полей и зависимостей - прогноза, названия категории)
+"""
+
+import operator
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from config import Config
+from models import BudgetProjection, CostCategory, Event, Nomenclature, Order, Supplier
+from utils.formatters import Formatters
+from utils.row_sources import Row
+
+
+class RowCache:
+    """
+    Кэш строк таблицы: (значения, теги) модели форматируются заново, только когда
+    изменилась ее версия. Экземпляр - функция форматирования для таблиц
+    """
+
+    def __init__(self, key: Callable[[Any], Hashable] = operator.attrgetter('id')):
+        self.key = key
+        # id модели -> (версия, строка)
+        self._rows: Dict[Hashable, Tuple[Hashable, Row]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, item: Any) -> Hashable:
+        """Версия модели: все, от чего зависит строка"""
+        raise NotImplementedError
+
+    def format(self, item: Any) -> Row:
+        """Строка таблицы модели: (значения, теги)"""
+        raise NotImplementedError
+
+    def __call__(self, item: Any) -> Row:
+        item_key = self.key(item)
+        version = self.version(item)
+        cached = self._rows.get(item_key)
+        if cached is not None and cached[0] == version:
+            self.hits += 1
+            return cached[1]
+
+        row = self.format(item)
+        self._rows[item_key] = (version, row)
+        self.misses += 1
+        return row
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def rows(self, items: Iterable[Any]) -> List[Row]:
+        """Строки списка моделей"""
+        return [self(item) for item in items]
+
+    def retain(self, items: Iterable[Any]):
+        """Оставить в кэше только строки моделей списка (после загрузки данных)"""
+        keys = {self.key(item) for item in items}
+        self._rows = {item_key: cached for item_key, cached in self._rows.items() if item_key in keys}
+
+    def invalidate(self, item_key: Optional[Hashable] = None):
+        """Сбросить строку модели (None - все строки)"""
+        if item_key is None:
+            self._rows.clear()
+        else:
+            self._rows.pop(item_key, None)
+
+
+class EventRows(RowCache):
+    """Строки таблицы мероприятий; projection(id) - прогноз расходов мероприятия"""
+
+    def __init__(self, projection: Callable[[int], Optional[BudgetProjection]]):
+        super().__init__()
+        self.projection = projection
+
+    def version(self, event: Event) -> Hashable:
+        projection = self.projection(event.id)
+        return (
+            event.name, event.event_date, event.start_time, event.guests_count, event.budget,
+            event.status, event.location, event.responsible_person,
+            (projection.projected_amount, projection.projected_percentage) if projection else None
+        )
+
+    def format(self, event: Event) -> Row:
+        return (
+            (
+                event.id,
+                event.name,
+                Formatters.format_date(event.event_date),
+                Formatters.format_time(event.start_time),
+                event.guests_count,
+                Formatters.format_currency(event.budget, show_symbol=False),
+                self.format_forecast(event),
+                event.status,
+                Formatters.truncate_text(event.location, 20),
+                Formatters.truncate_text(event.responsible_person, 20)
+            ),
+            (event.status,)
+        )
+
+    def format_forecast(self, event: Event) -> str:
+        """Прогноз расходов для таблицы (⚠ - ожидается превышение бюджета)"""
+        projection = self.projection(event.id)
+        if not projection or event.status == "завершено":
+            return "—"
+
+        text = Formatters.format_currency(projection.projected_amount, show_symbol=False)
+        if projection.projected_percentage >= Config.BUDGET_CRITICAL_THRESHOLD * 100:
+            text = f"⚠ {text}"
+        return text
+
+
+class NomenclatureRows(RowCache):
+    """Строки таблицы номенклатуры; category_name(позиция) - название ее категории"""
+
+    def __init__(self, category_name: Callable[[Nomenclature], str]):
+        super().__init__()
+        self.category_name = category_name
+
+    def version(self, nomenclature: Nomenclature) -> Hashable:
+        return (
+            nomenclature.name, self.category_name(nomenclature), nomenclature.unit,
+            nomenclature.description, nomenclature.created_at, nomenclature.is_active
+        )
+
+    def format(self, nomenclature: Nomenclature) -> Row:
+        return (
+            (
+                nomenclature.id,
+                nomenclature.name,
+                self.category_name(nomenclature),
+                nomenclature.unit,
+                Formatters.truncate_text(nomenclature.description, 40),
+                Formatters.format_date(nomenclature.created_at),
+                "✓" if nomenclature.is_active else "✗"
+            ),
+            ('active' if nomenclature.is_active else 'inactive',)
+        )
+
+
+class SupplierRows(RowCache):
+    """Строки таблицы поставщиков; category_name(поставщик) - название его категории"""
+
+    def __init__(self, category_name: Callable[[Supplier], str]):
+        super().__init__()
+        self.category_name = category_name
+
+    def version(self, supplier: Supplier) -> Hashable:
+        return (
+            supplier.name, self.category_name(supplier), supplier.contact_person, supplier.phone,
+            supplier.email, supplier.rating, supplier.created_at, supplier.is_active
+        )
+
+    def format(self, supplier: Supplier) -> Row:
+        # Отображаем рейтинг звездами
+        rating_str = "★" * int(supplier.rating) + "☆" * (5 - int(supplier.rating))
+
+        return (
+            (
+                supplier.id,
+                supplier.name,
+                self.category_name(supplier),
+                supplier.contact_person,
+                supplier.phone,
+                supplier.email,
+                rating_str,
+                Formatters.format_date(supplier.created_at),
+                "✓" if supplier.is_active else "✗"
+            ),
+            ('active' if supplier.is_active else 'inactive',)
+        )
+
+
+class CategoryRows(RowCache):
+    """Строки таблицы категорий затрат"""
+
+    def version(self, category: CostCategory) -> Hashable:
+        return (category.name, category.description, category.color, category.created_at, category.is_active)
+
+    def format(self, category: CostCategory) -> Row:
+        return (
+            (
+                category.id,
+                category.name,
+                category.description,
+                f"■ {category.color}",  # Цветной квадратик
+                Formatters.format_date(category.created_at),
+                "✓" if category.is_active else "✗"
+            ),
+            ()
+        )
+
+
+class OrderRows(RowCache):
+    """Строки таблицы заказов мероприятия"""
+
+    def version(self, order: Order) -> Hashable:
+        return (order.order_number, order.order_date, order.status, len(order.items),
+                order.total_amount, order.notes)
+
+    def format(self, order: Order) -> Row:
+        return (
+            (
+                order.order_number,
+                Formatters.format_datetime(order.order_date),
+                order.status,
+                len(order.items),
+                Formatters.format_currency(order.total_amount, show_symbol=False),
+                Formatters.truncate_text(order.notes, 40)
+            ),
+            (order.status,)
+        )
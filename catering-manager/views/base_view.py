@@ -3,8 +3,9 @@
 """
 
 import tkinter as tk
+from tkinter import messagebox
 import customtkinter as ctk
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from controllers import CateringController
 
@@ -25,3 +26,21 @@ class BasePage(ctk.CTkFrame):
     def refresh_data(self):
         """Обновить данные страницы (должен быть переопределен)"""
         pass
+
+    def load_async(self, key: str, func: Callable[[], Any], on_done: Callable[[Any], None],
+                   error_message: str = "Не удалось загрузить данные"):
+        """
+        Загрузить данные в рабочем потоке и передать их в on_done в главном потоке.
+        Пока идет загрузка, в статусной строке страницы (если есть) - индикатор;
+        повторный вызов с тем же ключом заменяет незавершенный запрос
+        """
+        status_label = getattr(self, 'status_label', None)
+        if status_label is not None:
+            status_label.configure(text="Загрузка...")
+
+        def on_error(error: Exception):
+            if status_label is not None:
+                status_label.configure(text="Ошибка загрузки")
+            messagebox.showerror("Ошибка", f"{error_message}: {str(error)}")
+
+        self.controller.loader.load(self, (key, id(self)), func, on_done, on_error)
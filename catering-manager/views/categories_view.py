@@ -9,7 +9,8 @@ from typing import List, Optional
 
 from models import CostCategory
 from controllers import CateringController
-from utils.formatters import Formatters
+from utils.tree_sync import TreeSync
+from utils.view_models import CategoryRows
 from .base_view import BasePage  # <--- ИСПРАВЛЕНО
 
 
@@ -118,6 +119,7 @@ class CategoriesPage(BasePage):
 
         # Привязываем двойной клик для редактирования
         self.tree.bind('<Double-Button-1>', lambda e: self._edit_category())
+        self.tree_sync = TreeSync(self.tree, CategoryRows())
 
         # Статусная строка
         self.status_label = ctk.CTkLabel(
@@ -128,32 +130,16 @@ class CategoriesPage(BasePage):
         self.status_label.pack(side="bottom", fill="x", padx=10, pady=5)
 
     def refresh_data(self):
-        """Обновить данные в таблице"""
+        """Обновить данные в таблице (запрос - в рабочем потоке)"""
+        self.load_async("categories", self.controller.get_all_categories, self._show_categories,
+                        "Не удалось загрузить категории")
+
+    def _show_categories(self, categories: List[CostCategory]):
+        """Показать загруженные категории"""
         try:
-            # Очищаем таблицу
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-
-            # Загружаем категории
-            self.categories = self.controller.get_all_categories()
-
-            # Заполняем таблицу
-            for category in self.categories:
-                # Создаем цветной квадратик
-                color_display = f"■ {category.color}"
-
-                self.tree.insert(
-                    '',
-                    tk.END,
-                    values=(
-                        category.id,
-                        category.name,
-                        category.description,
-                        color_display,
-                        Formatters.format_date(category.created_at),
-                        "✓" if category.is_active else "✗"
-                    )
-                )
+            # В таблице меняются только добавленные, измененные и удаленные строки
+            self.categories = categories
+            self.tree_sync.update(self.categories)
 
             # Обновляем статус
             self.status_label.configure(
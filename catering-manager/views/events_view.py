@@ -6,13 +6,23 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import customtkinter as ctk
 from datetime import datetime, date, time
-from typing import List, Optional
+from typing import Dict, List, Optional
 from decimal import Decimal
 
-from models import Event
+from models import Event, BudgetProjection, Order
 from controllers import CateringController
+from utils.calendar_data import CalendarDataProvider
+from utils.filter_index import FilterIndex
 from utils.formatters import Formatters
+from utils.quick_entry import OrderCatalogs, load_order_catalogs
+from utils.search_pipeline import SearchPipeline
+from utils.tree_sync import TreeSync
 from utils.validators import Validators
+from utils.view_models import EventRows, OrderRows
+from widgets.budget_widget import BudgetWidget
+from widgets.calendar_widget import CalendarWidget
+from widgets.quick_entry import QuickEntry
+from widgets.virtual_tree import VirtualTreeview
 from .base_view import BasePage
 
 
@@ -23,6 +33,12 @@ class EventsPage(BasePage):
         super().__init__(parent, controller, "Управление мероприятиями")
         self.main_window = main_window
         self.events: List[Event] = []
+        # Прогноз расходов по мероприятиям (id -> прогноз)
+        self.projections: Dict[int, BudgetProjection] = {}
+        # Строки таблицы (форматируются один раз до изменения мероприятия или прогноза)
+        self.rows = EventRows(lambda event_id: self.projections.get(event_id))
+        # Поиск с задержкой ввода по индексу загруженных мероприятий
+        self.search = SearchPipeline(self, self._show_matches)
         self._create_widgets()
         self.refresh_data()
 
@@ -70,10 +86,24 @@ class EventsPage(BasePage):
             width=150
         ).pack(side="right", padx=5)
 
+        # Поиск по названию, месту, ответственному и статусу
+        self.search_entry = ctk.CTkEntry(button_frame, width=180, placeholder_text="Поиск...")
+        self.search_entry.pack(side="right", padx=5)
+        self.search_entry.bind('<KeyRelease>', lambda e: self.search.set_query(self.search_entry.get()))
+
         # Таблица мероприятий
         table_frame = ctk.CTkFrame(self)
         table_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
+        # Календарь: дни окрашены по числу мероприятий, выбор дня - фильтр таблицы
+        self.calendar = CalendarWidget(
+            table_frame,
+            on_date_select=self._on_date_selected,
+            provider=CalendarDataProvider(self.controller.get_event_days),
+            loader=self.controller.loader
+        )
+        self.calendar.pack(side="right", fill="y", padx=(5, 0))
+
         # Treeview
         tree_frame = ctk.CTkFrame(table_frame)
         tree_frame.pack(fill="both", expand=True)
@@ -84,7 +114,8 @@ class EventsPage(BasePage):
         tree_scroll_x = ctk.CTkScrollbar(tree_frame, orientation="horizontal")
         tree_scroll_x.pack(side="bottom", fill="x")
 
-        self.tree = ttk.Treeview(
+        # Виртуальная таблица: в Treeview только видимые строки
+        self.tree = VirtualTreeview(
             tree_frame,
             yscrollcommand=tree_scroll_y.set,
             xscrollcommand=tree_scroll_x.set,
@@ -95,7 +126,8 @@ class EventsPage(BasePage):
         tree_scroll_x.configure(command=self.tree.xview)
 
         # Колонки
-        self.tree['columns'] = ('id', 'name', 'date', 'time', 'guests', 'budget', 'status', 'location', 'responsible')
+        self.tree['columns'] = ('id', 'name', 'date', 'time', 'guests', 'budget', 'forecast', 'status', 'location',
+                                'responsible')
         self.tree.column('#0', width=0, stretch=tk.NO)
         self.tree.column('id', width=50, anchor=tk.CENTER)
         self.tree.column('name', width=200, anchor=tk.W)
@@ -103,6 +135,7 @@ class EventsPage(BasePage):
         self.tree.column('time', width=80, anchor=tk.CENTER)
         self.tree.column('guests', width=80, anchor=tk.CENTER)
         self.tree.column('budget', width=120, anchor=tk.E)
+        self.tree.column('forecast', width=130, anchor=tk.E)
         self.tree.column('status', width=120, anchor=tk.CENTER)
         self.tree.column('location', width=150, anchor=tk.W)
         self.tree.column('responsible', width=150, anchor=tk.W)
@@ -114,6 +147,7 @@ class EventsPage(BasePage):
         self.tree.heading('time', text='Время')
         self.tree.heading('guests', text='Гостей')
         self.tree.heading('budget', text='Бюджет, руб')
+        self.tree.heading('forecast', text='Прогноз, руб')
         self.tree.heading('status', text='Статус')
         self.tree.heading('location', text='Место')
         self.tree.heading('responsible', text='Ответственный')
@@ -122,6 +156,7 @@ class EventsPage(BasePage):
 
         # Привязка двойного клика
         self.tree.bind('<Double-Button-1>', lambda e: self._select_event())
+        self.tree.bind('<<TreeviewSelect>>', lambda e: self._show_event_budget())
 
         # Статус
         self.status_label = ctk.CTkLabel(
@@ -131,64 +166,93 @@ class EventsPage(BasePage):
         )
         self.status_label.pack(side="bottom", fill="x", padx=10, pady=5)
 
+        # Бюджет и прогноз выделенного мероприятия
+        self.budget_widget = BudgetWidget(self)
+        self.budget_widget.pack(side="bottom", fill="x", padx=10, pady=(0, 5))
+
     def refresh_data(self):
-        """Обновить данные"""
+        """Обновить данные (запросы - в рабочем потоке)"""
+        self.load_async("events", self._load_events, self._show_events,
+                        "Не удалось загрузить мероприятия")
+
+    def _load_events(self) -> tuple:
+        """Мероприятия и прогноз расходов по ним (одним расчетом); выполняется в рабочем потоке"""
+        events = self.controller.get_all_events()
+        return events, self.controller.get_budget_projections(events)
+
+    def _show_events(self, data: tuple):
+        """Показать загруженные мероприятия"""
         try:
-            # Очищаем таблицу
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-
-            # Загружаем мероприятия
-            self.events = self.controller.get_all_events()
-
-            # Заполняем таблицу
-            for event in self.events:
-                # Определяем цвет статуса
-                status_color = ""
-                if event.status == "планируется":
-                    status_color = "blue"
-                elif event.status == "идет":
-                    status_color = "orange"
-                elif event.status == "завершено":
-                    status_color = "green"
-
-                self.tree.insert(
-                    '',
-                    tk.END,
-                    values=(
-                        event.id,
-                        event.name,
-                        Formatters.format_date(event.event_date),
-                        Formatters.format_time(event.start_time),
-                        event.guests_count,
-                        Formatters.format_currency(event.budget, show_symbol=False),
-                        event.status,
-                        Formatters.truncate_text(event.location, 20),
-                        Formatters.truncate_text(event.responsible_person, 20)
-                    ),
-                    tags=(event.status,)
-                )
+            self.events, self.projections = data
+            self.rows.retain(self.events)
+
+            # Заполняем таблицу (строки форматируются при показе)
+            self.search.set_index(FilterIndex(
+                self.events,
+                text=lambda e: (e.name, e.location, e.responsible_person, e.status,
+                                Formatters.format_date(e.event_date)),
+                fields={'date': lambda e: e.event_date}
+            ))
+            self.search.run_now()
+            self.calendar.refresh()
 
             # Настраиваем цвета для статусов
             self.tree.tag_configure('планируется', foreground='blue')
             self.tree.tag_configure('идет', foreground='orange')
             self.tree.tag_configure('завершено', foreground='green')
 
-            # Обновляем статус
-            current_event_text = "Не выбрано"
-            if self.controller.current_event:
-                current_event_text = self.controller.current_event.name
-
-            self.status_label.configure(
-                text=f"Загружено мероприятий: {len(self.events)} | Текущее: {current_event_text}"
-            )
-
             # Обновляем отображение бюджета в главном окне
             self.main_window.update_budget_display()
 
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить мероприятия: {str(e)}")
 
+    def _show_matches(self, matches: List[Event], total: int):
+        """Показать найденные мероприятия и обновить статус"""
+        self.tree.update_items(matches, self.rows)
+
+        current_event_text = "Не выбрано"
+        if self.controller.current_event:
+            current_event_text = self.controller.current_event.name
+
+        date_text = ""
+        if self.calendar.get_selected_date():
+            date_text = f" | Дата: {Formatters.format_date(self.calendar.get_selected_date())}"
+
+        self.status_label.configure(
+            text=f"Загружено мероприятий: {total} | Найдено: {len(matches)}{date_text} | Текущее: {current_event_text}"
+        )
+        self._show_event_budget()
+
+    def _on_date_selected(self, day: Optional[date]):
+        """Выбран день в календаре: показать его мероприятия (снят выбор - все)"""
+        self.search.set_filters({'date': day} if day else {})
+
+    def _show_event_budget(self):
+        """Показать бюджет и прогноз выделенного мероприятия"""
+        event = self.tree.selected_item()
+
+        if not event:
+            self.budget_widget.set_event_name("")
+            self.budget_widget.update_budget({
+                'budget': Decimal('0'), 'spent': Decimal('0'), 'remaining': Decimal('0'), 'percentage': 0.0
+            })
+            self.budget_widget.update_projection(None)
+            return
+
+        projection = self.projections.get(event.id)
+        spent = projection.spent if projection else Decimal('0')
+        percentage = float(spent / event.budget * 100) if event.budget else 0.0
+
+        self.budget_widget.set_event_name(event.name)
+        self.budget_widget.update_budget({
+            'budget': event.budget,
+            'spent': spent,
+            'remaining': event.budget - spent,
+            'percentage': percentage
+        })
+        self.budget_widget.update_projection(projection if event.status != "завершено" else None)
+
     def _add_event(self):
         """Добавить новое мероприятие"""
         dialog = EventDialog(self, self.controller)
@@ -198,19 +262,14 @@ class EventsPage(BasePage):
 
     def _select_event(self):
         """Выбрать мероприятие как текущее"""
-        selected = self.tree.selection()
-        if not selected:
+        event = self.tree.selected_item()
+        if not event:
             messagebox.showwarning("Внимание", "Выберите мероприятие")
             return
 
-        # Получаем ID выбранного мероприятия
-        item = self.tree.item(selected[0])
-        event_id = item['values'][0]
-        event_name = item['values'][1]
-
         # Выбираем мероприятие в контроллере
-        if self.controller.select_event(event_id):
-            messagebox.showinfo("Выбор мероприятия", f"Выбрано мероприятие: {event_name}")
+        if self.controller.select_event(event.id):
+            messagebox.showinfo("Выбор мероприятия", f"Выбрано мероприятие: {event.name}")
             self.refresh_data()  # Обновляем статус
         else:
             messagebox.showerror("Ошибка", "Не удалось выбрать мероприятие")
@@ -225,6 +284,9 @@ class EventsPage(BasePage):
         orders_window = OrdersWindow(self, self.controller)
         self.wait_window(orders_window)
 
+        # Заказы могли измениться - бюджет пересчитывается
+        self.main_window.update_budget_display()
+
 
 class EventDialog(ctk.CTkToplevel):
     """Диалог для добавления/редактирования мероприятия"""
@@ -314,8 +376,22 @@ class EventDialog(ctk.CTkToplevel):
 
         # Бюджет
         ctk.CTkLabel(form_frame, text="Бюджет, руб *:", font=("Arial", 12)).pack(anchor="w", padx=10, pady=(5, 0))
-        self.budget_entry = ctk.CTkEntry(form_frame, font=("Arial", 12))
-        self.budget_entry.pack(fill="x", padx=10, pady=(0, 10))
+        budget_frame = ctk.CTkFrame(form_frame, fg_color="transparent")
+        budget_frame.pack(fill="x", padx=10, pady=(0, 10))
+
+        self.budget_entry = ctk.CTkEntry(budget_frame, font=("Arial", 12))
+        self.budget_entry.pack(side="left", fill="x", expand=True)
+
+        ctk.CTkButton(
+            budget_frame,
+            text="💡 Оценить",
+            command=self._suggest_budget,
+            width=100
+        ).pack(side="right", padx=(10, 0))
+
+        # Разбивка предложенного бюджета по категориям
+        self.estimate_label = ctk.CTkLabel(form_frame, text="", font=("Arial", 11), justify="left")
+        self.estimate_label.pack(anchor="w", padx=10)
 
         # Место проведения
         ctk.CTkLabel(form_frame, text="Место проведения:", font=("Arial", 12)).pack(anchor="w", padx=10, pady=(5, 0))
@@ -387,6 +463,26 @@ class EventDialog(ctk.CTkToplevel):
             self.status_combo.set(self.event.status)
             self.description_entry.insert("1.0", self.event.description)
 
+    def _suggest_budget(self):
+        """Предложить бюджет по завершенным мероприятиям похожего размера"""
+        guests_count = Validators.validate_integer(self.guests_entry.get().strip())
+        if guests_count is None or guests_count <= 0:
+            messagebox.showwarning("Внимание", "Сначала укажите количество гостей")
+            return
+
+        estimate = self.controller.estimate_event_budget(guests_count)
+        if not estimate:
+            messagebox.showinfo("Информация", "Нет завершенных мероприятий с расходами для оценки")
+            return
+
+        self.budget_entry.delete(0, tk.END)
+        self.budget_entry.insert(0, f"{estimate.total_amount:.0f}")
+
+        lines = [f"На гостя: {Formatters.format_currency(estimate.per_guest)} "
+                 f"(по {len(estimate.similar_events)} мероприят.)"]
+        lines += [f"• {name}: {Formatters.format_currency(amount)}" for name, amount in estimate.categories.items()]
+        self.estimate_label.configure(text="\n".join(lines))
+
     def destroy(self):
         """Переопределение метода destroy для очистки привязок"""
         try:
@@ -599,6 +695,7 @@ class OrdersWindow(ctk.CTkToplevel):
 
         # Привязка двойного клика
         self.tree.bind('<Double-Button-1>', lambda e: self._view_order_details())
+        self.tree_sync = TreeSync(self.tree, OrderRows())
 
         # Статус
         self.status_label = ctk.CTkLabel(
@@ -613,29 +710,17 @@ class OrdersWindow(ctk.CTkToplevel):
         if not self.controller.current_event:
             return
 
+        self.status_label.configure(text="Загрузка...")
+        self.controller.loader.load(
+            self, ("orders", id(self)), self.controller.get_orders_for_current_event, self._show_orders,
+            lambda e: messagebox.showerror("Ошибка", f"Не удалось загрузить заказы: {str(e)}")
+        )
+
+    def _show_orders(self, orders: List[Order]):
+        """Показать загруженные заказы"""
         try:
-            # Очищаем таблицу
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-
-            # Загружаем заказы
-            orders = self.controller.get_orders_for_current_event()
-
-            # Заполняем таблицу
-            for order in orders:
-                self.tree.insert(
-                    '',
-                    tk.END,
-                    values=(
-                        order.order_number,
-                        Formatters.format_datetime(order.order_date),
-                        order.status,
-                        len(order.items),
-                        Formatters.format_currency(order.total_amount, show_symbol=False),
-                        Formatters.truncate_text(order.notes, 40)
-                    ),
-                    tags=(order.status,)
-                )
+            # В таблице меняются только добавленные, измененные и удаленные строки
+            self.tree_sync.update(orders)
 
             # Настраиваем цвета для статусов
             self.tree.tag_configure('черновик', foreground='gray')
@@ -764,9 +849,8 @@ class OrderCreationWindow(ctk.CTkToplevel):
 
         # Выбор номенклатуры
         ctk.CTkLabel(form_frame, text="Номенклатура:", font=("Arial", 12)).pack(anchor="w", padx=10, pady=(5, 0))
-        self.nomenclature_combo = ctk.CTkComboBox(
+        self.nomenclature_combo = QuickEntry(
             form_frame,
-            values=[],
             width=300,
             font=("Arial", 12)
         )
@@ -774,9 +858,8 @@ class OrderCreationWindow(ctk.CTkToplevel):
 
         # Выбор поставщика
         ctk.CTkLabel(form_frame, text="Поставщик:", font=("Arial", 12)).pack(anchor="w", padx=10, pady=(5, 0))
-        self.supplier_combo = ctk.CTkComboBox(
+        self.supplier_combo = QuickEntry(
             form_frame,
-            values=[],
             width=300,
             font=("Arial", 12)
         )
@@ -924,18 +1007,23 @@ class OrderCreationWindow(ctk.CTkToplevel):
         ).pack(side="right", padx=5)
 
     def _load_data(self):
-        """Загрузка начальных данных"""
-        try:
-            # Загружаем номенклатуру и поставщиков
-            self.nomenclatures = self.controller.get_all_nomenclatures()
-            self.suppliers = self.controller.get_all_suppliers()
+        """Загрузка начальных данных (номенклатура и поставщики - в рабочем потоке)"""
+        self.nomenclature_combo.set("Загрузка...")
+        self.controller.loader.load(
+            self, ("order_form", id(self)),
+            lambda: load_order_catalogs(self.controller),
+            self._show_data,
+            lambda e: messagebox.showerror("Ошибка", f"Не удалось загрузить данные: {str(e)}")
+        )
 
-            # Заполняем комбобоксы
-            nomenclature_names = [f"{n.name} ({n.unit})" for n in self.nomenclatures if n.is_active]
-            self.nomenclature_combo.configure(values=nomenclature_names)
+    def _show_data(self, catalogs: OrderCatalogs):
+        """Заполнить форму загруженными данными"""
+        try:
+            self.nomenclatures, self.suppliers = catalogs.nomenclatures, catalogs.suppliers
 
-            supplier_names = [s.name for s in self.suppliers if s.is_active]
-            self.supplier_combo.configure(values=supplier_names)
+            # Поля быстрого ввода: автодополнение и выбор по индексу
+            self.nomenclature_combo.set_catalog(catalogs.nomenclature_index)
+            self.supplier_combo.set_catalog(catalogs.supplier_index)
 
             # Создаем новый заказ
             self.order = self.controller.create_new_order()
@@ -984,32 +1072,18 @@ class OrderCreationWindow(ctk.CTkToplevel):
             messagebox.showwarning("Внимание", "Выберите поставщика")
             return
 
-        # Находим номенклатуру
-        selected_nomenclature = None
-        nomenclature_id = None
-        for nom in self.nomenclatures:
-            display_name = f"{nom.name} ({nom.unit})"
-            if display_name == nomenclature_display:
-                selected_nomenclature = nom
-                nomenclature_id = nom.id
-                break
-
+        # Находим номенклатуру и поставщика по индексу полей ввода
+        selected_nomenclature = self.nomenclature_combo.selected_item()
         if not selected_nomenclature:
             messagebox.showerror("Ошибка", "Не найдена выбранная номенклатура")
             return
+        nomenclature_id = selected_nomenclature.id
 
-        # Находим поставщика
-        selected_supplier = None
-        supplier_id = None
-        for sup in self.suppliers:
-            if sup.name == supplier_name:
-                selected_supplier = sup
-                supplier_id = sup.id
-                break
-
+        selected_supplier = self.supplier_combo.selected_item()
         if not selected_supplier:
             messagebox.showerror("Ошибка", "Не найден выбранный поставщик")
             return
+        supplier_id = selected_supplier.id
 
         # Валидация количества
         quantity = Validators.validate_decimal(quantity_str)
@@ -13,6 +13,9 @@ from config import Config
 from models import *
 from controllers import CateringController
 from utils.formatters import Formatters
+from utils.export_jobs import ExportJob, ExportJobQueue, EXPORT_POLL_INTERVAL_MS, JOB_DONE, JOB_FAILED
+from utils.page_registry import PageRegistry
+from utils.ui_updates import UiUpdateScheduler
 
 # Импорты страниц (убраны циклические зависимости)
 from .categories_view import CategoriesPage
@@ -26,6 +29,14 @@ from .settings_view import SettingsPage
 # Глобальная переменная для отслеживания активного окна
 _active_window = None
 
+# Задержка перед созданием остальных страниц после первой отрисовки и между ними, мс
+PAGE_PREWARM_DELAY_MS = 1000
+PAGE_PREWARM_STEP_MS = 200
+# Период проверки простаивающих страниц, мс
+PAGE_SWEEP_INTERVAL_MS = 60000
+# Страницы, на которых показывается панель бюджета
+BUDGET_PAGES = ('events', 'reports')
+
 
 class MainWindow(ctk.CTk):
     """Главное окно приложения"""
@@ -59,15 +70,29 @@ class MainWindow(ctk.CTk):
         # Настройка реакции на закрытие окна
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
 
+        # Очередь задач экспорта (общая для страниц)
+        self.export_jobs = ExportJobQueue()
+        self.export_jobs.add_listener(self._on_export_job_update)
+
+        # Статусная строка и панель бюджета обновляются одним обработчиком после простоя
+        self.ui_updates = UiUpdateScheduler(self)
+        self.ui_updates.register('status', lambda text: self.status_label.configure(text=text))
+        self.ui_updates.register('budget', self._apply_budget, compute=self._compute_budget)
+
         # Создание интерфейса
         self._create_widgets()
         self._setup_layout()
+        self._poll_export_jobs()
 
         # Загрузка данных
         self._load_initial_data()
 
     def _on_closing(self):
         """Обработка закрытия окна"""
+        # Незавершенные экспорты отменяются
+        self.export_jobs.shutdown()
+        self.controller.loader.shutdown()
+
         # Удаляем ссылку на экземпляр
         MainWindow._instance = None
         global _active_window
@@ -171,24 +196,38 @@ class MainWindow(ctk.CTk):
         self.budget_frame.pack_forget()
 
     def _init_pages(self):
-        """Инициализация страниц"""
-        # Страница мероприятий
-        self.events_page = EventsPage(self.content_frame, self.controller, self)
+        """Регистрация страниц: создаются при первом переходе"""
+        self.pages = PageRegistry(idle_timeout=Config.PAGE_IDLE_UNLOAD_MINUTES * 60)
 
-        # Страница номенклатуры
-        self.nomenclature_page = NomenclaturePage(self.content_frame, self.controller)
+        # Страница мероприятий (по умолчанию, не выгружается)
+        self.pages.register(
+            'events', lambda: EventsPage(self.content_frame, self.controller, self), pinned=True
+        )
+        self.pages.register('nomenclature', lambda: NomenclaturePage(self.content_frame, self.controller))
+        self.pages.register('suppliers', lambda: SuppliersPage(self.content_frame, self.controller))
+        self.pages.register(
+            'reports', lambda: ReportsPage(self.content_frame, self.controller, self.export_jobs)
+        )
+        self.pages.register('settings', lambda: SettingsPage(self.content_frame, self.controller))
 
-        # Страница поставщиков
-        self.suppliers_page = SuppliersPage(self.content_frame, self.controller)
+        # Показываем страницу мероприятий по умолчанию
+        self.show_events()
 
-        # Страница отчетов
-        self.reports_page = ReportsPage(self.content_frame, self.controller)
+        # Остальные страницы - после первой отрисовки, простаивающие - выгружаются
+        if Config.PREWARM_PAGES:
+            self.after(PAGE_PREWARM_DELAY_MS, self._prewarm_pages)
+        if self.pages.idle_timeout:
+            self.after(PAGE_SWEEP_INTERVAL_MS, self._unload_idle_pages)
 
-        # Страница настроек
-        self.settings_page = SettingsPage(self.content_frame, self.controller)
+    def _prewarm_pages(self):
+        """Создать следующую страницу заранее (по одной, чтобы окно не замирало)"""
+        if self.pages.prewarm_next():
+            self.after(PAGE_PREWARM_STEP_MS, self._prewarm_pages)
 
-        # Показываем страницу мероприятий по умолчанию
-        self.show_events()
+    def _unload_idle_pages(self):
+        """Выгрузить давно скрытые страницы"""
+        self.pages.unload_idle()
+        self.after(PAGE_SWEEP_INTERVAL_MS, self._unload_idle_pages)
 
     def _load_initial_data(self):
         """Загрузка начальных данных"""
@@ -198,10 +237,38 @@ class MainWindow(ctk.CTk):
 
         self.update_status("Готов к работе")
 
+    def _poll_export_jobs(self):
+        """Передача обновлений задач экспорта в главный поток"""
+        try:
+            self.export_jobs.dispatch()
+        finally:
+            # Опрос продолжается и после ошибки обработчика
+            self.after(EXPORT_POLL_INTERVAL_MS, self._poll_export_jobs)
+
+    def _on_export_job_update(self, job: ExportJob):
+        """Ход экспорта в статусной строке"""
+        active = self.export_jobs.active_jobs()
+        if active:
+            current = next((j for j in active if j.started_at is not None), active[0])
+            message = f"Экспорт: {current.title}"
+            if current.progress is not None:
+                message += f" - {current.progress * 100:.0f}%"
+            elif current.done:
+                message += f" - {current.done} строк"
+            if len(active) > 1:
+                message += f" (+{len(active) - 1})"
+        elif job.status == JOB_DONE:
+            message = f"Экспорт завершен: {job.title} ({job.duration:.1f} с)"
+        elif job.status == JOB_FAILED:
+            message = f"Ошибка экспорта: {job.title}"
+        else:
+            message = f"Экспорт отменен: {job.title}"
+
+        self.ui_updates.set('status', message)
+
     def update_status(self, message: str):
-        """Обновить статусную строку"""
-        self.status_label.configure(text=message)
-        self.update()
+        """Обновить статусную строку (в ближайшем обработчике после простоя, без update())"""
+        self.ui_updates.set('status', message)
 
     def show_budget_panel(self, show: bool = True):
         """Показать/скрыть панель бюджета"""
@@ -211,15 +278,31 @@ class MainWindow(ctk.CTk):
             self.budget_frame.pack_forget()
 
     def update_budget_display(self):
-        """Обновить отображение бюджета"""
-        if not self.controller.current_event:
-            self.show_budget_panel(False)
-            return
+        """Бюджет изменился: пересчитать в ближайшем обработчике (вызовы за кадр схлопываются)"""
+        self.ui_updates.mark_dirty('budget')
+
+    def _compute_budget(self) -> Optional[tuple]:
+        """Бюджет и прогноз текущего мероприятия (None - мероприятие не выбрано)"""
+        event = self.controller.current_event
+        if not event:
+            return None
+        return event.name, self.controller.get_budget_status(), self.controller.get_budget_projection()
+
+    def _update_budget_panel(self):
+        """Панель бюджета - только на своих страницах и при выбранном мероприятии"""
+        self.show_budget_panel(
+            self.pages.current in BUDGET_PAGES and self.ui_updates.value('budget') is not None
+        )
 
-        budget_status = self.controller.get_budget_status()
+    def _apply_budget(self, budget: Optional[tuple]):
+        """Показать бюджет в панели"""
+        if budget is None:
+            self._update_budget_panel()
+            return
 
+        event_name, budget_status, projection = budget
         self.budget_label.configure(
-            text=f"Бюджет мероприятия: {self.controller.current_event.name}"
+            text=f"Бюджет мероприятия: {event_name}"
         )
 
         # Прогресс-бар
@@ -243,42 +326,53 @@ class MainWindow(ctk.CTk):
             f"Осталось: {Formatters.format_currency(budget_status['remaining'])} | "
             f"Использовано: {Formatters.format_percentage(budget_status['percentage'])}"
         )
+
+        # Прогноз расходов на дату мероприятия
+        if projection and projection.days_left:
+            details += (
+                f" | Прогноз: {Formatters.format_currency(projection.projected_amount)} "
+                f"({Formatters.format_percentage(projection.projected_percentage)})"
+            )
+            if projection.projected_percentage >= Config.BUDGET_CRITICAL_THRESHOLD * 100:
+                details += " ⚠"
+
         self.budget_details.configure(text=details)
 
-        self.show_budget_panel(True)
+        self._update_budget_panel()
 
     # ===== Навигация =====
 
     def show_events(self):
         """Показать страницу мероприятий"""
-        self._hide_all_pages()
-        self.events_page.pack(fill="both", expand=True)
-        self.update_budget_display()
+        self._show_page('events')
+        self._show_budget_page()
 
     def show_nomenclature(self):
         """Показать страницу номенклатуры"""
-        self._hide_all_pages()
-        self.nomenclature_page.pack(fill="both", expand=True)
+        self._show_page('nomenclature')
         self.show_budget_panel(False)
 
     def show_suppliers(self):
         """Показать страницу поставщиков"""
-        self._hide_all_pages()
-        self.suppliers_page.pack(fill="both", expand=True)
+        self._show_page('suppliers')
         self.show_budget_panel(False)
 
     def show_reports(self):
         """Показать страницу отчетов"""
-        self._hide_all_pages()
-        self.reports_page.pack(fill="both", expand=True)
-        self.update_budget_display()
+        self._show_page('reports')
+        self._show_budget_page()
 
     def show_settings(self):
         """Показать страницу настроек"""
-        self._hide_all_pages()
-        self.settings_page.pack(fill="both", expand=True)
+        self._show_page('settings')
         self.show_budget_panel(False)  # Скрываем панель бюджета для настроек
 
+    def _show_budget_page(self):
+        """Страница с панелью бюджета: показать последний рассчитанный бюджет без запросов"""
+        if not self.ui_updates.has_value('budget'):
+            self.update_budget_display()
+        self._update_budget_panel()
+
     def show_about(self):
         """Показать информацию о программе"""
         about_text = f"""
@@ -293,11 +387,13 @@ class MainWindow(ctk.CTk):
 """
         messagebox.showinfo("О программе", about_text)
 
-    def _hide_all_pages(self):
-        """Скрыть все страницы"""
-        for page in [self.events_page, self.nomenclature_page,
-                     self.suppliers_page, self.reports_page, self.settings_page]:  # Добавляем settings_page
-            page.pack_forget()
+    def _show_page(self, name: str):
+        """Показать страницу (создается при первом переходе), остальные скрыть"""
+        page = self.pages.show(name)
+        for other in self.pages.loaded():
+            if other is not page:
+                other.pack_forget()
+        page.pack(fill="both", expand=True)
 
     def focus_window(self):
         """Фокусировка на окне"""
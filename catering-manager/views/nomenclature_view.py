@@ -2,10 +2,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import customtkinter as ctk
-from typing import List, Optional
+from typing import Dict, List, Optional
 from models import Nomenclature, CostCategory
 from controllers import CateringController
+from utils.filter_index import FilterIndex
 from utils.formatters import Formatters
+from utils.search_pipeline import SearchPipeline
+from utils.view_models import NomenclatureRows
+from widgets.virtual_tree import VirtualTreeview
 from .base_view import BasePage
 class NomenclaturePage(BasePage):
     """Страница управления номенклатурой"""
@@ -13,6 +17,12 @@ class NomenclaturePage(BasePage):
         super().__init__(parent, controller, "Управление номенклатурой")
         self.nomenclatures: List[Nomenclature] = []
         self.categories: List[CostCategory] = []
+        # Названия категорий по id (для строк таблицы)
+        self.category_names: Dict[int, str] = {}
+        # Строки таблицы (форматируются один раз до изменения позиции)
+        self.rows = NomenclatureRows(self._category_name)
+        # Поиск с задержкой ввода по индексу загруженных позиций
+        self.search = SearchPipeline(self, self._show_matches)
         self._create_widgets()
         self.refresh_data()
 
@@ -46,7 +56,7 @@ class NomenclaturePage(BasePage):
 
         self.search_entry = ctk.CTkEntry(filter_frame, width=150, font=("Arial", 12))
         self.search_entry.pack(side="left", padx=5)
-        self.search_entry.bind('<KeyRelease>', self._apply_filter)
+        self.search_entry.bind('<KeyRelease>', lambda e: self.search.set_query(self.search_entry.get()))
 
         # Кнопки управления
         button_frame = ctk.CTkFrame(self)
@@ -97,8 +107,8 @@ class NomenclaturePage(BasePage):
         tree_scroll_x = ctk.CTkScrollbar(tree_frame, orientation="horizontal")
         tree_scroll_x.pack(side="bottom", fill="x")
 
-        # Treeview
-        self.tree = ttk.Treeview(
+        # Виртуальная таблица: в Treeview только видимые строки
+        self.tree = VirtualTreeview(
             tree_frame,
             yscrollcommand=tree_scroll_y.set,
             xscrollcommand=tree_scroll_x.set,
@@ -142,85 +152,59 @@ class NomenclaturePage(BasePage):
         self.status_label.pack(side="bottom", fill="x", padx=10, pady=5)
 
     def refresh_data(self):
-        """Обновить данные"""
+        """Обновить данные (запросы - в рабочем потоке)"""
+        self.load_async("nomenclatures", self._load_nomenclatures, self._show_nomenclatures,
+                        "Не удалось загрузить номенклатуру")
+
+    def _load_nomenclatures(self) -> tuple:
+        """Загрузка данных; выполняется в рабочем потоке"""
+        return self.controller.get_all_nomenclatures(), self.controller.get_all_categories()
+
+    def _show_nomenclatures(self, data: tuple):
+        """Показать загруженные данные"""
         try:
-            # Очищаем таблицу
-            for item in self.tree.get_children():
-                self.tree.delete(item)
+            self.nomenclatures, self.categories = data
+            self.category_names = {cat.id: cat.name for cat in self.categories}
+            self.rows.retain(self.nomenclatures)
 
-            # Загружаем данные
-            self.nomenclatures = self.controller.get_all_nomenclatures()
-            self.categories = self.controller.get_all_categories()
+            # Индекс для фильтров: корзины по категориям и слова для поиска
+            self.search.set_index(FilterIndex(
+                self.nomenclatures,
+                text=lambda n: (n.name, self._category_name(n), n.unit, n.description),
+                fields={'category': self._category_name}
+            ))
 
             # Обновляем фильтр категорий
             category_names = ["Все категории"] + [cat.name for cat in self.categories]
             self.category_filter.configure(values=category_names)
             self.category_filter.set("Все категории")
 
-            # Заполняем таблицу
-            for nomenclature in self.nomenclatures:
-                category_name = ""
-                if nomenclature.category:
-                    category_name = nomenclature.category.name
-                elif nomenclature.category_id:
-                    for cat in self.categories:
-                        if cat.id == nomenclature.category_id:
-                            category_name = cat.name
-                            break
-
-                self.tree.insert(
-                    '',
-                    tk.END,
-                    values=(
-                        nomenclature.id,
-                        nomenclature.name,
-                        category_name,
-                        nomenclature.unit,
-                        Formatters.truncate_text(nomenclature.description, 40),
-                        Formatters.format_date(nomenclature.created_at),
-                        "✓" if nomenclature.is_active else "✗"
-                    ),
-                    tags=('active' if nomenclature.is_active else 'inactive')
-                )
+            # Заполняем таблицу (строки форматируются при показе)
+            self._apply_filter()
 
             # Настраиваем цвета строк
             self.tree.tag_configure('active', foreground='black')
             self.tree.tag_configure('inactive', foreground='gray')
 
-            # Обновляем статус
-            self.status_label.configure(
-                text=f"Загружено позиций: {len(self.nomenclatures)}"
-            )
-
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить номенклатуру: {str(e)}")
 
+    def _category_name(self, nomenclature: Nomenclature) -> str:
+        """Название категории позиции"""
+        if nomenclature.category:
+            return nomenclature.category.name
+        return self.category_names.get(nomenclature.category_id, "")
+
     def _apply_filter(self, event=None):
-        """Применить фильтры"""
+        """Применить фильтр по категории (поиск по тексту учитывается)"""
         category_filter = self.category_filter.get()
-        search_text = self.search_entry.get().strip().lower()
-
-        for item in self.tree.get_children():
-            values = self.tree.item(item)['values']
-            show_item = True
-
-            # Фильтр по категории
-            if category_filter != "Все категории" and values[2] != category_filter:
-                show_item = False
-
-            # Фильтр по поисковому запросу
-            if search_text:
-                item_matches = any(search_text in str(val).lower() for val in values)
-                if not item_matches:
-                    show_item = False
+        equals = {'category': category_filter} if category_filter != "Все категории" else {}
+        self.search.set_filters(equals)
 
-            # Показываем/скрываем строку
-            if show_item:
-                self.tree.item(item, tags=())
-            else:
-                self.tree.item(item, tags=('hidden',))
-
-        self.tree.tag_configure('hidden', foreground='gray90')
+    def _show_matches(self, matches: List[Nomenclature], total: int):
+        """Показать найденные позиции (в таблице только подходящие)"""
+        self.tree.update_items(matches, self.rows)
+        self.status_label.configure(text=f"Загружено позиций: {total} | Найдено: {len(matches)}")
 
     def _add_nomenclature(self):
         """Добавить новую номенклатуру"""
@@ -235,39 +219,25 @@ class NomenclaturePage(BasePage):
 
     def _edit_nomenclature(self):
         """Редактировать выбранную номенклатуру"""
-        selected = self.tree.selection()
-        if not selected:
+        nomenclature = self.tree.selected_item()
+        if not nomenclature:
             messagebox.showwarning("Внимание", "Выберите позицию для редактирования")
             return
 
-        # Получаем ID выбранной номенклатуры
-        item = self.tree.item(selected[0])
-        nomenclature_id = item['values'][0]
-
-        # Находим номенклатуру
-        nomenclature = None
-        for nom in self.nomenclatures:
-            if nom.id == nomenclature_id:
-                nomenclature = nom
-                break
-
-        if nomenclature:
-            dialog = NomenclatureDialog(self, self.controller, nomenclature, self.categories)
-            self.wait_window(dialog)
-            if dialog.result:
-                self.refresh_data()
+        dialog = NomenclatureDialog(self, self.controller, nomenclature, self.categories)
+        self.wait_window(dialog)
+        if dialog.result:
+            self.refresh_data()
 
     def _delete_nomenclature(self):
         """Удалить выбранную номенклатуру"""
-        selected = self.tree.selection()
+        selected = self.tree.selected_item()
         if not selected:
             messagebox.showwarning("Внимание", "Выберите позицию для удаления")
             return
 
-        # Получаем ID выбранной номенклатуры
-        item = self.tree.item(selected[0])
-        nomenclature_id = item['values'][0]
-        nomenclature_name = item['values'][1]
+        nomenclature_id = selected.id
+        nomenclature_name = selected.name
 
         if messagebox.askyesno("Подтверждение", f"Удалить позицию '{nomenclature_name}'?"):
             try:
@@ -12,7 +12,9 @@ from typing import List, Optional
 from models import Order, OrderItem, Nomenclature, Supplier
 from controllers import CateringController
 from utils.formatters import Formatters
+from utils.quick_entry import OrderCatalogs, load_order_catalogs
 from utils.validators import Validators
+from widgets.quick_entry import QuickEntry
 from .base_view import BasePage  # <--- ИСПРАВЛЕНО
 
 
@@ -106,9 +108,8 @@ class OrdersPage(BasePage):
         # Номенклатура
         ctk.CTkLabel(form_frame, text="Позиция:", font=("Arial", 12)).pack(anchor="w", pady=(5, 0))
 
-        self.nomenclature_combo = ctk.CTkComboBox(
+        self.nomenclature_combo = QuickEntry(
             form_frame,
-            values=[],
             font=("Arial", 12),
             command=self._on_nomenclature_select
         )
@@ -117,9 +118,8 @@ class OrdersPage(BasePage):
         # Поставщик
         ctk.CTkLabel(form_frame, text="Поставщик:", font=("Arial", 12)).pack(anchor="w", pady=(5, 0))
 
-        self.supplier_combo = ctk.CTkComboBox(
+        self.supplier_combo = QuickEntry(
             form_frame,
-            values=[],
             font=("Arial", 12),
             command=self._on_supplier_select
         )
@@ -242,17 +242,23 @@ class OrdersPage(BasePage):
         self._load_data()
 
     def _load_data(self):
-        """Загрузить данные для формы"""
-        try:
-            self.nomenclatures = self.controller.get_all_nomenclatures()
-            self.suppliers = self.controller.get_all_suppliers()
+        """Загрузить данные для формы (запросы - в рабочем потоке)"""
+        self.nomenclature_combo.set("Загрузка...")
+        self.controller.loader.load(
+            self, ("order_form", id(self)),
+            lambda: load_order_catalogs(self.controller),
+            self._show_data,
+            lambda e: messagebox.showerror("Ошибка", f"Не удалось загрузить данные: {str(e)}")
+        )
 
-            # Заполняем комбобоксы
-            nomenclature_names = [f"{n.name} ({n.unit})" for n in self.nomenclatures if n.is_active]
-            self.nomenclature_combo.configure(values=nomenclature_names)
+    def _show_data(self, catalogs: OrderCatalogs):
+        """Заполнить форму загруженными данными"""
+        try:
+            self.nomenclatures, self.suppliers = catalogs.nomenclatures, catalogs.suppliers
 
-            supplier_names = [s.name for s in self.suppliers if s.is_active]
-            self.supplier_combo.configure(values=supplier_names)
+            # Поля быстрого ввода: автодополнение и выбор по индексу
+            self.nomenclature_combo.set_catalog(catalogs.nomenclature_index)
+            self.supplier_combo.set_catalog(catalogs.supplier_index)
 
             # Создаем новый заказ
             self.order = self.controller.create_new_order()
@@ -265,12 +271,9 @@ class OrdersPage(BasePage):
         if not choice:
             return
 
-        # Находим выбранную номенклатуру
-        for nom in self.nomenclatures:
-            display_name = f"{nom.name} ({nom.unit})"
-            if display_name == choice:
-                # Можно здесь подгрузить цену по умолчанию
-                break
+        # Находим выбранную номенклатуру (по индексу поля ввода)
+        nomenclature = self.nomenclature_combo.catalog.resolve(choice)
+        # Можно здесь подгрузить цену по умолчанию
 
     def _on_supplier_select(self, choice):
         """Обработка выбора поставщика"""
@@ -300,32 +303,18 @@ class OrdersPage(BasePage):
             messagebox.showwarning("Внимание", "Выберите поставщика")
             return
 
-        # Находим номенклатуру
-        selected_nomenclature = None
-        nomenclature_id = None
-        for nom in self.nomenclatures:
-            display_name = f"{nom.name} ({nom.unit})"
-            if display_name == nomenclature_display:
-                selected_nomenclature = nom
-                nomenclature_id = nom.id
-                break
-
+        # Находим номенклатуру и поставщика по индексу полей ввода
+        selected_nomenclature = self.nomenclature_combo.selected_item()
         if not selected_nomenclature:
             messagebox.showerror("Ошибка", "Не найдена выбранная позиция")
             return
+        nomenclature_id = selected_nomenclature.id
 
-        # Находим поставщика
-        selected_supplier = None
-        supplier_id = None
-        for sup in self.suppliers:
-            if sup.name == supplier_name:
-                selected_supplier = sup
-                supplier_id = sup.id
-                break
-
+        selected_supplier = self.supplier_combo.selected_item()
         if not selected_supplier:
             messagebox.showerror("Ошибка", "Не найден выбранный поставщик")
             return
+        supplier_id = selected_supplier.id
 
         # Валидация количества
         quantity = Validators.validate_decimal(quantity_str)
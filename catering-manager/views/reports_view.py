@@ -8,27 +8,59 @@ from tkinter import filedialog  # Добавлен импорт filedialog
 import customtkinter as ctk
 from datetime import datetime, date
 from decimal import Decimal
-from typing import List, Optional, Dict, Any
-import matplotlib.pyplot as plt
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Callable
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import pandas as pd
+from matplotlib.figure import Figure
 
 
 from models import Event, EventSummary, ExpenseReportItem
 from controllers import CateringController
 from utils.formatters import Formatters
+from utils.export_utils import ExportUtils
+from utils.chart_hover import BlitHover, BarHoverIndex, PointHoverIndex
+from utils.chart_service import daily_spend_chart_data, expense_chart_data
+from utils.batch_reports import BatchReportRunner
+from utils.event_book import EventBookExporter
+from utils.export_jobs import ExportJob, ExportJobQueue, EXPORT_POLL_INTERVAL_MS
+from utils.incremental_export import IncrementalExporter
+from utils.live_plots import ExpenseAnalysisPlot, SpendTimelinePlot
+from utils.pdf_export import PdfReportRenderer
+from utils.stream_export import StreamExporter, ORDER_ITEM_EXPORT, EVENT_OVERVIEW_EXPORT
+from widgets.live_chart import LiveChartView
 from .base_view import BasePage
 
 
 class ReportsPage(BasePage):
     """Страница отчетов"""
 
-    def __init__(self, parent, controller):
+    def __init__(self, parent, controller, export_jobs: Optional[ExportJobQueue] = None):
         super().__init__(parent, controller, "Отчеты")
         self.selected_event: Optional[Event] = None
+        # Загруженные мероприятия и они же по тексту в списке выбора
+        self.events: List[Event] = []
+        self.events_by_display: Dict[str, Event] = {}
+
+        # Очередь задач экспорта (обычно общая, из главного окна)
+        self.export_jobs = export_jobs or ExportJobQueue()
+
         self._create_widgets()
         self._load_events()
 
+        self.export_jobs.add_listener(self._on_export_job_update)
+        if export_jobs is None:
+            self._dispatch_export_jobs()
+
+    def destroy(self):
+        """Отписаться от очереди экспорта (страница может выгружаться главным окном)"""
+        self.export_jobs.remove_listener(self._on_export_job_update)
+        super().destroy()
+
+    def _dispatch_export_jobs(self):
+        """Опрос своей очереди экспорта (если страница создана без главного окна)"""
+        self.export_jobs.dispatch()
+        self.after(EXPORT_POLL_INTERVAL_MS, self._dispatch_export_jobs)
+
     def _create_widgets(self):
         """Создание виджетов страницы"""
         # Заголовок
@@ -188,20 +220,36 @@ class ReportsPage(BasePage):
         charts_frame = ctk.CTkFrame(self.tabview.tab("Анализ"))
         charts_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
-        # Canvas для matplotlib графиков
-        self.figure_frame = ctk.CTkFrame(charts_frame)
-        self.figure_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        # Одна фигура на все мероприятия: при переключении обновляются столбцы и секторы
+        self.analysis_chart = LiveChartView(
+            charts_frame, ExpenseAnalysisPlot, "Выберите мероприятие для анализа", figsize=(12, 5)
+        )
+        self.analysis_chart.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # Расходы по дням: длинный ряд прореживается под ширину графика и при масштабировании
+        self.spend_chart = LiveChartView(
+            charts_frame, SpendTimelinePlot, "", figsize=(12, 3), toolbar=True
+        )
+        self.spend_chart.pack(fill="both", expand=True, padx=10, pady=(0, 10))
 
     def _load_events(self):
-        """Загрузка списка мероприятий"""
+        """Загрузка списка мероприятий (запрос - в рабочем потоке)"""
+        self.load_async("events", self.controller.get_all_events, self._show_events,
+                        "Не удалось загрузить мероприятия")
+
+    def _show_events(self, events: List[Event]):
+        """Заполнить список мероприятий"""
         try:
-            events = self.controller.get_all_events()
-            event_names = [f"{event.name} ({Formatters.format_date(event.event_date)})" for event in events]
+            self.events = events
+            self.events_by_display = {
+                f"{event.name} ({Formatters.format_date(event.event_date)})": event for event in events
+            }
+            event_names = list(self.events_by_display)
             self.event_combo.configure(values=event_names)
 
             if events:
                 self.event_combo.set(event_names[0])
-                self.selected_event = events[0]
+                self.selected_event = self.events_by_display[event_names[0]]
                 self._refresh_reports()
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить мероприятия: {str(e)}")
@@ -211,24 +259,28 @@ class ReportsPage(BasePage):
         if not choice:
             return
 
-        # Найти выбранное мероприятие
-        events = self.controller.get_all_events()
-        for event in events:
-            event_display = f"{event.name} ({Formatters.format_date(event.event_date)})"
-            if event_display == choice:
-                self.selected_event = event
-                break
-
+        # Мероприятие - из загруженного списка, без повторного запроса
+        self.selected_event = self.events_by_display.get(choice, self.selected_event)
         self._refresh_reports()
 
     def _refresh_reports(self):
-        """Обновление всех отчетов"""
+        """Обновление всех отчетов (запросы - в рабочем потоке, устаревший выбор отбрасывается)"""
         if not self.selected_event:
             return
 
+        event_id = self.selected_event.id
+        self.load_async(
+            "report",
+            lambda: (self.controller.get_expense_report(event_id),
+                     self.controller.get_daily_spend(event_id=event_id)),
+            self._show_reports,
+            "Не удалось обновить отчеты"
+        )
+
+    def _show_reports(self, data: tuple):
+        """Показать загруженные отчеты по мероприятию"""
         try:
-            # Получить данные отчета
-            summary = self.controller.get_expense_report(self.selected_event.id)
+            summary, daily_spend = data
             if not summary:
                 return
 
@@ -239,7 +291,7 @@ class ReportsPage(BasePage):
             self._update_expenses_tab(summary)
 
             # Обновить вкладку "Анализ"
-            self._update_analysis_tab(summary)
+            self._update_analysis_tab(summary, daily_spend)
 
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось обновить отчеты: {str(e)}")
@@ -381,11 +433,19 @@ class ReportsPage(BasePage):
         """Обновить данные страницы"""
         self._load_events()
 
+    def _load_overview(self) -> tuple:
+        """Мероприятия и расходы по ним; выполняется в рабочем потоке"""
+        return self.controller.get_all_events(), self.controller.get_spent_by_event()
+
     def _show_overall_report(self):
-        """Показать отчет по всем мероприятиям"""
+        """Показать отчет по всем мероприятиям (данные - в рабочем потоке)"""
+        self.load_async("overall", self._load_overview, self._show_overall_stats,
+                        "Ошибка при формировании общего отчета")
+
+    def _show_overall_stats(self, data: tuple):
+        """Показать общую статистику по загруженным данным"""
         try:
-            # Получить все мероприятия
-            events = self.controller.get_all_events()
+            events, spent_by_event = data
             if not events:
                 messagebox.showinfo("Информация", "Нет мероприятий для отображения")
                 return
@@ -395,12 +455,8 @@ class ReportsPage(BasePage):
             total_guests = sum(event.guests_count for event in events)
             total_budget = sum(float(event.budget) for event in events)
 
-            # Подсчитать общие расходы
-            total_spent = 0
-            for event in events:
-                event_summary = self.controller.get_expense_report(event.id)
-                if event_summary:
-                    total_spent += float(event_summary.total_amount)
+            # Подсчитать общие расходы (по сводной таблице)
+            total_spent = sum(float(spent_by_event.get(event.id, 0)) for event in events)
 
             # Подсчитать статусы мероприятий
             status_counts = {"планируется": 0, "идет": 0, "завершено": 0}
@@ -427,12 +483,12 @@ class ReportsPage(BasePage):
             )
 
             # Создать окно с общей статистикой
-            self._show_overall_stats_window(overall_info, events)
+            self._show_overall_stats_window(overall_info, events, spent_by_event)
 
         except Exception as e:
             messagebox.showerror("Ошибка", f"Ошибка при формировании общего отчета: {str(e)}")
 
-    def _show_overall_stats_window(self, info_text: str, events: List[Event]):
+    def _show_overall_stats_window(self, info_text: str, events: List[Event], spent_by_event: Dict[int, Decimal]):
         """Показать окно с общей статистикой"""
         # Создать новое окно
         stats_window = ctk.CTkToplevel(self)
@@ -467,13 +523,13 @@ class ReportsPage(BasePage):
         ctk.CTkButton(
             button_frame,
             text="📊 Диаграммы",
-            command=lambda: self._show_overall_charts(events)
+            command=lambda: self._show_overall_charts(events, spent_by_event)
         ).pack(side="left", padx=5)
 
         ctk.CTkButton(
             button_frame,
             text="📝 Экспорт",
-            command=lambda: self._export_overall_report(events)
+            command=lambda: self._export_overall_report(events, spent_by_event)
         ).pack(side="left", padx=5)
 
         ctk.CTkButton(
@@ -484,7 +540,7 @@ class ReportsPage(BasePage):
 
     # file: D:\Users\Maria\Downloads\VostokEda\catering-manager\views\reports_view.py
     # section: _show_overall_charts method
-    def _show_overall_charts(self, events: List[Event]):
+    def _show_overall_charts(self, events: List[Event], spent_by_event: Dict[int, Decimal]):
         """Показать диаграммы для общего отчета"""
         try:
             # Создать новое окно для диаграмм
@@ -508,17 +564,12 @@ class ReportsPage(BasePage):
             # Подготовить данные для графиков
             event_names = [event.name for event in events]
             budgets = [float(event.budget) for event in events]
-            spent_amounts = []
-
-            for event in events:
-                summary = self.controller.get_expense_report(event.id)
-                if summary:
-                    spent_amounts.append(float(summary.total_amount))
-                else:
-                    spent_amounts.append(0.0)
+            spent_amounts = [float(spent_by_event.get(event.id, 0)) for event in events]
 
             # Создать фигуру matplotlib с уменьшенным размером
-            fig, axes = plt.subplots(2, 2, figsize=(12, 9))  # Уменьшен размер фигуры
+            # Figure без pyplot: освобождается вместе с окном
+            fig = Figure(figsize=(12, 9))
+            axes = fig.subplots(2, 2)
             fig.suptitle('Общая аналитика по мероприятиям', fontsize=16)
 
             ax1, ax2, ax3, ax4 = axes.flatten()
@@ -531,28 +582,6 @@ class ReportsPage(BasePage):
             ax1.set_title('Сравнение бюджетов и расходов')
             ax1.legend()
 
-            # Добавить аннотации для первой диаграммы
-            annot1 = ax1.annotate('', xy=(0, 0), xytext=(20, 20), textcoords="offset points",
-                                  bbox=dict(boxstyle="round", fc="w", ec="b", lw=1),
-                                  arrowprops=dict(arrowstyle="->", connectionstyle="arc3,rad=0"),
-                                  visible=False)
-
-            def hover1(event):
-                if event.inaxes == ax1:
-                    for i, bar in enumerate(bars1):
-                        if bar.contains(event)[0]:
-                            annot1.xy = (bar.get_x() + bar.get_width() / 2, bar.get_height())
-                            annot1.set_text(f'{event_names[i]}')
-                            annot1.set_visible(True)
-                            fig.canvas.draw_idle()
-                            return
-                    annot1.set_visible(False)
-                else:
-                    annot1.set_visible(False)
-                fig.canvas.draw_idle()
-
-            fig.canvas.mpl_connect("motion_notify_event", hover1)
-
             # Диаграмма 2: Использование бюджета в %
             usage_percentages = []
             for i, event in enumerate(events):
@@ -579,28 +608,6 @@ class ReportsPage(BasePage):
                 else:
                     bar.set_color('green')
 
-            # Добавить аннотации для второй диаграммы
-            annot2 = ax2.annotate('', xy=(0, 0), xytext=(20, 20), textcoords="offset points",
-                                  bbox=dict(boxstyle="round", fc="w", ec="b", lw=1),
-                                  arrowprops=dict(arrowstyle="->", connectionstyle="arc3,rad=0"),
-                                  visible=False)
-
-            def hover2(event):
-                if event.inaxes == ax2:
-                    for i, bar in enumerate(bars2):
-                        if bar.contains(event)[0]:
-                            annot2.xy = (bar.get_x() + bar.get_width() / 2, bar.get_height())
-                            annot2.set_text(f'{event_names[i]}')
-                            annot2.set_visible(True)
-                            fig.canvas.draw_idle()
-                            return
-                    annot2.set_visible(False)
-                else:
-                    annot2.set_visible(False)
-                fig.canvas.draw_idle()
-
-            fig.canvas.mpl_connect("motion_notify_event", hover2)
-
             # Диаграмма 3: Распределение по статусам
             status_counts = {"планируется": 0, "идет": 0, "завершено": 0}
             for event in events:
@@ -613,91 +620,70 @@ class ReportsPage(BasePage):
             ax3.set_title('Распределение мероприятий по статусам')
 
             # Диаграмма 4: Расходы по мероприятиям
-            line, = ax4.plot(range(len(event_names)), spent_amounts, marker='o', linestyle='-', linewidth=2,
-                             markersize=6)
+            ax4.plot(range(len(event_names)), spent_amounts, marker='o', linestyle='-', linewidth=2,
+                     markersize=6)
             ax4.set_xlabel('Мероприятия')
             ax4.set_ylabel('Потрачено, руб')
             ax4.set_title('Расходы по мероприятиям')
             ax4.grid(True)
 
-            # Добавить аннотации для четвертой диаграммы
-            annot4 = ax4.annotate('', xy=(0, 0), xytext=(20, 20), textcoords="offset points",
-                                  bbox=dict(boxstyle="round", fc="w", ec="b", lw=1),
-                                  arrowprops=dict(arrowstyle="->", connectionstyle="arc3,rad=0"),
-                                  visible=False)
-
-            def hover4(event):
-                if event.inaxes == ax4:
-                    for i, (x, y) in enumerate(zip(line.get_xdata(), line.get_ydata())):
-                        if abs(event.xdata - x) < 0.5 and abs(event.ydata - y) < max(
-                                spent_amounts) * 0.1:  # Приблизительное совпадение
-                            annot4.xy = (x, y)
-                            annot4.set_text(f'{event_names[i]}')
-                            annot4.set_visible(True)
-                            fig.canvas.draw_idle()
-                            return
-                    annot4.set_visible(False)
-                else:
-                    annot4.set_visible(False)
-                fig.canvas.draw_idle()
-
-            fig.canvas.mpl_connect("motion_notify_event", hover4)
-
             # Настроить макет для лучшего распределения диаграмм
-            plt.tight_layout(rect=[0, 0, 1, 0.96])  # Учитываем заголовок
+            fig.tight_layout(rect=[0, 0, 1, 0.96])  # Учитываем заголовок
 
             # Встроить график в Tkinter
             canvas = FigureCanvasTkAgg(fig, master=figure_frame)
+
+            # Подсказки: бинарный поиск элемента под курсором, перерисовывается только подсказка
+            hover = BlitHover(fig)
+            hover.add(ax1, BarHoverIndex(bars1, event_names))
+            hover.add(ax2, BarHoverIndex(bars2, event_names))
+            hover.add(ax4, PointHoverIndex(ax4, range(len(event_names)), spent_amounts, event_names))
+            # matplotlib хранит обработчики событий по слабым ссылкам
+            chart_window.chart_hover = hover
+
             canvas.draw()
             canvas.get_tk_widget().pack(fill="both", expand=True)
 
         except Exception as e:
             messagebox.showerror("Ошибка", f"Ошибка при построении диаграмм: {str(e)}")
 
-    def _export_overall_report(self, events: List[Event]):
-        """Экспорт общего отчета в файл"""
-        try:
-            # Запросить путь для сохранения файла
-            file_path = filedialog.asksaveasfilename(
-                defaultextension=".xlsx",
-                filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv"), ("All files", "*.*")]
+    def _export_overall_report(self, events: List[Event], spent_by_event: Dict[int, Decimal]):
+        """Экспорт общего отчета в файл (задачей экспорта)"""
+        path = self._ask_export_path(
+            f"Общий отчет{self._default_report_extension()}",
+            [("Excel files", "*.xlsx"), ("PDF files", "*.pdf"), ("CSV files", "*.csv")]
+        )
+        if not path:
+            return  # Пользователь отменил операцию
+
+        if path.suffix == '.csv':
+            def rows():
+                for event in events:
+                    spent = spent_by_event.get(event.id, Decimal('0'))
+                    percentage = round(float(spent / event.budget * 100), 2) if event.budget > 0 else 0
+                    # Дата - дд.мм.гггг, как в остальных выгрузках
+                    yield (event.name, Formatters.format_date(event.event_date), event.status, event.guests_count,
+                           event.budget, spent, event.budget - spent, percentage)
+
+            export = lambda job: StreamExporter.to_csv(job.track(rows(), len(events)), EVENT_OVERVIEW_EXPORT, path)
+        elif path.suffix == '.pdf':
+            export = lambda job: PdfReportRenderer.export_portfolio(
+                events, spent_by_event, path, self.controller.chart_service,
+                lambda rows: job.track(rows, len(events))
             )
+        else:
+            if path.suffix != '.xlsx':
+                path = path.with_name(path.name + '.xlsx')
 
-            if not file_path:
-                return  # Пользователь отменил операцию
-
-            # Подготовить данные для экспорта
-            export_data = []
-            for event in events:
-                summary = self.controller.get_expense_report(event.id)
-                spent = summary.total_amount if summary else Decimal('0')
-
-                export_data.append({
-                    'Название мероприятия': event.name,
-                    'Дата': Formatters.format_date(event.event_date),
-                    'Статус': event.status,
-                    'Гостей': event.guests_count,
-                    'Бюджет': float(event.budget),
-                    'Потрачено': float(spent),
-                    'Остаток': float(event.budget - spent),
-                    'Использовано (%)': round(float(spent / event.budget * 100), 2) if event.budget > 0 else 0
-                })
-
-            # Создать DataFrame и сохранить в файл
-            df = pd.DataFrame(export_data)
-
-            if file_path.endswith('.xlsx'):
-                df.to_excel(file_path, index=False)
-            elif file_path.endswith('.csv'):
-                df.to_csv(file_path, index=False, encoding='utf-8-sig')
-            else:
-                # По умолчанию сохраняем как Excel
-                df.to_excel(file_path + '.xlsx', index=False)
-
-            messagebox.showinfo("Успех", f"Отчет успешно экспортирован в {file_path}")
+            def export(job):
+                if not ExportUtils.export_overall_report_to_excel(
+                        events, spent_by_event, path, lambda rows: job.track(rows, len(events))):
+                    # Отмена перехватывается вместе с ошибками записи
+                    job.check_cancelled()
+                    raise RuntimeError("не удалось записать файл Excel")
 
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Ошибка при экспорте отчета: {str(e)}")
+        self._submit_export("Общий отчет", export, path,
+                            lambda result: f"Отчет успешно экспортирован в {path}")
 
     def _create_widgets(self):
         """Создание виджетов страницы"""
@@ -740,6 +726,28 @@ class ReportsPage(BasePage):
             width=120
         ).pack(side="right", padx=5)
 
+        ctk.CTkButton(
+            selection_frame,
+            text="🧾 Отчет PDF",
+            command=self._export_event_pdf,
+            width=110
+        ).pack(side="right", padx=5)
+
+        ctk.CTkButton(
+            selection_frame,
+            text="📚 Книга мероприятия",
+            command=self._export_event_book,
+            width=150
+        ).pack(side="right", padx=5)
+
+        # Ход пакета отчетов - в списке задач экспорта
+        ctk.CTkButton(
+            selection_frame,
+            text="📦 Пакет отчетов",
+            command=self._run_batch_reports,
+            width=130
+        ).pack(side="right", padx=5)
+
         # Вкладки отчетов
         self.tabview = ctk.CTkTabview(self)
         self.tabview.pack(fill="both", expand=True, padx=10, pady=10)
@@ -760,6 +768,83 @@ class ReportsPage(BasePage):
         self.tabview.add("Общий отчет")
         self._create_general_report_tab()
 
+        # Вкладка "Экспорт"
+        self.tabview.add("Экспорт")
+        self._create_export_jobs_tab()
+
+    def _create_export_jobs_tab(self):
+        """Вкладка задач экспорта: текущие и завершенные с временем выполнения"""
+        jobs_frame = ctk.CTkFrame(self.tabview.tab("Экспорт"))
+        jobs_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        tree_scroll_y = ctk.CTkScrollbar(jobs_frame)
+        tree_scroll_y.pack(side="right", fill="y")
+
+        self.jobs_tree = ttk.Treeview(jobs_frame, yscrollcommand=tree_scroll_y.set, selectmode="browse")
+        tree_scroll_y.configure(command=self.jobs_tree.yview)
+
+        self.jobs_tree['columns'] = ('id', 'title', 'status', 'progress', 'wait', 'duration', 'file')
+        self.jobs_tree.column('#0', width=0, stretch=tk.NO)
+        self.jobs_tree.column('id', width=40, anchor=tk.CENTER)
+        self.jobs_tree.column('title', width=220, anchor=tk.W)
+        self.jobs_tree.column('status', width=100, anchor=tk.CENTER)
+        self.jobs_tree.column('progress', width=120, anchor=tk.E)
+        self.jobs_tree.column('wait', width=80, anchor=tk.E)
+        self.jobs_tree.column('duration', width=90, anchor=tk.E)
+        self.jobs_tree.column('file', width=300, anchor=tk.W)
+
+        self.jobs_tree.heading('id', text='№')
+        self.jobs_tree.heading('title', text='Задача')
+        self.jobs_tree.heading('status', text='Состояние')
+        self.jobs_tree.heading('progress', text='Выполнено')
+        self.jobs_tree.heading('wait', text='Ожидание')
+        self.jobs_tree.heading('duration', text='Время')
+        self.jobs_tree.heading('file', text='Файл')
+        self.jobs_tree.pack(fill="both", expand=True)
+
+        button_frame = ctk.CTkFrame(self.tabview.tab("Экспорт"))
+        button_frame.pack(fill="x", padx=10, pady=(0, 10))
+
+        ctk.CTkButton(
+            button_frame,
+            text="⛔ Отменить",
+            command=self._cancel_export_job,
+            width=120
+        ).pack(side="left", padx=5)
+
+        for job in reversed(self.export_jobs.finished_jobs() + self.export_jobs.active_jobs()):
+            self._on_export_job_update(job)
+
+    def _on_export_job_update(self, job: ExportJob):
+        """Обновить строку задачи экспорта (вызывается в главном потоке)"""
+        if job.total:
+            progress = f"{job.done}/{job.total} ({job.progress * 100:.0f}%)"
+        else:
+            progress = str(job.done) if job.done else ""
+        duration = f"{job.duration:.1f} с" if job.duration is not None else ""
+        values = (job.id, job.title, job.status, progress, f"{job.wait_time:.1f} с", duration,
+                  str(job.target or ""))
+
+        iid = str(job.id)
+        try:
+            if self.jobs_tree.exists(iid):
+                self.jobs_tree.item(iid, values=values)
+            else:
+                self.jobs_tree.insert('', 0, iid=iid, values=values)
+        except tk.TclError:
+            # Страница уже уничтожена
+            self.export_jobs.remove_listener(self._on_export_job_update)
+
+    def _cancel_export_job(self):
+        """Отменить выбранную задачу экспорта"""
+        selection = self.jobs_tree.selection()
+        if not selection:
+            messagebox.showwarning("Внимание", "Выберите задачу экспорта")
+            return
+
+        if not self.export_jobs.cancel(int(selection[0])):
+            messagebox.showinfo("Информация", "Задача уже завершена")
+
     def _create_general_report_tab(self):
         """Создание вкладки общего отчета"""
         # Информационная панель
@@ -790,6 +875,18 @@ class ReportsPage(BasePage):
             command=lambda: self._export_general_report()
         ).pack(side="left", padx=5)
 
+        ctk.CTkButton(
+            button_frame,
+            text="📄 Все позиции заказов",
+            command=self._export_order_items
+        ).pack(side="left", padx=5)
+
+        ctk.CTkButton(
+            button_frame,
+            text="🧾 Изменения для бухгалтерии",
+            command=self._export_changes
+        ).pack(side="left", padx=5)
+
         ctk.CTkButton(
             button_frame,
             text="🔄 Обновить",
@@ -797,9 +894,14 @@ class ReportsPage(BasePage):
         ).pack(side="right", padx=5)
 
     def _refresh_general_report(self):
-        """Обновить общий отчет"""
+        """Обновить общий отчет (данные - в рабочем потоке)"""
+        self.load_async("general", self._load_overview, self._show_general_report,
+                        "Ошибка при обновлении общего отчета")
+
+    def _show_general_report(self, data: tuple):
+        """Показать общий отчет по загруженным данным"""
         try:
-            events = self.controller.get_all_events()
+            events, spent_by_event = data
             if not events:
                 self.general_report_text.delete("1.0", "end")
                 self.general_report_text.insert("1.0", "Нет мероприятий для отображения")
@@ -811,14 +913,11 @@ class ReportsPage(BasePage):
             total_budget = sum(float(event.budget) for event in events)
 
             # Подсчитать общие расходы
-            total_spent = 0
+            total_spent = sum(float(spent_by_event.get(event.id, 0)) for event in events)
             completed_events = 0
             planned_events = 0
             active_events = 0
             for event in events:
-                event_summary = self.controller.get_expense_report(event.id)
-                if event_summary:
-                    total_spent += float(event_summary.total_amount)
                 if event.status == "завершено":
                     completed_events += 1
                 elif event.status == "планируется":
@@ -855,8 +954,7 @@ class ReportsPage(BasePage):
             # Добавить информацию о каждом мероприятии
             report_content += "ДЕТАЛИ ПО МЕРОПРИЯТИЯМ:\n\n"
             for event in events:
-                summary = self.controller.get_expense_report(event.id)
-                spent = summary.total_amount if summary else Decimal('0')
+                spent = spent_by_event.get(event.id, Decimal('0'))
                 event_budget_utilization = (float(spent) / float(event.budget) * 100) if event.budget > 0 else 0
 
                 report_content += (
@@ -874,68 +972,188 @@ class ReportsPage(BasePage):
         except Exception as e:
             messagebox.showerror("Ошибка", f"Ошибка при обновлении общего отчета: {str(e)}")
 
-    def _update_analysis_tab(self, summary: EventSummary):
+    def _update_analysis_tab(self, summary: EventSummary, daily_spend: Dict[date, Any]):
         """Обновление вкладки анализа"""
-        # Очистить предыдущий график
-        for widget in self.figure_frame.winfo_children():
-            widget.destroy()
-
-        if not summary.categories_summary:
-            no_data_label = ctk.CTkLabel(
-                self.figure_frame,
-                text="Нет данных для построения графиков",
-                font=("Arial", 14)
-            )
-            no_data_label.pack(expand=True)
+        self.analysis_chart.show(expense_chart_data(summary))
+        self.spend_chart.show(daily_spend_chart_data(daily_spend), "Нет расходов по дням")
+
+    def _run_batch_reports(self):
+        """Сформировать отчеты по всем мероприятиям (задачей экспорта, параллельно в пуле процессов)"""
+        events = self.events
+        if not events:
+            messagebox.showinfo("Информация", "Нет мероприятий для отображения")
             return
 
-        # Подготовить данные для графиков
-        categories = [item.category_name for item in summary.categories_summary]
-        actual_values = [float(item.actual_amount) for item in summary.categories_summary]
-        planned_values = [float(item.planned_amount) for item in summary.categories_summary]
-
-        # Создать фигуру matplotlib
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
-        fig.suptitle(f'Анализ расходов - {summary.event.name}', fontsize=14)
-
-        # График 1: Фактические расходы по категориям
-        wedges, texts, autotexts = ax1.pie(
-            actual_values,
-            labels=categories,
-            autopct='%1.1f%%',
-            startangle=90,
-            textprops={'fontsize': 8}
+        output_dir = filedialog.askdirectory(title="Папка для отчетов")
+        if not output_dir:
+            return  # Пользователь отменил операцию
+
+        runner = BatchReportRunner(
+            self.controller.db.db_path, output_dir,
+            report_format=self.controller.get_settings().reports_format.lower(),
+            chart_cache_dir=self.controller.chart_service.cache_dir
+        )
+        event_ids = [event.id for event in events]
+
+        def export(job):
+            job.report(0, len(event_ids))
+            # Отмена - на ближайшем готовом отчете: еще не начатые не формируются
+            return runner.run(event_ids, lambda progress: job.report(progress[0], progress[1]))
+
+        self._submit_export(
+            "Пакет отчетов",
+            export,
+            None,
+            lambda results: self._batch_reports_message(output_dir, results)
         )
-        ax1.set_title('Фактические расходы по категориям')
-
-        # График 2: Сравнение план/факт
-        x = range(len(categories))
-        width = 0.4
-        ax2.bar([i - width / 2 for i in x], planned_values, width, label='План', alpha=0.7)
-        ax2.bar([i + width / 2 for i in x], actual_values, width, label='Факт', alpha=0.7)
-        ax2.set_xlabel('Категории')
-        ax2.set_ylabel('Сумма, руб')
-        ax2.set_title('Сравнение плановых и фактических расходов')
-        ax2.set_xticks(x)
-        ax2.set_xticklabels(categories, rotation=45, ha='right', fontsize=8)
-        ax2.legend()
-
-        # Настроить макет, чтобы всё помещалось
-        plt.tight_layout()
-
-        # Встроить график в Tkinter
-        canvas = FigureCanvasTkAgg(fig, master=self.figure_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+
+    def _batch_reports_message(self, output_dir: str, results: Dict[int, Any]) -> str:
+        """Итог пакетной генерации отчетов"""
+        errors = [f"#{event_id}: {result}" for event_id, result in results.items()
+                  if isinstance(result, Exception)]
+        message = f"Сформировано отчетов: {len(results) - len(errors)} из {len(results)}\nПапка: {output_dir}"
+        if errors:
+            message += "\n\nОшибки:\n" + "\n".join(errors)
+        return message
 
     def _show_general_charts(self):
         """Показать диаграммы для общего отчета"""
-        events = self.controller.get_all_events()
-        if events:
-            self._show_overall_charts(events)
+        self.load_async("overall_charts", self._load_overview,
+                        lambda data: self._show_overall_charts(*data) if data[0] else None,
+                        "Ошибка при построении диаграмм")
+
+    def _export_event_book(self):
+        """Книга мероприятия: все листы в одном файле Excel"""
+        if not self.selected_event:
+            messagebox.showwarning("Внимание", "Выберите мероприятие")
+            return
+
+        path = self._ask_export_path(f"Книга - {self.selected_event.name}.xlsx", [("Excel files", "*.xlsx")])
+        if not path:
+            return  # Пользователь отменил операцию
+
+        db = self.controller.db
+        event_id = self.selected_event.id
+        self._submit_export(
+            f"Книга: {self.selected_event.name}",
+            lambda job: EventBookExporter.export(
+                db, event_id, path, lambda rows: job.track(rows, db.count_order_items(event_id))
+            ),
+            path,
+            lambda counts: f"Книга мероприятия сохранена в {path}\n" +
+                           "\n".join(f"{sheet}: {count}" for sheet, count in counts.items())
+        )
+
+    def _export_event_pdf(self):
+        """Отчет по выбранному мероприятию в PDF (задачей экспорта)"""
+        if not self.selected_event:
+            messagebox.showwarning("Внимание", "Выберите мероприятие")
+            return
+
+        path = self._ask_export_path(f"Отчет - {self.selected_event.name}.pdf", [("PDF files", "*.pdf")])
+        if not path:
+            return  # Пользователь отменил операцию
+
+        db = self.controller.db
+        event_id = self.selected_event.id
+        self._submit_export(
+            f"PDF: {self.selected_event.name}",
+            lambda job: PdfReportRenderer.export_event(
+                db, event_id, path, self.controller.chart_service,
+                lambda rows: job.track(rows, db.count_order_items(event_id))
+            ),
+            path,
+            lambda pages: f"Отчет сохранен в {path}\nСтраниц: {pages}"
+        )
+
+    def _default_report_extension(self) -> str:
+        """Расширение файла отчета по формату из настроек"""
+        extensions = {"excel": ".xlsx", "pdf": ".pdf", "csv": ".csv"}
+        return extensions.get(self.controller.get_settings().reports_format.lower(), ".xlsx")
+
+    def _export_order_items(self):
+        """Выгрузка всех позиций заказов в Excel, CSV или NDJSON (потоково, задачей экспорта)"""
+        path = self._ask_export_path(
+            "Позиции заказов.xlsx",
+            [("Excel files", "*.xlsx"), ("CSV files", "*.csv"), ("NDJSON files", "*.ndjson")]
+        )
+        if not path:
+            return  # Пользователь отменил операцию
+
+        db = self.controller.db
+
+        def rows(job):
+            return job.track(db.iter_order_items(), db.count_order_items())
+
+        if path.suffix == '.csv':
+            export = lambda job: StreamExporter.to_csv(rows(job), ORDER_ITEM_EXPORT, path)
+        elif path.suffix == '.ndjson':
+            export = lambda job: StreamExporter.to_ndjson(rows(job), ORDER_ITEM_EXPORT, path)
+        else:
+            export = lambda job: ExportUtils.export_order_items_to_excel(rows(job), path)
+
+        self._submit_export("Позиции заказов", export, path,
+                            lambda count: f"Выгружено позиций: {count}\nФайл: {path}")
+
+    def _export_changes(self):
+        """Выгрузка позиций, измененных с прошлой выгрузки (или полная пересинхронизация)"""
+        incremental = messagebox.askyesnocancel(
+            "Выгрузка для бухгалтерии",
+            "Выгрузить только изменения с последней выгрузки?\n\n"
+            "Да - только изменения\nНет - полная выгрузка (пересинхронизация)"
+        )
+        if incremental is None:
+            return  # Пользователь отменил операцию
+
+        name = "Изменения позиций" if incremental else "Позиции заказов (полная)"
+        path = self._ask_export_path(
+            f"{name} {datetime.now():%Y-%m-%d}.csv",
+            [("CSV files", "*.csv"), ("NDJSON files", "*.ndjson")]
+        )
+        if not path:
+            return
+
+        db = self.controller.db
+        self._submit_export(
+            name,
+            lambda job: IncrementalExporter.export(db, path, full=not incremental, track=job.track),
+            path,
+            lambda result: (
+                f"{'Полная выгрузка' if result.full else 'Выгружены изменения'}: "
+                f"{result.upserts} новых/измененных, {result.deletes} удаленных\nФайл: {path}"
+            )
+        )
+
+    def _ask_export_path(self, filename: str, filetypes: list) -> Optional[Path]:
+        """Запросить файл для экспорта (по умолчанию - свободное имя в папке отчетов)"""
+        suggested = self.export_jobs.output_path(filename)
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=suggested.suffix,
+            filetypes=filetypes + [("All files", "*.*")],
+            initialdir=str(suggested.parent),
+            initialfile=suggested.name
+        )
+        return Path(file_path) if file_path else None
+
+    def _submit_export(self, title: str, export: Callable, path: Optional[Path],
+                       success_message: Callable[[Any], str]):
+        """Поставить экспорт в очередь задач (path - формируемый файл); итог показывается по завершении"""
+        try:
+            self.export_jobs.submit(
+                title,
+                export,
+                path,
+                lambda result: messagebox.showinfo("Успех", success_message(result)),
+                lambda error: messagebox.showerror("Ошибка", f"Ошибка экспорта \"{title}\": {str(error)}")
+            )
+        except ValueError as e:
+            messagebox.showwarning("Внимание", str(e))
+            return
+
+        self.tabview.set("Экспорт")
 
     def _export_general_report(self):
         """Экспорт общего отчета"""
-        events = self.controller.get_all_events()
-        if events:
-            self._export_overall_report(events)
+        self.load_async("overall_export", self._load_overview,
+                        lambda data: self._export_overall_report(*data) if data[0] else None,
+                        "Ошибка при экспорте отчета")
@@ -146,6 +146,23 @@ class SettingsPage(BasePage):
         )
         self.reports_format.pack(anchor="w", padx=10, pady=5)
 
+        # Сводные расходы
+        rollup_frame = ctk.CTkFrame(reports_frame)
+        rollup_frame.pack(fill="x", padx=10, pady=5)
+
+        ctk.CTkLabel(
+            rollup_frame,
+            text="Сводные расходы для отчетов обновляются автоматически после каждого заказа",
+            font=("Arial", 12)
+        ).pack(anchor="w", padx=10, pady=(5, 0))
+
+        ctk.CTkButton(
+            rollup_frame,
+            text="🔁 Пересчитать сводные данные",
+            command=self.rebuild_rollups,
+            width=250
+        ).pack(anchor="w", padx=10, pady=5)
+
         # Настройки резервного копирования
         backup_frame = ctk.CTkFrame(main_frame)
         backup_frame.pack(fill="x", pady=5)
@@ -262,6 +279,14 @@ class SettingsPage(BasePage):
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить настройки: {str(e)}")
 
+    def rebuild_rollups(self):
+        """Полный пересчет сводных расходов"""
+        success, message = self.controller.rebuild_spend_rollups()
+        if success:
+            messagebox.showinfo("Успех", message)
+        else:
+            messagebox.showerror("Ошибка", message)
+
     def save_settings(self):
         """Сохранение настроек"""
         try:
@@ -5,12 +5,17 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import customtkinter as ctk
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from models import Supplier, CostCategory
 from controllers import CateringController
+from utils.filter_index import FilterIndex
 from utils.formatters import Formatters
+from utils.search_pipeline import SearchPipeline
 from utils.validators import Validators
+from utils.view_models import SupplierRows
+from widgets.price_history_widget import PriceHistoryWidget
+from widgets.virtual_tree import VirtualTreeview
 from .base_view import BasePage  # <--- ИСПРАВЛЕНО
 
 
@@ -21,6 +26,12 @@ class SuppliersPage(BasePage):
         super().__init__(parent, controller, "Управление поставщиками")
         self.suppliers: List[Supplier] = []
         self.categories: List[CostCategory] = []
+        # Названия категорий по id (для строк таблицы)
+        self.category_names: Dict[int, str] = {}
+        # Строки таблицы (форматируются один раз до изменения поставщика)
+        self.rows = SupplierRows(self._category_name)
+        # Поиск с задержкой ввода по индексу загруженных поставщиков
+        self.search = SearchPipeline(self, self._show_matches)
         self._create_widgets()
         self.refresh_data()
 
@@ -67,6 +78,12 @@ class SuppliersPage(BasePage):
             width=120
         ).pack(side="left", padx=10)
 
+        ctk.CTkLabel(filter_frame, text="Поиск:", font=("Arial", 12)).pack(side="left", padx=(20, 5))
+
+        self.search_entry = ctk.CTkEntry(filter_frame, width=150, font=("Arial", 12))
+        self.search_entry.pack(side="left", padx=5)
+        self.search_entry.bind('<KeyRelease>', lambda e: self.search.set_query(self.search_entry.get()))
+
         # Кнопки управления
         button_frame = ctk.CTkFrame(self)
         button_frame.pack(fill="x", padx=10, pady=(0, 10))
@@ -113,7 +130,8 @@ class SuppliersPage(BasePage):
         tree_scroll_x = ctk.CTkScrollbar(tree_frame, orientation="horizontal")
         tree_scroll_x.pack(side="bottom", fill="x")
 
-        self.tree = ttk.Treeview(
+        # Виртуальная таблица: в Treeview только видимые строки
+        self.tree = VirtualTreeview(
             tree_frame,
             yscrollcommand=tree_scroll_y.set,
             xscrollcommand=tree_scroll_x.set,
@@ -162,66 +180,51 @@ class SuppliersPage(BasePage):
         self.status_label.pack(side="bottom", fill="x", padx=10, pady=5)
 
     def refresh_data(self):
-        """Обновить данные"""
+        """Обновить данные (запросы - в рабочем потоке)"""
+        self.load_async("suppliers", self._load_suppliers, self._show_suppliers,
+                        "Не удалось загрузить поставщиков")
+
+    def _load_suppliers(self) -> tuple:
+        """Загрузка данных; выполняется в рабочем потоке"""
+        return self.controller.get_all_suppliers(), self.controller.get_all_categories()
+
+    def _show_suppliers(self, data: tuple):
+        """Показать загруженные данные"""
         try:
-            # Очищаем таблицу
-            for item in self.tree.get_children():
-                self.tree.delete(item)
+            self.suppliers, self.categories = data
+            self.category_names = {cat.id: cat.name for cat in self.categories}
+            self.rows.retain(self.suppliers)
 
-            # Загружаем данные
-            self.suppliers = self.controller.get_all_suppliers()
-            self.categories = self.controller.get_all_categories()
+            # Индекс для фильтров: корзины по категориям и рейтингу, слова для поиска
+            self.search.set_index(FilterIndex(
+                self.suppliers,
+                text=lambda s: (s.name, self._category_name(s), s.contact_person, s.phone, s.email, s.inn),
+                fields={'category': self._category_name, 'rating': lambda s: int(s.rating)}
+            ))
 
             # Обновляем фильтр категорий
             category_names = ["Все категории"] + [cat.name for cat in self.categories]
             self.category_filter.configure(values=category_names)
             self.category_filter.set("Все категории")
 
-            # Заполняем таблицу
-            for supplier in self.suppliers:
-                category_name = ""
-                if supplier.category:
-                    category_name = supplier.category.name
-                elif supplier.category_id:
-                    for cat in self.categories:
-                        if cat.id == supplier.category_id:
-                            category_name = cat.name
-                            break
-
-                # Отображаем рейтинг звездами
-                rating_str = "★" * int(supplier.rating) + "☆" * (5 - int(supplier.rating))
-
-                self.tree.insert(
-                    '',
-                    tk.END,
-                    values=(
-                        supplier.id,
-                        supplier.name,
-                        category_name,
-                        supplier.contact_person,
-                        supplier.phone,
-                        supplier.email,
-                        rating_str,
-                        Formatters.format_date(supplier.created_at),
-                        "✓" if supplier.is_active else "✗"
-                    ),
-                    tags=('active' if supplier.is_active else 'inactive')
-                )
+            # Заполняем таблицу (строки форматируются при показе)
+            self._apply_filter()
 
             # Настраиваем цвета строк
             self.tree.tag_configure('active', foreground='black')
             self.tree.tag_configure('inactive', foreground='gray')
 
-            # Обновляем статус
-            self.status_label.configure(
-                text=f"Загружено поставщиков: {len(self.suppliers)}"
-            )
-
         except Exception as e:
             messagebox.showerror("Ошибка", f"Не удалось загрузить поставщиков: {str(e)}")
 
+    def _category_name(self, supplier: Supplier) -> str:
+        """Название категории поставщика"""
+        if supplier.category:
+            return supplier.category.name
+        return self.category_names.get(supplier.category_id, "")
+
     def _apply_filter(self, event=None):
-        """Применить фильтры"""
+        """Применить фильтры (в таблице остаются только подходящие поставщики)"""
         category_filter = self.category_filter.get()
         rating_filter = self.rating_filter.get()
 
@@ -232,27 +235,15 @@ class SuppliersPage(BasePage):
             else:
                 min_rating = int(rating_filter[0])
 
-        for item in self.tree.get_children():
-            values = self.tree.item(item)['values']
-            show_item = True
+        equals = {'category': category_filter} if category_filter != "Все категории" else {}
+        at_least = {'rating': min_rating} if min_rating else {}
 
-            # Фильтр по категории
-            if category_filter != "Все категории" and values[2] != category_filter:
-                show_item = False
+        self.search.set_filters(equals, at_least)
 
-            # Фильтр по рейтингу
-            if min_rating > 0:
-                rating = values[6].count('★')
-                if rating < min_rating:
-                    show_item = False
-
-            # Показываем/скрываем строку
-            if show_item:
-                self.tree.item(item, tags=())
-            else:
-                self.tree.item(item, tags=('hidden',))
-
-        self.tree.tag_configure('hidden', foreground='gray90')
+    def _show_matches(self, matches: List[Supplier], total: int):
+        """Показать найденных поставщиков (в таблице только подходящие)"""
+        self.tree.update_items(matches, self.rows)
+        self.status_label.configure(text=f"Загружено поставщиков: {total} | Найдено: {len(matches)}")
 
     def _add_supplier(self):
         """Добавить нового поставщика"""
@@ -267,45 +258,32 @@ class SuppliersPage(BasePage):
 
     def _edit_supplier(self):
         """Редактировать выбранного поставщика"""
-        selected = self.tree.selection()
-        if not selected:
+        supplier = self.tree.selected_item()
+        if not supplier:
             messagebox.showwarning("Внимание", "Выберите поставщика для редактирования")
             return
 
-        # Получаем ID выбранного поставщика
-        item = self.tree.item(selected[0])
-        supplier_id = item['values'][0]
-
-        # Находим поставщика
-        supplier = None
-        for sup in self.suppliers:
-            if sup.id == supplier_id:
-                supplier = sup
-                break
-
-        if supplier:
-            dialog = SupplierDialog(self, self.controller, supplier, self.categories)
-            self.wait_window(dialog)
-            if dialog.result:
-                self.refresh_data()
+        dialog = SupplierDialog(self, self.controller, supplier, self.categories)
+        self.wait_window(dialog)
+        if dialog.result:
+            self.refresh_data()
 
     def _show_prices(self):
         """Показать цены поставщика"""
-        selected = self.tree.selection()
-        if not selected:
+        supplier = self.tree.selected_item()
+        if not supplier:
             messagebox.showwarning("Внимание", "Выберите поставщика для просмотра цен")
             return
 
-        # Получаем ID выбранного поставщика
-        item = self.tree.item(selected[0])
-        supplier_id = item['values'][0]
-        supplier_name = item['values'][1]
+        # Окно с историей цен, ограниченной выбранным поставщиком
+        prices_window = ctk.CTkToplevel(self)
+        prices_window.title(f"Цены поставщика: {supplier.name}")
+        prices_window.geometry("900x650")
+        prices_window.transient(self)
 
-        messagebox.showinfo(
-            "Цены поставщика",
-            f"Цены поставщика '{supplier_name}'\n\n"
-            "Функция просмотра цен находится в разработке."
-        )
+        price_widget = PriceHistoryWidget(prices_window, self.controller)
+        price_widget.pack(fill="both", expand=True, padx=10, pady=10)
+        price_widget.set_supplier(supplier)
 
 class SupplierDialog(ctk.CTkToplevel):
     """Диалог для добавления/редактирования поставщика"""
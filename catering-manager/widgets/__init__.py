@@ -4,4 +4,7 @@
 
 from .budget_widget import BudgetWidget
 from .calendar_widget import CalendarWidget
+from .live_chart import LiveChartView
 from .price_history_widget import PriceHistoryWidget
+from .quick_entry import QuickEntry
+from .virtual_tree import VirtualTreeview
@@ -5,9 +5,10 @@
 import tkinter as tk
 import customtkinter as ctk
 from decimal import Decimal
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from config import Config
+from models import BudgetProjection
 from utils.formatters import Formatters
 
 class BudgetWidget(ctk.CTkFrame):
@@ -45,7 +46,9 @@ class BudgetWidget(ctk.CTkFrame):
             ("budget", "Бюджет:", "0 ₽"),
             ("spent", "Потрачено:", "0 ₽"),
             ("remaining", "Осталось:", "0 ₽"),
-            ("percentage", "Использовано:", "0%")
+            ("percentage", "Использовано:", "0%"),
+            ("forecast", "Прогноз:", "—"),
+            ("forecast_percentage", "Прогноз, %:", "—")
         ]
 
         for i, (key, label_text, default_value) in enumerate(labels_info):
@@ -76,7 +79,15 @@ class BudgetWidget(ctk.CTkFrame):
             text="Статус: Нормальный",
             font=("Arial", 11)
         )
-        self.status_label.pack(anchor="w", padx=10, pady=(5, 10))
+        self.status_label.pack(anchor="w", padx=10, pady=(5, 0))
+
+        # Прогноз на дату мероприятия
+        self.forecast_label = ctk.CTkLabel(
+            self,
+            text="Прогноз: нет данных",
+            font=("Arial", 11)
+        )
+        self.forecast_label.pack(anchor="w", padx=10, pady=(0, 10))
 
     def update_budget(self, budget_data: Dict[str, Any]):
         """Обновить данные бюджета"""
@@ -122,6 +133,39 @@ class BudgetWidget(ctk.CTkFrame):
                 self.progress_bar.configure(progress_color="red")
                 self.status_label.configure(text="Статус: ПРЕВЫШЕНИЕ БЮДЖЕТА!", text_color="red")
 
+    def update_projection(self, projection: Optional[BudgetProjection]):
+        """Обновить прогноз расходов на дату мероприятия"""
+        if not projection:
+            self.budget_labels['forecast'].configure(text="—")
+            self.budget_labels['forecast_percentage'].configure(text="—")
+            self.forecast_label.configure(text="Прогноз: нет данных", text_color=("gray10", "gray90"))
+            return
+
+        percentage = projection.projected_percentage
+        self.budget_labels['forecast'].configure(
+            text=Formatters.format_currency(projection.projected_amount)
+        )
+        self.budget_labels['forecast_percentage'].configure(
+            text=Formatters.format_percentage(percentage)
+        )
+
+        # Предупреждаем заранее, пока фактический расход еще ниже порога
+        if percentage >= Config.BUDGET_CRITICAL_THRESHOLD * 100:
+            self.forecast_label.configure(
+                text=f"Прогноз: превышение на {Formatters.format_currency(projection.projected_overrun)} "
+                     f"к дате мероприятия",
+                text_color="red"
+            )
+        elif percentage >= Config.BUDGET_ALERT_THRESHOLD * 100:
+            self.forecast_label.configure(text="Прогноз: бюджет близок к исчерпанию", text_color="orange")
+        elif projection.days_left:
+            self.forecast_label.configure(
+                text=f"Прогноз: в пределах бюджета (до мероприятия {projection.days_left} дн.)",
+                text_color="green"
+            )
+        else:
+            self.forecast_label.configure(text="Прогноз: в пределах бюджета", text_color="green")
+
     def set_event_name(self, event_name: str):
         """Установить название мероприятия"""
         if event_name:
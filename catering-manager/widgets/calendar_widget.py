@@ -6,21 +6,35 @@ import tkinter as tk
 import customtkinter as ctk
 from datetime import datetime, date, timedelta
 from typing import Optional, Callable, Dict, List
-import calendar
 
+from models import EventDayStats
+from utils.background import BackgroundLoader
+from utils.calendar_data import CalendarDataProvider, DayCell
 
-class CalendarWidget(ctk.CTkFrame):
-    """Виджет календаря для выбора дат"""
 
-    def __init__(self, parent, on_date_select: Optional[Callable] = None, **kwargs):
+class CalendarWidget(ctk.CTkFrame):
+    """
+    Виджет календаря для выбора дат. С источником данных дни окрашиваются
+    по числу мероприятий (месяц загружается одним запросом, соседние - заранее)
+    """
+
+    def __init__(self, parent, on_date_select: Optional[Callable] = None,
+                 provider: Optional[CalendarDataProvider] = None,
+                 loader: Optional[BackgroundLoader] = None, **kwargs):
         super().__init__(parent, **kwargs)
 
         self.on_date_select = on_date_select
+        self.provider = provider
+        # Без загрузчика месяцы запрашиваются сразу, в главном потоке
+        self.loader = loader
         self.current_date = date.today()
         self.selected_date: Optional[date] = None
         self.marked_dates: Dict[date, str] = {}  # дата -> цвет
 
         self._create_widgets()
+        # Состояние, показанное каждой кнопкой (меняются только изменившиеся)
+        self._shown_cells: List[Optional[DayCell]] = [None] * len(self.day_buttons)
+        self._text_color = self.day_buttons[0].cget("text_color")
         self._update_calendar()
 
     def _create_widgets(self):
@@ -102,53 +116,64 @@ class CalendarWidget(ctk.CTkFrame):
             self.days_frame.grid_columnconfigure(col, weight=1)
 
     def _update_calendar(self):
-        """Обновить отображение календаря"""
+        """Обновить отображение календаря (перенастраиваются только изменившиеся кнопки)"""
         # Обновляем заголовок
         month_names = [
             "Январь", "Февраль", "Март", "Апрель", "Май", "Июнь",
             "Июль", "Август", "Сентябрь", "Октябрь", "Ноябрь", "Декабрь"
         ]
 
-        month_name = month_names[self.current_date.month - 1]
-        year = self.current_date.year
-        self.month_label.configure(text=f"{month_name} {year}")
-
-        # Получаем календарь для текущего месяца
-        cal = calendar.monthcalendar(year, self.current_date.month)
-
-        # Сбрасываем все кнопки
-        for btn in self.day_buttons:
-            btn.configure(text="", fg_color="transparent", state="normal")
-
-        # Заполняем календарь
-        today = date.today()
-        button_index = 0
-
-        for week in cal:
-            for day in week:
-                if day == 0:
-                    # Пустой день
-                    self.day_buttons[button_index].configure(state="disabled")
-                else:
-                    day_date = date(year, self.current_date.month, day)
+        year, month = self.current_date.year, self.current_date.month
+        self.month_label.configure(text=f"{month_names[month - 1]} {year}")
 
-                    # Устанавливаем текст
-                    self.day_buttons[button_index].configure(text=str(day))
-
-                    # Проверяем выделенные даты
-                    if self.selected_date and day_date == self.selected_date:
-                        self.day_buttons[button_index].configure(fg_color="#4ECDC4")
-                    elif day_date == today:
-                        self.day_buttons[button_index].configure(fg_color="#FFD166")
-                    elif day_date in self.marked_dates:
-                        color = self.marked_dates[day_date]
-                        self.day_buttons[button_index].configure(fg_color=color)
+        cells = CalendarDataProvider.cells(
+            year, month, self._month_days(year, month), self.selected_date, date.today(), self.marked_dates
+        )
+        for index, (button, cell) in enumerate(zip(self.day_buttons, cells)):
+            if cell == self._shown_cells[index]:
+                continue
+            button.configure(
+                text=cell.text,
+                fg_color=cell.fg_color,
+                text_color=cell.text_color or self._text_color,
+                state=cell.state
+            )
+            self._shown_cells[index] = cell
+
+    def _month_days(self, year: int, month: int) -> Dict[date, EventDayStats]:
+        """Мероприятия месяца: из кэша, иначе загрузка (календарь перерисуется по ее окончании)"""
+        if not self.provider:
+            return {}
+
+        if not self.loader:
+            return self.provider.month(year, month)
+
+        # Соседние месяцы - заранее, чтобы переключение было без ожидания
+        for neighbour in [(year, month)] + self.provider.adjacent(year, month):
+            key = ("calendar", id(self)) + neighbour
+            if self.provider.cached(*neighbour) is None and not self.loader.is_loading(key):
+                self.loader.load(
+                    self, key,
+                    lambda m=neighbour: self.provider.month(*m),
+                    lambda days, m=neighbour: self._on_month_loaded(m)
+                )
+        return self.provider.cached(year, month) or {}
 
-                    # Делаем прошедшие даты менее яркими
-                    if day_date < today:
-                        self.day_buttons[button_index].configure(text_color="gray")
+    def _on_month_loaded(self, month: tuple):
+        """Месяц загружен: перерисовать, если он показан"""
+        if month == (self.current_date.year, self.current_date.month):
+            self._update_calendar()
 
-                button_index += 1
+    def refresh(self):
+        """Мероприятия изменились: перезагрузить показанный и соседние месяцы"""
+        if self.provider:
+            self.provider.invalidate()
+            if self.loader:
+                # Незавершенные загрузки могли прочитать старые данные
+                year, month = self.current_date.year, self.current_date.month
+                for neighbour in [(year, month)] + self.provider.adjacent(year, month):
+                    self.loader.cancel(("calendar", id(self)) + neighbour)
+        self._update_calendar()
 
     def _prev_month(self):
         """Перейти к предыдущему месяцу"""
@@ -182,7 +207,9 @@ class CalendarWidget(ctk.CTkFrame):
             day = int(day_text)
             selected_date = date(self.current_date.year, self.current_date.month, day)
 
-            # Обновляем выбранную дату
+            # Обновляем выбранную дату (повторный клик снимает выбор)
+            if selected_date == self.selected_date:
+                selected_date = None
             self.selected_date = selected_date
 
             # Обновляем отображение
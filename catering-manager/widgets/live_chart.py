@@ -0,0 +1,67 @@
+"""
+Виджет постоянной диаграммы: одна фигура и один холст на все обновления
+"""
+
+import customtkinter as ctk
+from typing import Any, Optional, Tuple, Type
+
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.figure import Figure
+
+from utils.live_plots import LivePlot
+
+
+class LiveChartView(ctk.CTkFrame):
+    """Показывает LivePlot на холсте, созданном один раз; без данных - текст вместо холста"""
+
+    def __init__(self, parent, plot_class: Type[LivePlot], placeholder: str = "",
+                 figsize: Tuple[float, float] = (8, 4), toolbar: bool = False, **kwargs):
+        super().__init__(parent, **kwargs)
+
+        # Фигура без pyplot: не попадает в глобальный реестр фигур
+        self.figure = Figure(figsize=figsize)
+        self.plot = plot_class(self.figure)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
+        self._canvas_shown = False
+
+        # Панель масштабирования (для временных рядов: при масштабе ряд прореживается заново)
+        self.toolbar: Optional[NavigationToolbar2Tk] = None
+        if toolbar:
+            self.toolbar = NavigationToolbar2Tk(self.canvas, self, pack_toolbar=False)
+
+        self.message_label = ctk.CTkLabel(self, text=placeholder, font=("Arial", 12))
+        self.message_label.pack(expand=True)
+
+    def show(self, data: Any, empty_text: str = "Нет данных для построения графиков"):
+        """Показать данные (перерисовка - при простое цикла событий)"""
+        try:
+            if not self.plot.update(data):
+                self.show_message(empty_text)
+                return
+            if self.plot.rebuilt:
+                self.figure.tight_layout()
+            if self.toolbar:
+                # Новые данные: история масштаба (кнопки "Назад"/"Домой") - с их вида
+                self.toolbar.update()
+        except Exception as e:
+            self.plot.reset()
+            self.show_message(f"Ошибка при создании графика: {str(e)}")
+            return
+
+        if not self._canvas_shown:
+            self.message_label.pack_forget()
+            if self.toolbar:
+                self.toolbar.pack(side="bottom", fill="x")
+            self.canvas.get_tk_widget().pack(fill="both", expand=True)
+            self._canvas_shown = True
+        self.canvas.draw_idle()
+
+    def show_message(self, text: str):
+        """Текст вместо диаграммы"""
+        if self._canvas_shown:
+            if self.toolbar:
+                self.toolbar.pack_forget()
+            self.canvas.get_tk_widget().pack_forget()
+            self._canvas_shown = False
+        self.message_label.configure(text=text)
+        self.message_label.pack(expand=True)
@@ -3,19 +3,19 @@
 """
 
 import tkinter as tk
+from tkinter import ttk
 import customtkinter as ctk
 from datetime import datetime, date, timedelta
 from decimal import Decimal
 from typing import List, Dict, Optional
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib
-
-matplotlib.use('TkAgg')
 
 from models import SupplierPrice, Nomenclature, Supplier
 from controllers import CateringController
 from utils.formatters import Formatters
+from utils.background import run_in_background
+from utils.chart_service import price_history_chart_data
+from utils.live_plots import PriceHistoryPlot
+from widgets.live_chart import LiveChartView
 
 
 class PriceHistoryWidget(ctk.CTkFrame):
@@ -27,7 +27,12 @@ class PriceHistoryWidget(ctk.CTkFrame):
         self.controller = controller
         self.current_nomenclature: Optional[Nomenclature] = None
         self.current_supplier: Optional[Supplier] = None
-        self.price_history: List[SupplierPrice] = []
+        # История цен: id поставщика (без позиции - id позиции) -> ряд цен по датам
+        self.price_history: Dict[int, List[SupplierPrice]] = {}
+        # Ряды истории - позиции поставщика (позиция не выбрана)
+        self.by_nomenclature = False
+        # Номер последнего запроса истории (устаревшие ответы отбрасываются)
+        self._history_request = 0
 
         self._create_widgets()
 
@@ -75,17 +80,15 @@ class PriceHistoryWidget(ctk.CTkFrame):
             command=self._load_price_history
         ).pack(side="right", padx=10)
 
-        # Фрейм для графика
-        self.chart_frame = ctk.CTkFrame(self)
-        self.chart_frame.pack(fill="both", expand=True, padx=10, pady=10)
-
-        # Заглушка для графика
-        self.placeholder_label = ctk.CTkLabel(
-            self.chart_frame,
-            text="Выберите позицию для отображения истории цен",
-            font=("Arial", 12)
+        # График: одна фигура, при смене позиции обновляются только линии;
+        # длинные ряды прореживаются под ширину графика и при масштабировании
+        self.chart_view = LiveChartView(
+            self,
+            PriceHistoryPlot,
+            placeholder="Выберите позицию или поставщика для отображения истории цен",
+            toolbar=True
         )
-        self.placeholder_label.pack(expand=True)
+        self.chart_view.pack(fill="both", expand=True, padx=10, pady=10)
 
         # Таблица с ценами
         table_frame = ctk.CTkFrame(self)
@@ -172,118 +175,84 @@ class PriceHistoryWidget(ctk.CTkFrame):
 
         self._load_price_history()
 
+    def set_supplier(self, supplier: Optional[Supplier]):
+        """Ограничить историю цен одним поставщиком"""
+        self.current_supplier = supplier
+        self.supplier_combo.set(supplier.name if supplier else "Все поставщики")
+        self._load_price_history()
+
     def _load_price_history(self):
-        """Загрузить историю цен"""
-        if not self.current_nomenclature:
+        """Загрузить историю цен (запрос к БД выполняется в фоне)"""
+        if not self.current_nomenclature and not self.current_supplier:
             return
 
-        try:
-            # Здесь должна быть логика загрузки истории цен из БД
-            # Пока создаем тестовые данные
+        self._history_request += 1
+        request_id = self._history_request
 
-            self.price_history = []
+        # Без позиции показываем прайс поставщика: ряд на каждую позицию
+        by_nomenclature = self.current_nomenclature is None
+        nomenclature_id = None if by_nomenclature else self.current_nomenclature.id
+        supplier_id = self.current_supplier.id if self.current_supplier else None
 
-            # Очищаем таблицу
-            for item in self.tree.get_children():
-                self.tree.delete(item)
+        # Обновляем заголовок
+        if by_nomenclature:
+            title = f"История цен поставщика: {self.current_supplier.name}"
+        else:
+            title = f"История цен: {self.current_nomenclature.name}"
+            if self.current_supplier:
+                title += f" - {self.current_supplier.name}"
+        self.title_label.configure(text=f"{title} (загрузка...)")
 
-            # Обновляем график
-            self._update_chart()
+        run_in_background(
+            self,
+            lambda: self.controller.get_price_history(nomenclature_id, supplier_id),
+            lambda history: self._on_price_history_loaded(request_id, title, history, by_nomenclature),
+            lambda error: self._on_price_history_error(request_id, error)
+        )
 
-            # Обновляем заголовок
-            if self.current_nomenclature:
-                title = f"История цен: {self.current_nomenclature.name}"
-                if self.current_supplier:
-                    title += f" - {self.current_supplier.name}"
-                self.title_label.configure(text=title)
+    def _on_price_history_loaded(self, request_id: int, title: str,
+                                 history: Dict[int, List[SupplierPrice]], by_nomenclature: bool = False):
+        """Отобразить загруженную историю цен"""
+        if request_id != self._history_request:
+            return  # Пришел ответ на устаревший запрос
+
+        self.price_history = history
+        self.by_nomenclature = by_nomenclature
+        self.title_label.configure(text=title)
+
+        # Заполняем таблицу (в прайсе поставщика первая колонка - позиция)
+        self.tree.heading('supplier', text='Позиция' if by_nomenclature else 'Поставщик')
+        self.tree.delete(*self.tree.get_children())
+        for prices in history.values():
+            for price in prices:
+                owner = price.nomenclature if by_nomenclature else price.supplier
+                self.tree.insert(
+                    '',
+                    tk.END,
+                    values=(
+                        owner.name if owner else '',
+                        Formatters.format_date(price.start_date),
+                        Formatters.format_date(price.end_date),
+                        Formatters.format_currency(price.price, show_symbol=False),
+                        Formatters.format_quantity(price.min_quantity)
+                    )
+                )
 
-        except Exception as e:
-            print(f"Ошибка загрузки истории цен: {e}")
+        # Обновляем график
+        self._update_chart()
+
+    def _on_price_history_error(self, request_id: int, error: Exception):
+        """Ошибка загрузки истории цен"""
+        if request_id != self._history_request:
+            return
+        print(f"Ошибка загрузки истории цен: {error}")
+        self.title_label.configure(text="📈 История изменения цен")
 
     def _update_chart(self):
         """Обновить график цен"""
         if not self.price_history:
-            # Очищаем график
-            for widget in self.chart_frame.winfo_children():
-                widget.destroy()
-
-            self.placeholder_label = ctk.CTkLabel(
-                self.chart_frame,
-                text="Нет данных для отображения графика",
-                font=("Arial", 12)
-            )
-            self.placeholder_label.pack(expand=True)
+            self.chart_view.show_message("Нет данных для отображения графика")
             return
 
-        try:
-            # Очищаем фрейм
-            for widget in self.chart_frame.winfo_children():
-                widget.destroy()
-
-            # Группируем цены по поставщикам
-            suppliers_data = {}
-            for price in self.price_history:
-                supplier_name = price.supplier.name if price.supplier else "Неизвестно"
-                if supplier_name not in suppliers_data:
-                    suppliers_data[supplier_name] = []
-
-                suppliers_data[supplier_name].append({
-                    'date': price.start_date,
-                    'price': float(price.price)
-                })
-
-            # Создаем график
-            fig, ax = plt.subplots(figsize=(8, 4))
-
-            colors = plt.cm.tab10.colors
-            color_idx = 0
-
-            for supplier_name, prices in suppliers_data.items():
-                if not prices:
-                    continue
-
-                # Сортируем по дате
-                prices.sort(key=lambda x: x['date'])
-
-                dates = [p['date'] for p in prices]
-                price_values = [p['price'] for p in prices]
-
-                # Отображаем на графике
-                ax.plot(
-                    dates,
-                    price_values,
-                    marker='o',
-                    label=supplier_name,
-                    color=colors[color_idx % len(colors)],
-                    linewidth=2
-                )
-
-                color_idx += 1
-
-            # Настраиваем график
-            ax.set_xlabel('Дата')
-            ax.set_ylabel('Цена, руб')
-            ax.set_title('Динамика изменения цен')
-            ax.legend()
-            ax.grid(True, alpha=0.3)
-
-            # Форматируем даты
-            fig.autofmt_xdate()
-
-            # Встраиваем в Tkinter
-            canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill="both", expand=True)
-
-        except Exception as e:
-            # В случае ошибки показываем сообщение
-            for widget in self.chart_frame.winfo_children():
-                widget.destroy()
-
-            error_label = ctk.CTkLabel(
-                self.chart_frame,
-                text=f"Ошибка при создании графика: {str(e)}",
-                font=("Arial", 10),
-                text_color="red"
-            )
-            error_label.pack(expand=True)
+        # Ряды уже сгруппированы (по поставщикам или позициям) и отсортированы по дате
+        self.chart_view.show(price_history_chart_data(self.price_history, self.by_nomenclature))
@@ -0,0 +1,41 @@
+"""
+Поле быстрого ввода с автодополнением для выбора позиции или поставщика
+"""
+
+import customtkinter as ctk
+from typing import Any, Optional
+
+from utils.quick_entry import QuickEntryIndex, QUICK_ENTRY_LIMIT
+
+
+class QuickEntry(ctk.CTkComboBox):
+    """
+    Комбобокс с автодополнением: в списке - первые совпадения с набранным текстом,
+    выбранное название определяет модель через индекс (без перебора списка)
+    """
+
+    def __init__(self, master, limit: int = QUICK_ENTRY_LIMIT, **kwargs):
+        super().__init__(master, values=[], **kwargs)
+        self.limit = limit
+        self.catalog = QuickEntryIndex([], str)
+        self._typed: Optional[str] = None
+        self.bind('<KeyRelease>', self._on_key)
+
+    def set_catalog(self, catalog: QuickEntryIndex):
+        """Новый индекс моделей (после загрузки данных)"""
+        self.catalog = catalog
+        self._typed = None
+        self.configure(values=catalog.complete("", self.limit))
+        self.set("")
+
+    def selected_item(self) -> Any:
+        """Модель, соответствующая тексту поля (None - не выбрана или не найдена)"""
+        return self.catalog.resolve(self.get())
+
+    def _on_key(self, event=None):
+        """Набор текста: список вариантов - совпадения с началом названия или слова"""
+        text = self.get()
+        if text == self._typed:
+            return
+        self._typed = text
+        self.configure(values=self.catalog.complete(text, self.limit))
@@ -0,0 +1,273 @@
+"""
+Виртуальная таблица: в Treeview создаются только строки видимого окна,
+прокрутка переводится в смещение по источнику строк
+"""
+
+import operator
+import tkinter as tk
+from tkinter import ttk
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+from utils.row_sources import ListSource, Row, RowSource
+from utils.tree_sync import ListDiff, diff_items
+
+# Строк, форматируемых заранее выше и ниже видимого окна
+ROW_BUFFER = 30
+# Строк на один шаг колеса мыши
+WHEEL_ROWS = 3
+# Размеры до первой отрисовки, пикселей
+DEFAULT_ROW_HEIGHT = 20
+DEFAULT_HEADING_HEIGHT = 25
+# Ячейка показана, но еще не заполнена
+BLANK_ROW: Row = ((), ())
+
+
+class VirtualTreeview(ttk.Treeview):
+    """
+    Treeview с постоянным набором строк-ячеек: при прокрутке меняются значения ячеек,
+    а не создаются и удаляются элементы. Полосе прокрутки передается положение в источнике
+    """
+
+    def __init__(self, master, yscrollcommand: Optional[Callable] = None, buffer: int = ROW_BUFFER, **kwargs):
+        super().__init__(master, **kwargs)
+        self._yscrollcommand = yscrollcommand
+        self.buffer = buffer
+
+        self.source: RowSource = ListSource([], lambda item: ((), ()))
+        self._offset = 0
+        self._visible = 1
+        self._row_height = DEFAULT_ROW_HEIGHT
+        self._heading_height = DEFAULT_HEADING_HEIGHT
+        # Ячейки-элементы Treeview (iid по порядку сверху вниз)
+        self._cells: List[str] = []
+        # Строка, записанная в ячейку (None - ячейка скрыта): неизменные не переписываются
+        self._cell_rows: List[Optional[Row]] = []
+        # Отформатированные строки вокруг окна: номер -> строка
+        self._rows: Dict[int, Row] = {}
+        self._selected: Optional[int] = None
+
+        # Собственные обработчики - на отдельном теге привязок: страницы могут
+        # переназначать bind() у таблицы, не ломая прокрутку и выделение
+        tag = f"VirtualTreeview{id(self)}"
+        self.bindtags((tag,) + self.bindtags())
+        self.bind_class(tag, '<Configure>', self._on_configure)
+        self.bind_class(tag, '<<TreeviewSelect>>', self._on_select)
+        self.bind_class(tag, '<MouseWheel>', self._on_mousewheel)
+        self.bind_class(tag, '<Button-4>', lambda e: self._scroll_by(-WHEEL_ROWS))
+        self.bind_class(tag, '<Button-5>', lambda e: self._scroll_by(WHEEL_ROWS))
+        for key, step in (('<Up>', -1), ('<Down>', 1), ('<Prior>', None), ('<Next>', None)):
+            self.bind_class(tag, key, lambda e, s=step, k=key: self._on_key(s, k))
+        self.bind_class(tag, '<Home>', lambda e: self._select_index(0))
+        self.bind_class(tag, '<End>', lambda e: self._select_index(len(self.source) - 1))
+
+    # ===== Данные =====
+
+    def set_source(self, source: RowSource, keep_position: bool = True):
+        """Показать строки источника (после изменения данных или фильтра)"""
+        self.source = source
+        self._rows.clear()
+        self._selected = None
+        if not keep_position:
+            self._offset = 0
+        self._render()
+
+    def set_items(self, items: List[Any], formatter: Callable[[Any], Row]):
+        """Показать список моделей"""
+        self.set_source(ListSource(items, formatter))
+
+    def update_items(self, items: Sequence[Any], formatter: Callable[[Any], Row],
+                     key: Callable[[Any], Hashable] = operator.attrgetter('id')) -> ListDiff:
+        """
+        Показать новый список моделей по разнице с показанным: верхняя видимая строка
+        и выделение остаются на тех же моделях, в ячейки пишутся только изменившиеся строки
+        """
+        old = self.source.items if isinstance(self.source, ListSource) else []
+        diff = diff_items(old, items, key)
+
+        anchor = key(old[self._offset]) if self._offset < len(old) else None
+        selected = key(old[self._selected]) if self._selected is not None and self._selected < len(old) else None
+        positions = {key(item): index for index, item in enumerate(items)} if anchor is not None else {}
+
+        self.source = ListSource(items, formatter)
+        self._rows.clear()
+        self._offset = positions.get(anchor, self._offset)
+        self._selected = positions.get(selected)
+        self._render()
+        return diff
+
+    def invalidate(self):
+        """Перечитать строки источника (данные строк изменились)"""
+        self._rows.clear()
+        self._render()
+
+    def selected_index(self) -> Optional[int]:
+        """Номер выделенной строки в источнике (выделение сохраняется и вне видимого окна)"""
+        return self._selected
+
+    def selected_item(self) -> Any:
+        """Модель выделенной строки"""
+        if self._selected is None or self._selected >= len(self.source):
+            return None
+        return self.source.item(self._selected)
+
+    def select_where(self, predicate: Callable[[Any], bool]) -> bool:
+        """Выделить и показать первую строку, для которой predicate истинен"""
+        index = self.source.index_of(predicate)
+        if index < 0:
+            return False
+        self._select_index(index)
+        return True
+
+    # ===== Прокрутка =====
+
+    def yview(self, *args):
+        """Прокрутка от полосы прокрутки: положение - доля строк источника"""
+        total = len(self.source)
+        if not args:
+            if not total:
+                return 0.0, 1.0
+            return self._offset / total, min((self._offset + self._visible) / total, 1.0)
+
+        if args[0] == 'moveto':
+            self._scroll_to(int(float(args[1]) * total))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            self._scroll_by(step * self._visible if args[2] == 'pages' else step)
+
+    def yview_moveto(self, fraction: float):
+        self.yview('moveto', fraction)
+
+    def see_index(self, index: int):
+        """Прокрутить так, чтобы строка была видна"""
+        if index < self._offset:
+            self._scroll_to(index)
+        elif index >= self._offset + self._visible:
+            self._scroll_to(index - self._visible + 1)
+
+    def _scroll_by(self, rows: int):
+        self._scroll_to(self._offset + rows)
+        return "break"
+
+    def _scroll_to(self, offset: int):
+        offset = max(0, min(offset, len(self.source) - self._visible))
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+
+    # ===== Отрисовка окна =====
+
+    def _render(self):
+        """Записать строки окна в ячейки и сообщить положение полосе прокрутки"""
+        total = len(self.source)
+        self._offset = max(0, min(self._offset, total - self._visible))
+        self._ensure_cells()
+
+        window = self._window_rows()
+        selected_cell = None
+        for position, cell in enumerate(self._cells):
+            index = self._offset + position
+            row = window.get(index)
+            shown = self._cell_rows[position]
+            if row is None:
+                if shown is not None:
+                    self.detach(cell)
+                    self._cell_rows[position] = None
+                continue
+            if shown is None:
+                # Скрытые ячейки - всегда в конце, возвращаются на свое место
+                self.move(cell, '', position)
+            if row != shown:
+                values, tags = row
+                self.item(cell, values=values, tags=tags)
+                self._cell_rows[position] = row
+            if index == self._selected:
+                selected_cell = cell
+
+        # Выделение ячейки следует за строкой источника
+        current = self.selection()
+        if selected_cell and current != (selected_cell,):
+            self.selection_set(selected_cell)
+        elif not selected_cell and current:
+            self.selection_set(())
+        super().yview_moveto(0)
+
+        if self._yscrollcommand:
+            first, last = self.yview()
+            self._yscrollcommand(first, last)
+
+    def _window_rows(self) -> Dict[int, Row]:
+        """Строки видимого окна (с запасом вокруг - повторно не форматируются)"""
+        end = min(self._offset + self._visible, len(self.source))
+        if all(index in self._rows for index in range(self._offset, end)):
+            return self._rows
+
+        # Уже отформатированные строки сохраняются, недостающие запрашиваются отрезками
+        start = max(self._offset - self.buffer, 0)
+        stop = min(end + self.buffer, len(self.source))
+        rows: Dict[int, Row] = {}
+        index = start
+        while index < stop:
+            if index in self._rows:
+                rows[index] = self._rows[index]
+                index += 1
+                continue
+            run_end = index
+            while run_end < stop and run_end not in self._rows:
+                run_end += 1
+            for number, row in enumerate(self.source.rows(index, run_end - index)):
+                rows[index + number] = row
+            index = run_end
+        self._rows = rows
+        return self._rows
+
+    def _ensure_cells(self):
+        """Число ячеек по высоте таблицы"""
+        while len(self._cells) < self._visible:
+            self._cells.append(self.insert('', tk.END, values=()))
+            self._cell_rows.append(BLANK_ROW)
+        while len(self._cells) > self._visible:
+            self.delete(self._cells.pop())
+            self._cell_rows.pop()
+
+    # ===== События =====
+
+    def _on_configure(self, event):
+        """Изменился размер: пересчитать число видимых строк"""
+        if self._cells:
+            bbox = self.bbox(self._cells[0])
+            if bbox:
+                self._heading_height, self._row_height = bbox[1], bbox[3]
+        visible = max(1, (event.height - self._heading_height) // self._row_height)
+        if visible != self._visible:
+            self._visible = visible
+            self._render()
+
+    def _on_select(self, event):
+        """Запомнить выделенную строку источника"""
+        selection = self.selection()
+        if selection and selection[0] in self._cells:
+            self._selected = self._offset + self._cells.index(selection[0])
+        elif self._selected is not None and self._offset <= self._selected < self._offset + self._visible:
+            # Выделение снято в видимом окне (а не ушло за его пределы)
+            self._selected = None
+
+    def _on_mousewheel(self, event):
+        return self._scroll_by(-WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS)
+
+    def _on_key(self, step: Optional[int], key: str):
+        """Перемещение выделения клавишами с прокруткой окна"""
+        if step is None:
+            step = -self._visible if key == '<Prior>' else self._visible
+        current = self._selected if self._selected is not None else self._offset - 1
+        self._select_index(current + step)
+        return "break"
+
+    def _select_index(self, index: int):
+        """Выделить строку источника и показать ее"""
+        if not len(self.source):
+            return "break"
+        self._selected = max(0, min(index, len(self.source) - 1))
+        self.see_index(self._selected)
+        self._render()
+        self.event_generate('<<TreeviewSelect>>')
+        return "break"